@@ -7,11 +7,17 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from nameless.database.models.base import Base
 from nameless.database.models import *
+from nameless.database.engine import get_database_url
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate whatever database the bot is configured to use.
+config.set_main_option(
+    "sqlalchemy.url", get_database_url(use_async=False).render_as_string(hide_password=False).replace("%", "%%")
+)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
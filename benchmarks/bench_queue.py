@@ -0,0 +1,121 @@
+"""
+Micro-benchmark: positional queue operations on `wavelink.Queue` (one flat list) versus `NamelessQueue` (blocks).
+
+Run from the repository root:
+    python -m benchmarks.bench_queue
+"""
+
+import random
+import time
+
+import wavelink
+
+from nameless.customs import NamelessQueue
+
+SIZES = (1_000, 5_000, 50_000)
+ROUNDS = 2000
+REPEATS = 5
+SPLICE_SIZE = 50
+
+
+def make_track(identifier: int) -> wavelink.Playable:
+    return wavelink.Playable(
+        {
+            "encoded": f"encoded-{identifier}",
+            "info": {
+                "identifier": str(identifier),
+                "isSeekable": True,
+                "author": "nameless*",
+                "length": 1000,
+                "isStream": False,
+                "position": 0,
+                "title": f"Track {identifier}",
+                "sourceName": "youtube",
+            },
+            "pluginInfo": {},
+        }
+    )
+
+
+def legacy_insert(queue: wavelink.Queue, index: int, track: wavelink.Playable) -> None:
+    queue.put_at(index, track)
+
+
+def legacy_splice(queue: wavelink.Queue, index: int, tracks: list[wavelink.Playable]) -> None:
+    """How `queue add` with a position used to insert a playlist."""
+    queue._items = queue._items[:index] + tracks + queue._items[index:]
+
+
+def legacy_move(queue: wavelink.Queue, source: int, destination: int) -> None:
+    queue.put_at(destination, queue.get_at(source))
+
+
+def legacy_delete(queue: wavelink.Queue, index: int) -> None:
+    queue.delete(index)
+
+
+def blocked_insert(queue: NamelessQueue, index: int, track: wavelink.Playable) -> None:
+    queue.put_at(index, track)
+
+
+def blocked_splice(queue: NamelessQueue, index: int, tracks: list[wavelink.Playable]) -> None:
+    queue.put_many_at(index, tracks)
+
+
+def blocked_move(queue: NamelessQueue, source: int, destination: int) -> None:
+    queue.move(source, destination)
+
+
+def blocked_delete(queue: NamelessQueue, index: int) -> None:
+    queue.delete(index)
+
+
+def measure(queue: wavelink.Queue, operation: str, size: int, ops) -> float:
+    rng = random.Random(size)
+    tracks = [make_track(i) for i in range(size)]
+    spare = tracks[:SPLICE_SIZE]
+    queue.put(tracks)
+
+    insert, splice, move, delete = ops
+    start = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        index = rng.randrange(len(queue))
+
+        if operation == "insert":
+            insert(queue, index, spare[0])
+            # Keep the queue size steady, deleting is measured on its own.
+            delete(queue, len(queue) - 1)
+        elif operation == "splice":
+            splice(queue, index, spare)
+            del queue[len(queue) - SPLICE_SIZE :]
+        elif operation == "move":
+            move(queue, index, rng.randrange(len(queue)))
+        elif operation == "delete":
+            delete(queue, index)
+            queue.put(spare[0])
+
+    return time.perf_counter() - start
+
+
+def main():
+    legacy_ops = (legacy_insert, legacy_splice, legacy_move, legacy_delete)
+    blocked_ops = (blocked_insert, blocked_splice, blocked_move, blocked_delete)
+
+    for size in SIZES:
+        for operation in ("insert", "splice", "move", "delete"):
+            legacy = blocked = float("inf")
+
+            for _ in range(REPEATS):
+                legacy = min(legacy, measure(wavelink.Queue(), operation, size, legacy_ops))
+                blocked = min(blocked, measure(NamelessQueue(), operation, size, blocked_ops))
+
+            print(
+                f"{size:>6} tracks, {operation:>6}: legacy {legacy / ROUNDS * 1e6:8.2f} us/op, "
+                f"blocked {blocked / ROUNDS * 1e6:8.2f} us/op, "
+                f"speedup x{legacy / blocked:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
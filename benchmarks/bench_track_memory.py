@@ -0,0 +1,90 @@
+"""
+Memory benchmark: a queue of full `wavelink.Playable` versus a compact `NamelessQueue` of track summaries.
+
+Run from the repository root:
+    python -m benchmarks.bench_track_memory
+"""
+
+import gc
+import random
+import time
+import tracemalloc
+
+import wavelink
+
+from nameless.customs import NamelessQueue, encode_track_info
+
+SIZES = (1_000, 10_000, 50_000)
+
+# Playlists draw from a small set of artists.
+ARTISTS = 50
+
+
+def make_payload(rng: random.Random, identifier: int) -> dict:
+    """A track as Lavalink sends it, with a title and author of a realistic length."""
+    video_id = f"{identifier:011d}"
+    info = {
+        "identifier": video_id,
+        "isSeekable": True,
+        "author": f"Artist number {rng.randrange(ARTISTS)} - Topic",
+        "length": rng.randrange(120_000, 420_000),
+        "isStream": False,
+        "position": 0,
+        "title": f"Some song title with a few words in it ({identifier})",
+        "uri": f"https://www.youtube.com/watch?v={video_id}",
+        "artworkUrl": f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        "isrc": None,
+        "sourceName": "youtube",
+    }
+    return {"encoded": encode_track_info(info), "info": info, "pluginInfo": {}, "userData": {}}
+
+
+def measure(size: int, compact: bool) -> int:
+    """Bytes held by a queue of `size` tracks, the search results it was filled from being gone."""
+    rng = random.Random(size)
+    gc.collect()
+    tracemalloc.start()
+
+    queue = NamelessQueue(compact=compact)
+    # Built in chunks, like search results coming and going, so the peak stays close to what the queue keeps.
+    for start in range(0, size, 500):
+        queue.put([wavelink.Playable(make_payload(rng, i)) for i in range(start, min(start + 500, size))])
+
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(queue) == size
+    return used
+
+
+def measure_rehydration(size: int) -> float:
+    """Microseconds to turn a summary back into a `Playable`, what `get` costs on top in compact mode."""
+    rng = random.Random(size)
+    queue = NamelessQueue(compact=True)
+    queue.put([wavelink.Playable(make_payload(rng, i)) for i in range(size)])
+
+    start = time.perf_counter()
+
+    while queue:
+        queue.get()
+
+    return (time.perf_counter() - start) / size * 1e6
+
+
+def main():
+    for size in SIZES:
+        full = measure(size, compact=False)
+        compact = measure(size, compact=True)
+
+        print(
+            f"{size:>6} tracks: full {full / 2**20:7.2f} MiB ({full / size:6.0f} B/track), "
+            f"compact {compact / 2**20:7.2f} MiB ({compact / size:6.0f} B/track), "
+            f"saved {1 - compact / full:.0%}"
+        )
+
+    print(f"get() with rehydration: {measure_rehydration(10_000):.2f} us/track")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark: legacy "select, add, select again" record creation versus the single-statement upsert.
+
+Run from the repository root:
+    python -m benchmarks.bench_upsert
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from nameless.database.models import DbGuild
+from nameless.database.models.base import Base
+from nameless.database.statements import upsert
+
+ROUNDS = 2000
+REPEATS = 5
+
+
+def legacy_create(session: Session, discord_id: int) -> DbGuild:
+    """The record creation path used before upserts."""
+    decoy_guild = DbGuild(discord_id)
+
+    if not session.query(DbGuild).filter_by(discord_id=discord_id).one_or_none():
+        session.add(decoy_guild)
+        session.flush()
+
+        return decoy_guild
+
+    return session.query(DbGuild).filter_by(discord_id=discord_id).one()
+
+
+def upsert_create(session: Session, discord_id: int) -> DbGuild:
+    return session.scalars(upsert(DbGuild, discord_id), execution_options={"populate_existing": True}).one()
+
+
+def measure(create, *, existing: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", isolation_level="AUTOCOMMIT")
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            if existing:
+                for i in range(ROUNDS):
+                    upsert_create(session, i)
+
+                session.expunge_all()
+
+            start = time.perf_counter()
+
+            for i in range(ROUNDS):
+                create(session, i)
+
+                # Do not let the identity map answer for us.
+                session.expunge_all()
+
+            elapsed = time.perf_counter() - start
+
+        engine.dispose()
+
+    return elapsed
+
+
+def main():
+    for existing in (False, True):
+        case = "existing rows" if existing else "new rows"
+        # Disk timings are noisy, keep the best of a few interleaved runs.
+        legacy = upsert = float("inf")
+
+        for _ in range(REPEATS):
+            legacy = min(legacy, measure(legacy_create, existing=existing))
+            upsert = min(upsert, measure(upsert_create, existing=existing))
+
+        print(
+            f"{case:>13}: legacy {legacy / ROUNDS * 1e6:8.1f} us/op, "
+            f"upsert {upsert / ROUNDS * 1e6:8.1f} us/op, "
+            f"speedup x{legacy / upsert:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
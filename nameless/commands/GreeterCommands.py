@@ -8,7 +8,7 @@ from discord.ext import commands
 from nameless import Nameless
 from nameless.commands.checks import BaseCheck
 from nameless.customs.ui_kit import NamelessModal
-from nameless.database import CRUD
+from nameless.database import AsyncCRUD
 
 __all__ = ["GreeterCommands"]
 
@@ -30,7 +30,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
-        db_guild = CRUD.get_or_create_guild_record(member.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(member.guild)
 
         if db_guild.is_goodbye_enabled and db_guild.goodbye_message != "":
             if member.bot and not db_guild.is_bot_greeting_enabled:
@@ -42,7 +42,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        db_guild = CRUD.get_or_create_guild_record(member.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(member.guild)
 
         if db_guild.is_welcome_enabled and db_guild.welcome_message != "":
             if member.bot and not db_guild.is_bot_greeting_enabled:
@@ -62,7 +62,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
         """View configured greeter properties."""
         await interaction.response.defer()
 
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
 
         wc_chn = interaction.guild.get_channel(db_guild.welcome_channel_id)
         gb_chn = interaction.guild.get_channel(db_guild.goodbye_channel_id)
@@ -109,7 +109,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
     @BaseCheck.require_gateway_intents([discord.Intents.members])
     async def set_welcome_message(self, interaction: discord.Interaction, edit: bool = True):
         """Change greeter welcome message"""
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
 
         modal = NamelessModal(title="New welcome text", initial_text=db_guild.welcome_message if edit else None)
         modal.text.label = "Greeter welcome text"
@@ -118,6 +118,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
         await modal.wait()
 
         db_guild.welcome_message = modal.text.value
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(content=f"Your new welcome text:\n\n{db_guild.welcome_message}")
 
@@ -128,7 +129,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
     @BaseCheck.require_gateway_intents([discord.Intents.members])
     async def set_goodbye_message(self, interaction: discord.Interaction, edit: bool = True):
         """Change goodbye message"""
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
 
         modal = NamelessModal(title="New goodbye text", initial_text=db_guild.goodbye_message if edit else None)
         modal.text.label = "Greeter goodbye text"
@@ -137,6 +138,7 @@ class GreeterCommands(commands.Cog, name="greeter"):
         await modal.wait()
 
         db_guild.goodbye_message = modal.text.value
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"Your new goodbye text:\n\n{db_guild.goodbye_message}")
 
@@ -150,8 +152,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     ):
         """Change goodbye message delivery channel"""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.goodbye_channel_id = dest_channel.id
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"Done updating goodbye channel to {dest_channel.mention}")
 
@@ -165,8 +168,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     ):
         """Change welcome message delivery channel"""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.welcome_channel_id = dest_channel.id
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"Done updating welcome channel to {dest_channel.mention}")
 
@@ -177,8 +181,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     async def toggle_welcome(self, interaction: discord.Interaction):
         """Toggle welcome message delivery allowance"""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.is_welcome_enabled = not db_guild.is_welcome_enabled
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"Welcome message delivery: {'on' if db_guild.is_welcome_enabled else 'off'}")
 
@@ -189,8 +194,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     async def toggle_goodbye(self, interaction: discord.Interaction):
         """Toggle goodbye message delivery allowance"""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.is_goodbye_enabled = not db_guild.is_goodbye_enabled
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"Goodbye message delivery: {'on' if db_guild.is_goodbye_enabled else 'off'}")
 
@@ -201,8 +207,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     async def toggle_bot_greeter(self, interaction: discord.Interaction):
         """Toggle greeting delivery allowance to BOTs"""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.is_bot_greeting_enabled = not db_guild.is_bot_greeting_enabled
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"BOTs greeter delivery: {'on' if db_guild.is_bot_greeting_enabled else 'off'}")
 
@@ -213,8 +220,9 @@ class GreeterCommands(commands.Cog, name="greeter"):
     async def toggle_dm_instead_of_channel(self, interaction: discord.Interaction):
         """Toggle greeting delivery to user's DM instead of the channel."""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
         db_guild.is_dm_preferred = not db_guild.is_dm_preferred
+        await AsyncCRUD.save_guild_record(db_guild)
 
         await interaction.followup.send(f"DM greeter delivery: {'on' if db_guild.is_dm_preferred else 'off'}")
 
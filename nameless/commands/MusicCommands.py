@@ -1,6 +1,9 @@
 import asyncio
 import datetime
+import itertools
 import logging
+import random
+import time
 from typing import cast
 
 import discord
@@ -10,14 +13,14 @@ from discord import ClientException, app_commands
 from discord.app_commands import Choice, Range
 from discord.ext import commands
 from discord.utils import escape_markdown
-from reactionmenu import ViewButton, ViewMenu
 from wavelink import AutoPlayMode, QueueMode
 
-from nameless import Nameless
+from nameless import Nameless, get_config_option
 from nameless.commands.checks.MusicCommandChecks import MusicCommandChecks
-from nameless.customs import NamelessPlayer
-from nameless.customs.ui_kit import NamelessTrackDropdown, NamelessVoteMenu
-from nameless.database import CRUD
+from nameless.customs import NamelessNodeBalancer, NamelessNowPlayingUpdater, NamelessPlayer, NamelessSearchCache
+from nameless.customs.ui_kit import NamelessPaginator, NamelessTrackDropdown, NamelessTrackPages, NamelessVoteMenu
+from nameless.database import AsyncCRUD
+from nameless.database.models import DbPlayerSnapshot
 from NamelessConfig import NamelessConfig
 
 __all__ = ["MusicCommands"]
@@ -29,6 +32,24 @@ SOURCE_MAPPING = {
     "ytmusic": wavelink.TrackSource.YouTubeMusic,
 }
 
+# Origin searching every source in SOURCE_MAPPING at once.
+ALL_ORIGINS = "all"
+
+# Seconds to wait for each source when searching all of them.
+SEARCH_TIMEOUT = 5
+
+# Tracks added to the queue at once, before letting other tasks run.
+INGEST_CHUNK_SIZE = 100
+
+# Seconds between two node health checks, players of a lost node are moved at the next one.
+NODE_CHECK_INTERVAL = 10
+
+# Characters in the progress bar of the now-playing messages.
+PROGRESS_BAR_WIDTH = 20
+
+# Autoplay recommendations are fetched ahead when fewer tracks than this are left in the auto_queue.
+AUTOPLAY_PREFETCH_THRESHOLD = 5
+
 
 class MusicCommands(commands.GroupCog, name="music"):
     def __init__(self, bot: Nameless):
@@ -44,12 +65,100 @@ class MusicCommands(commands.GroupCog, name="music"):
             for node in NamelessConfig.LAVALINK_NODES
         ]
 
-        self.bot.loop.create_task(self.connect_nodes())
+        # Shared by every guild, the same popular playlist is often added in many of them.
+        self.search_cache = NamelessSearchCache()
+
+        # Recommendations of a seed track, shared by every guild as well.
+        self.recommendation_cache = NamelessSearchCache(maxsize=1024, ttl=1800)
+        self.prefetch_tasks: set[asyncio.Task[None]] = set()
+
+        # Playlists being added in the background, kept until they are in.
+        self.ingest_tasks: set[asyncio.Task[None]] = set()
+
+        self.balancer = NamelessNodeBalancer(self.nodes)
+
+        # Saved players are brought back once, when the first node is ready.
+        self.players_restored = False
+
+        # One updater edits the live now-playing messages of every guild.
+        self.live_now_playing = NamelessNowPlayingUpdater(
+            self.render_now_playing, refresh_interval=get_config_option("MUSIC", "NOW_PLAYING_REFRESH_INTERVAL", 15)
+        )
+
+        self.now_playing_task: asyncio.Task[None] | None = None
+        self.snapshot_task: asyncio.Task[None] | None = None
+        self.watch_task: asyncio.Task[None] | None = None
+
+        self.connect_task = self.bot.loop.create_task(self.connect_nodes())
+
+        if get_config_option("MUSIC", "LIVE_NOW_PLAYING", False):
+            self.now_playing_task = self.bot.loop.create_task(self.live_now_playing.run())
+
+        if get_config_option("MUSIC", "SNAPSHOT_INTERVAL", 30) > 0:
+            self.snapshot_task = self.bot.loop.create_task(self.save_player_states_periodically())
+
+    async def cog_unload(self) -> None:
+        """Stop the background tasks, a reloaded cog starts its own."""
+        self.live_now_playing.stop()
+
+        for task in (self.connect_task, self.watch_task, self.now_playing_task, self.snapshot_task):
+            if task is not None:
+                task.cancel()
 
     async def connect_nodes(self):
         """Connect to lavalink nodes."""
         await self.bot.wait_until_ready()
-        await wavelink.Pool.connect(client=self.bot, nodes=self.nodes, cache_capacity=100)
+        await wavelink.Pool.connect(client=self.bot, nodes=self.nodes)
+
+        self.watch_task = self.bot.loop.create_task(self.watch_nodes())
+
+    async def watch_nodes(self):
+        """Keep the node stats fresh, and move the players off the nodes that went away."""
+        while not self.bot.is_closed():
+            await asyncio.sleep(NODE_CHECK_INTERVAL)
+
+            try:
+                await self.balancer.refresh()
+                await self.migrate_stranded_players()
+            except Exception:
+                logging.exception("Unable to check the Lavalink nodes!")
+
+    async def migrate_stranded_players(self):
+        """Move every player whose node is not connected anymore to the best healthy node."""
+        stranded = [
+            player
+            for player in self.bot.voice_clients
+            if isinstance(player, NamelessPlayer) and player.node.status is not wavelink.NodeStatus.CONNECTED
+        ]
+
+        for player in stranded:
+            old_node = player.node
+
+            try:
+                node = self.balancer.best_node(exclude=old_node)
+            except wavelink.InvalidNodeException:
+                logging.warning(
+                    "%d player(s) lost their node, and there is no healthy node to move them to", len(stranded)
+                )
+                return
+
+            started = time.perf_counter()
+
+            try:
+                await player.switch_node(node)
+            except (wavelink.LavalinkException, wavelink.NodeException) as err:
+                logging.warning("Unable to move the player of guild %s: %s", player.guild.id, repr(err))
+                continue
+
+            self.balancer.count_placement(node)
+
+            logging.info(
+                "Lavalink migration: guild=%s from=%s to=%s elapsed_ms=%.1f",
+                player.guild.id,
+                old_node.identifier,
+                node.identifier,
+                (time.perf_counter() - started) * 1000,
+            )
 
     @staticmethod
     @ttl_cache(ttl=300)
@@ -63,6 +172,139 @@ class MusicCommands(commands.GroupCog, name="music"):
     async def on_wavelink_node_ready(self, payload: wavelink.NodeReadyEventPayload):
         logging.info("Node {%s} (%s) is ready!", payload.node.identifier, payload.node.uri)
 
+        if not self.players_restored:
+            self.players_restored = True
+            self.bot.loop.create_task(self.restore_players(payload.node))
+
+    @commands.Cog.listener()
+    async def on_wavelink_node_closed(self, node: wavelink.Node, disconnected: list[wavelink.Player]):
+        """
+        Bring the players of a closed node back on another one right away.
+        Wavelink disconnects them before telling, so they are reconnected from a snapshot.
+        A dropped connection is not told about, the node watcher moves those players.
+        """
+        logging.warning("Node {%s} closed, %d player(s) were disconnected", node.identifier, len(disconnected))
+
+        if self.bot.is_closed():
+            return
+
+        snapshots = [
+            self.snapshot_player(player)
+            for player in disconnected
+            if isinstance(player, NamelessPlayer) and player.channel
+        ]
+
+        if not snapshots:
+            return
+
+        try:
+            target = self.balancer.best_node(exclude=node)
+        except wavelink.InvalidNodeException:
+            logging.warning("There is no healthy node to move the %d player(s) to", len(snapshots))
+            return
+
+        await self.restore_snapshots(target, snapshots)
+
+    @staticmethod
+    def snapshot_player(player: NamelessPlayer) -> DbPlayerSnapshot:
+        """Capture what is needed to resume a player after a restart."""
+        track = player.current
+
+        snapshot = DbPlayerSnapshot(player.guild.id, player.channel.id)
+        snapshot.trigger_channel_id = player.trigger_channel_id
+        snapshot.play_now_allowed = bool(player.play_now_allowed)
+        snapshot.current_track = track.encoded if track else ""
+        snapshot.position = player.position if track and not track.is_stream else 0
+        snapshot.paused = player.paused
+        snapshot.volume = player.volume
+        snapshot.queue_mode = player.queue.mode.value
+        snapshot.autoplay = player.autoplay.value
+        snapshot.queue = [queued.encoded for queued in player.queue]
+
+        return snapshot
+
+    async def save_player_states(self):
+        """Save the state of every connected player, replacing the previous save."""
+        # Until the saved players are restored, saving would overwrite them with nothing.
+        if not self.players_restored:
+            return
+
+        snapshots = [
+            self.snapshot_player(player)
+            for player in self.bot.voice_clients
+            if isinstance(player, NamelessPlayer) and player.connected and player.channel
+        ]
+
+        await AsyncCRUD.replace_player_snapshots(snapshots)
+        logging.debug("Saved the state of %d music player(s)", len(snapshots))
+
+    async def save_player_states_periodically(self):
+        """Save the players regularly, a crash loses SNAPSHOT_INTERVAL seconds at most."""
+        await self.bot.wait_until_ready()
+
+        while not self.bot.is_closed():
+            await asyncio.sleep(get_config_option("MUSIC", "SNAPSHOT_INTERVAL", 30))
+
+            try:
+                await self.save_player_states()
+            except Exception:
+                logging.exception("Unable to save the music player states!")
+
+    async def restore_players(self, node: wavelink.Node):
+        """Bring the saved players back, playing from where they were."""
+        await self.restore_snapshots(node, await AsyncCRUD.get_player_snapshots())
+
+    async def restore_snapshots(self, node: wavelink.Node, snapshots: list[DbPlayerSnapshot]):
+        """Restore the players of these snapshots, the tracks are decoded by the given node."""
+        results = await asyncio.gather(
+            *[self.restore_player(node, snapshot) for snapshot in snapshots], return_exceptions=True
+        )
+
+        for snapshot, result in zip(snapshots, results, strict=True):
+            if isinstance(result, Exception):
+                logging.warning("Unable to restore the music player of guild %s: %s", snapshot.discord_id, repr(result))
+
+        logging.info("Restored %d of %d music player(s)", results.count(True), len(snapshots))
+
+    async def restore_player(self, node: wavelink.Node, snapshot: DbPlayerSnapshot) -> bool:
+        """
+        Reconnect a saved player, the tracks are decoded by Lavalink in one request instead of searched again.
+        :return: Whether the player was restored, it is not if its guild or channel is gone.
+        """
+        guild = self.bot.get_guild(snapshot.discord_id)
+        channel = guild.get_channel(snapshot.channel_id) if guild else None
+
+        if not isinstance(channel, discord.VoiceChannel | discord.StageChannel) or channel.guild.voice_client:
+            return False
+
+        encoded = [snapshot.current_track, *snapshot.queue] if snapshot.current_track else snapshot.queue
+        payloads = await node.send("POST", path="v4/decodetracks", data=encoded) if encoded else []
+        tracks = [wavelink.Playable(payload) for payload in payloads]
+
+        player = await channel.connect(
+            cls=NamelessPlayer(
+                nodes=[self.balancer.best_node()], compact_queue=get_config_option("MUSIC", "COMPACT_QUEUE", False)
+            ),
+            self_deaf=True,
+        )
+        self.balancer.count_placement(player.node)
+        player.trigger_channel_id = snapshot.trigger_channel_id
+        player.play_now_allowed = snapshot.play_now_allowed
+        player.queue.mode = QueueMode(snapshot.queue_mode)
+        player.autoplay = AutoPlayMode(snapshot.autoplay)
+
+        # Set on its own, wavelink takes a volume of 0 given to `play` for no volume and plays at 100.
+        await player.set_volume(snapshot.volume)
+
+        if snapshot.current_track:
+            current, tracks = tracks[0], tracks[1:]
+            player.queue.put(tracks)
+            await player.play(current, start=snapshot.position, paused=snapshot.paused)
+        else:
+            player.queue.put(tracks)
+
+        return True
+
     @commands.Cog.listener()
     async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload):
         player: NamelessPlayer = cast(NamelessPlayer, payload.player)
@@ -73,6 +315,25 @@ class MusicCommands(commands.GroupCog, name="music"):
             logging.warning("Player is not connected. Or we have been banned from the guild!")
             return
 
+        player.remember(track)
+
+        # The same track resuming on another node, not a new one.
+        if player.migrating:
+            player.migrating = False
+            return
+
+        if track.is_stream:
+            player.stream_start_time = discord.utils.utcnow()
+
+        if self.should_prefetch_recommendations(player):
+            task = asyncio.create_task(self.prefetch_recommendations(player))
+            self.prefetch_tasks.add(task)
+            task.add_done_callback(self.prefetch_tasks.discard)
+
+        if get_config_option("MUSIC", "LIVE_NOW_PLAYING", False):
+            self.refresh_now_playing(player)
+            return
+
         chn = player.guild.get_channel(player.trigger_channel_id)
 
         if not isinstance(chn, discord.abc.Messageable):
@@ -83,13 +344,10 @@ class MusicCommands(commands.GroupCog, name="music"):
         if not can_send:
             return
         else:
-            dbg = CRUD.get_or_create_guild_record(player.guild)
-
             embed = self.generate_embed_from_track(
                 player,
                 track,
                 self.bot.user,
-                dbg,
                 original is not None and original.recommended,
             )
 
@@ -97,9 +355,65 @@ class MusicCommands(commands.GroupCog, name="music"):
 
     @commands.Cog.listener()
     async def on_wavelink_inactive_player(self, player: wavelink.Player):
+        self.live_now_playing.forget(player.guild.id)
         await player.channel.send("I have been inactive for a while. Goodbye!")
         await player.disconnect()
 
+    @staticmethod
+    def recommendation_query(track: wavelink.Playable) -> str | None:
+        """Lavalink query for the tracks related to a track, the ones wavelink autoplay looks for."""
+        if track.source == "spotify":
+            return f"sprec:seed_tracks={track.identifier}&limit=10"
+
+        if track.source == "youtube":
+            return f"https://music.youtube.com/watch?v={track.identifier}&list=RD{track.identifier}"
+
+        return None
+
+    async def fetch_recommendations(self, track: wavelink.Playable) -> list[wavelink.Playable]:
+        """Get the tracks related to a track, from the cache if another guild asked lately."""
+        query = self.recommendation_query(track)
+
+        if query is None:
+            return []
+
+        results = await self.recommendation_cache.search(query, "recommendations", None)
+        return results.tracks if isinstance(results, wavelink.Playlist) else results
+
+    @staticmethod
+    def should_prefetch_recommendations(player: NamelessPlayer) -> bool:
+        """Whether autoplay picks the next track, and is running low on recommendations."""
+        return (
+            player.autoplay is AutoPlayMode.enabled
+            and player.queue.mode is QueueMode.normal
+            and not player.queue
+            and len(player.auto_queue) < AUTOPLAY_PREFETCH_THRESHOLD
+        )
+
+    async def prefetch_recommendations(self, player: NamelessPlayer):
+        """Fill the auto_queue while the current track plays, so the next one starts without waiting."""
+        track = player.current
+
+        if track is None:
+            return
+
+        try:
+            tracks = await self.fetch_recommendations(track)
+        except (wavelink.LavalinkException, wavelink.LavalinkLoadException, wavelink.NodeException) as err:
+            logging.warning("Unable to prefetch the recommendations of %s: %s", track.identifier, repr(err))
+            return
+
+        added = await player.add_recommendations(tracks)
+        logging.debug("Prefetched %d recommendation(s) for guild %s", added, player.guild.id)
+
+    def refresh_now_playing(self, player: NamelessPlayer):
+        """Update the live now-playing message of a player soon, if the player has one."""
+        if get_config_option("MUSIC", "LIVE_NOW_PLAYING", False) and player.play_now_allowed:
+            self.live_now_playing.mark(player)
+
+    def render_now_playing(self, player: NamelessPlayer) -> discord.Embed:
+        return self.generate_embed_from_track(player, player.current, self.bot.user, player.current.recommended)
+
     @commands.Cog.listener()
     async def on_voice_state_update(
         self,
@@ -110,69 +424,50 @@ class MusicCommands(commands.GroupCog, name="music"):
         if member.id == self.bot.user.id and not after.deaf:
             await member.edit(deafen=True)
 
-    def generate_embeds_from_tracks(
+    @staticmethod
+    def convert_time(milli: int) -> str:
+        td = str(datetime.timedelta(milliseconds=milli)).split(".")[0].split(":")
+        after_td = []
+        for t in td:
+            if t == "0":
+                continue
+            after_td.append(t.zfill(2))
+
+        return ":".join(after_td) or "00:00"
+
+    def generate_track_pages(
         self,
         tracks: wavelink.Queue | list[wavelink.Playable] | wavelink.Playlist,
         embed_title: str = "Tracks currently in queue",
-    ) -> list[discord.Embed]:
-        """Generate embeds from supported track list types."""
-        txt = ""
-        embeds: list[discord.Embed] = []
-        track_list: list[wavelink.Playable] = []
-
-        if isinstance(tracks, wavelink.Queue):
-            track_list = tracks.copy()._items
-
+        player: NamelessPlayer | None = None,
+    ) -> NamelessTrackPages:
+        """
+        Generate lazily rendered pages from supported track list types.
+        :param player: Player whose queue is shown, to tell when each track plays.
+        """
         if isinstance(tracks, wavelink.Playlist):
-            track_list = tracks.tracks
+            tracks = tracks.tracks
 
-        for i, track in enumerate(track_list, start=1):
-            upcoming = (
-                f"{i} - " f"[{track.title} by {self.resolve_artist_name(track.author)}]" f"({track.uri or 'N/A'})\n"
-            )
+        def render_line(position: int, track: wavelink.Playable) -> str:
+            line = f"{position} - [{track.title} by {self.resolve_artist_name(track.author)}]({track.uri or 'N/A'})"
 
-            if len(txt) + len(upcoming) > 2048:
-                eb = discord.Embed(
-                    title=embed_title,
-                    color=discord.Color.orange(),
-                    description=txt,
-                )
-                embeds.append(eb)
-                txt = upcoming
-            else:
-                txt += upcoming
+            if player is not None and (eta := player.time_until(position - 1)) is not None:
+                line += f" - plays in ~{self.convert_time(eta)}"
 
-        embeds.append(
-            discord.Embed(
-                title=embed_title,
-                color=discord.Color.orange(),
-                description=txt,
-            )
-        )
+            return line + "\n"
 
-        return embeds
+        return NamelessTrackPages(tracks, embed_title, render_line)
 
     def generate_embed_from_track(
         self,
         player: NamelessPlayer,
         track: wavelink.Playable | None,
         user: discord.User | discord.Member | discord.ClientUser | None,
-        dbg,
         is_recommended=False,
     ) -> discord.Embed:
         assert user is not None
         assert track is not None
 
-        def convert_time(milli):
-            td = str(datetime.timedelta(milliseconds=milli)).split(".")[0].split(":")
-            after_td = []
-            for t in td:
-                if t == "0":
-                    continue
-                after_td.append(t.zfill(2))
-
-            return ":".join(after_td)
-
         # thumbnail_url: str = await track. if isinstance(track, wavelink.TrackSource.YouTube) else ""
         thumbnail_url: str = track.artwork if track.artwork else ""
         is_stream = track.is_stream
@@ -211,9 +506,12 @@ class MusicCommands(commands.GroupCog, name="music"):
             .add_field(
                 name="Playtime" if is_stream else "Position",
                 value=str(
-                    discord.utils.utcnow().replace(tzinfo=None) - dbg.radio_start_time
+                    self.convert_time(
+                        (discord.utils.utcnow() - player.stream_start_time) // datetime.timedelta(milliseconds=1)
+                    )
                     if is_stream
-                    else f"{convert_time(player.position)}/{convert_time(track.length)}"
+                    else f"{self.make_progress_bar(player.position, track.length)}\n"
+                    f"{self.convert_time(player.position)}/{self.convert_time(track.length)}"
                 ),
             )
             # .add_field(name="Looping", value="This is a stream" if is_stream else vc.queue.loop)
@@ -223,25 +521,25 @@ class MusicCommands(commands.GroupCog, name="music"):
 
         if player.queue.mode != QueueMode.loop and not track.is_stream and bool(player.queue):
             next_tr = player.queue[0]
+            eta = player.time_until(0)
             embed.add_field(
                 name="Next track",
                 value=f"[{escape_markdown(next_tr.title) if next_tr.title else 'Unknown title'} "
                 f"by {self.resolve_artist_name(next_tr.author)}]"
-                f"({next_tr.uri or 'N/A'})",
+                f"({next_tr.uri or 'N/A'})" + (f"\nPlays in ~{self.convert_time(eta)}" if eta is not None else ""),
             )
 
         return embed
 
     @staticmethod
-    async def show_paginated_tracks(interaction: discord.Interaction, embeds: list[discord.Embed]):
-        view_menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed)
-        view_menu.add_pages(embeds)
+    def make_progress_bar(position: int, length: int, width: int = PROGRESS_BAR_WIDTH) -> str:
+        """Draw how far a track has played, as a line of `width` characters."""
+        done = min(width - 1, position * width // length) if length > 0 else 0
+        return "▬" * done + "🔘" + "▬" * (width - done - 1)
 
-        view_menu.add_button(ViewButton.back())
-        view_menu.add_button(ViewButton.end_session())
-        view_menu.add_button(ViewButton.next())
-
-        await view_menu.start()
+    @staticmethod
+    async def show_paginated_tracks(interaction: discord.Interaction, pages: NamelessTrackPages):
+        await NamelessPaginator(pages).start(interaction)
 
     @app_commands.command()
     @app_commands.guild_only()
@@ -251,11 +549,17 @@ class MusicCommands(commands.GroupCog, name="music"):
         await interaction.response.defer()
 
         try:
-            await cast(discord.Member, interaction.user).voice.channel.connect(cls=wavelink.Player, self_deaf=True)
+            await cast(discord.Member, interaction.user).voice.channel.connect(
+                cls=NamelessPlayer(
+                    nodes=[self.balancer.best_node()], compact_queue=get_config_option("MUSIC", "COMPACT_QUEUE", False)
+                ),
+                self_deaf=True,
+            )
             await interaction.followup.send("Connected to your voice channel")
 
             player = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
             player.trigger_channel_id = interaction.channel.id  # type: ignore
+            self.balancer.count_placement(player.node)
 
         except ClientException:
             await interaction.followup.send("Already connected")
@@ -274,12 +578,61 @@ class MusicCommands(commands.GroupCog, name="music"):
             return
 
         try:
+            self.live_now_playing.forget(player.guild.id)
             await player.disconnect(force=True)
             player.cleanup()
             await interaction.followup.send("Disconnected from my own voice channel")
         except AttributeError:
             await interaction.followup.send("I am already disconnected!")
 
+    async def search_tracks(self, query: str, origin: str) -> wavelink.Search:
+        """Search for tracks from one origin, or from every origin if asked to."""
+        if origin != ALL_ORIGINS:
+            return await self.search_cache.search(query, origin, SOURCE_MAPPING[origin])
+
+        # Search prefixes are ignored for URLs, every source would give the same answer.
+        if query.strip().startswith(("http://", "https://")):
+            return await self.search_cache.search(query, "youtube", SOURCE_MAPPING["youtube"])
+
+        return await self.search_all_origins(query)
+
+    async def search_all_origins(self, query: str) -> list[wavelink.Playable]:
+        """
+        Search every origin concurrently, then merge their results, best matches of each origin first.
+        Worst case latency is the slowest source, capped by SEARCH_TIMEOUT, instead of the sum of them.
+        """
+
+        async def search_one(origin: str) -> list[wavelink.Playable]:
+            try:
+                results = await asyncio.wait_for(
+                    self.search_cache.search(query, origin, SOURCE_MAPPING[origin]), timeout=SEARCH_TIMEOUT
+                )
+            except (TimeoutError, wavelink.LavalinkLoadException) as err:
+                logging.warning("Searching %s for '%s' failed: %s", origin, query, repr(err))
+                return []
+
+            return results.tracks if isinstance(results, wavelink.Playlist) else results
+
+        results = await asyncio.gather(*[search_one(origin) for origin in SOURCE_MAPPING])
+
+        merged: list[wavelink.Playable] = []
+        seen: set[str | tuple[str, str]] = set()
+
+        for track in itertools.chain.from_iterable(itertools.zip_longest(*results)):
+            if track is None:
+                continue
+
+            # YouTube and YouTube Music share identifiers, other sources only share titles.
+            keys = (track.identifier, (track.title.casefold(), self.resolve_artist_name(track.author).casefold()))
+
+            if not seen.isdisjoint(keys):
+                continue
+
+            seen.update(keys)
+            merged.append(track)
+
+        return merged
+
     async def pick_track_from_results(
         self,
         interaction: discord.Interaction,
@@ -288,7 +641,8 @@ class MusicCommands(commands.GroupCog, name="music"):
         if len(tracks) == 1:
             return tracks
 
-        view = discord.ui.View().add_item(NamelessTrackDropdown([track for track in tracks if not track.is_stream]))
+        tracks = [track for track in tracks if not track.is_stream]
+        view = discord.ui.View().add_item(NamelessTrackDropdown(tracks))
         m: discord.WebhookMessage = await interaction.followup.send("Tracks found", view=view)  # type: ignore
 
         if await view.wait():
@@ -326,6 +680,7 @@ class MusicCommands(commands.GroupCog, name="music"):
             return
 
         await player.pause(True)
+        self.refresh_now_playing(player)
         await interaction.followup.send("Paused.")
 
     @app_commands.command()
@@ -343,6 +698,7 @@ class MusicCommands(commands.GroupCog, name="music"):
             return
 
         await player.pause(False)
+        self.refresh_now_playing(player)
         await interaction.followup.send("Resuming.")
 
     @app_commands.command()
@@ -378,10 +734,43 @@ class MusicCommands(commands.GroupCog, name="music"):
             await interaction.response.send_message("I am not playing anything.")
             return
 
-        dbg = CRUD.get_or_create_guild_record(interaction.guild)
-        embed = self.generate_embed_from_track(player, track, interaction.user, dbg)
+        embed = self.generate_embed_from_track(player, track, interaction.user)
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command()
+    @app_commands.guild_only()
+    @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
+    async def previous(self, interaction: discord.Interaction):
+        """Go back to the previous track, the current one is played next."""
+        await interaction.response.defer()
+
+        player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
+
+        previous = player.previous_track
+
+        if previous is None:
+            await interaction.followup.send("There is no previous track.")
+            return
+
+        if (
+            # The invoker has the MANAGE_GUILD
+            cast(discord.Member, interaction.user).guild_permissions.manage_guild
+            or
+            # Only you & the bot
+            len(player.client.users) == 2
+            or
+            # The voting passes.
+            await NamelessVoteMenu(interaction, player, "replay", previous.title).start()
+        ):
+            track = await player.play_previous()
+
+            if track is None:
+                await interaction.followup.send("There is no previous track.")
+            else:
+                await interaction.followup.send(f"Going back to **{escape_markdown(track.title)}**.")
+        else:
+            await interaction.followup.send(content="Nah, I'd pass.")
+
     @app_commands.command()
     @app_commands.guild_only()
     @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
@@ -454,9 +843,9 @@ class MusicCommands(commands.GroupCog, name="music"):
                 final_position = total_seconds * 1000 + milliseconds
 
             await player.seek(final_position)
+            self.refresh_now_playing(player)
 
-            dbg = CRUD.get_or_create_guild_record(interaction.guild)
-            embed = self.generate_embed_from_track(player, track, interaction.user, dbg)
+            embed = self.generate_embed_from_track(player, track, interaction.user)
             await interaction.followup.send(content="Seeked", embed=embed)
 
     queue = app_commands.Group(name="queue", description="Commands related to queue management.")
@@ -484,11 +873,11 @@ class MusicCommands(commands.GroupCog, name="music"):
     @app_commands.describe(
         source="Playlist URL or query search.",
         position="Position to add the playlist, '0' means at the end of queue.",
-        origin="Where to search for your source, defaults to 'YouTube' origin.",
+        origin="Where to search for your source, defaults to 'YouTube' origin. 'all' searches everywhere at once.",
         reverse="Whether to reverse the input track list before adding to queue. Has higher precedence.",
         shuffle="Whether to shuffle the input track list before adding to queue. Has lower precedence.",
     )
-    @app_commands.choices(origin=[Choice(name=k, value=k) for k in SOURCE_MAPPING])
+    @app_commands.choices(origin=[Choice(name=k, value=k) for k in [*SOURCE_MAPPING, ALL_ORIGINS]])
     @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
     async def add(
         self,
@@ -505,7 +894,7 @@ class MusicCommands(commands.GroupCog, name="music"):
         player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)
         msg: str = ""
 
-        tracks: wavelink.Search = await wavelink.Playable.search(source, source=SOURCE_MAPPING[origin])
+        tracks: wavelink.Search = await self.search_tracks(source, origin)
 
         if not tracks:
             await interaction.followup.send("No results found.")
@@ -513,7 +902,7 @@ class MusicCommands(commands.GroupCog, name="music"):
 
         if isinstance(tracks, wavelink.Playlist):
             soon_added = tracks.tracks
-            msg = f"Added the playlist **`{tracks.name}`** ({tracks.tracks.count} songs) to the queue."
+            msg = f"Added the playlist **`{tracks.name}`** ({len(tracks.tracks)} songs) to the queue."
         else:
             soon_added = await self.pick_track_from_results(interaction, tracks)
 
@@ -521,28 +910,75 @@ class MusicCommands(commands.GroupCog, name="music"):
                 await interaction.followup.send("Nothing will be added.")
                 return
 
-            msg = f"Added {soon_added.count} track(s) to the queue."
+            msg = f"Added {len(soon_added)} track(s) to the queue."
 
         if reverse:
-            player.queue._items = list(reversed(player.queue._items))
+            soon_added.reverse()
+        elif shuffle:
+            random.shuffle(soon_added)
 
-        if shuffle:
-            player.queue.shuffle()
+        for track in soon_added:
+            track.extras = {"requester_id": interaction.user.id}
 
-        if soon_added:
-            embeds = self.generate_embeds_from_tracks(soon_added, embed_title=msg)
-            self.bot.loop.create_task(self.show_paginated_tracks(interaction, embeds))
+        # Start playing right away, time to first audio must not depend on the playlist size.
+        if not player.current and not player.queue:
+            await player.play(soon_added[0])
+            task = self.bot.loop.create_task(self.ingest_tracks(player, soon_added[1:], position))
+        else:
+            task = self.bot.loop.create_task(self.ingest_tracks(player, soon_added, position, play_when_idle=True))
 
-        position_to_add = position if position >= 0 else -1
+        self.ingest_tasks.add(task)
+        task.add_done_callback(self.ingest_tasks.discard)
 
-        if position_to_add == 0:
-            await player.queue.put_wait(soon_added)
-        else:
-            position -= 1
-            player.queue._items = player.queue._items[:position] + soon_added + player.queue._items[position:]
+        pages = self.generate_track_pages(soon_added, embed_title=msg)
+        self.bot.loop.create_task(self.show_paginated_tracks(interaction, pages))
+
+    @staticmethod
+    async def ingest_tracks(
+        player: NamelessPlayer, tracks: list[wavelink.Playable], position: int = 0, play_when_idle: bool = False
+    ):
+        """
+        Add tracks to the queue in chunks, yielding to the event loop between them.
+        Adds to the same player wait for each other, so their chunks never interleave.
+        :param position: 1-based position to insert the tracks at, '0' means at the end of queue.
+        :param play_when_idle: Whether to start playing the queue once the first chunk is in.
+        """
+        async with player.ingest_lock:
+            offset = max(position - 1, 0)
+
+            for i in range(0, len(tracks), INGEST_CHUNK_SIZE):
+                if not player.connected:
+                    return
+
+                chunk = tracks[i : i + INGEST_CHUNK_SIZE]
+
+                if position == 0:
+                    player.queue.put(chunk)
+                else:
+                    # Right after the previous chunk.
+                    offset += player.queue.put_many_at(offset, chunk)
+
+                if play_when_idle and not player.current and player.queue:
+                    await player.play(player.queue.get())
+                    offset = max(offset - 1, 0)
 
-        if not player.current:
-            await player.play(player.queue.get())
+                await asyncio.sleep(0)
+
+    @queue.command()
+    @app_commands.guild_only()
+    @app_commands.check(MusicCommandChecks.bot_in_voice)
+    async def history(self, interaction: discord.Interaction):
+        """View the recently played tracks, newest first."""
+        await interaction.response.defer()
+
+        player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
+
+        if not player.play_history:
+            await interaction.followup.send("Nothing has been played yet.")
+            return
+
+        pages = self.generate_track_pages(list(reversed(player.play_history)), embed_title="Recently played")
+        self.bot.loop.create_task(self.show_paginated_tracks(interaction, pages))
 
     @queue.command()
     @app_commands.guild_only()
@@ -556,8 +992,12 @@ class MusicCommands(commands.GroupCog, name="music"):
             await interaction.followup.send("Wow, such empty queue. Mind adding some cool tracks?")
             return
 
-        embeds = self.generate_embeds_from_tracks(player.queue)
-        self.bot.loop.create_task(self.show_paginated_tracks(interaction, embeds))
+        pages = self.generate_track_pages(
+            player.queue,
+            embed_title=f"Tracks currently in queue ({self.convert_time(player.queue.duration)} in total)",
+            player=player,
+        )
+        self.bot.loop.create_task(self.show_paginated_tracks(interaction, pages))
 
     @queue.command()
     @app_commands.guild_only()
@@ -574,8 +1014,8 @@ class MusicCommands(commands.GroupCog, name="music"):
             )
             return
 
-        embeds = self.generate_embeds_from_tracks(player.auto_queue, embed_title="Autoplay queue")
-        self.bot.loop.create_task(self.show_paginated_tracks(interaction, embeds))
+        pages = self.generate_track_pages(player.auto_queue, embed_title="Autoplay queue")
+        self.bot.loop.create_task(self.show_paginated_tracks(interaction, pages))
 
     @queue.command()
     @app_commands.guild_only()
@@ -591,7 +1031,11 @@ class MusicCommands(commands.GroupCog, name="music"):
             return
 
         player.auto_queue.clear()
-        await player._do_recommendation()
+
+        if player.current is not None:
+            await player.add_recommendations(await self.fetch_recommendations(player.current))
+        else:
+            await player._do_recommendation()
 
         await interaction.followup.send("Repopulated autoplay queue!")
 
@@ -613,13 +1057,67 @@ class MusicCommands(commands.GroupCog, name="music"):
 
         index = index - 1
 
-        deleted_track = player.queue.get_at(index)
+        deleted_track = player.queue[index]
         player.queue.delete(index)
 
         await interaction.followup.send(
-            f"Deleted track #{index}: **{deleted_track.title}** from **{deleted_track.author}**"
+            f"Deleted track #{index + 1}: **{deleted_track.title}** from **{deleted_track.author}**"
         )
 
+    @queue.command()
+    @app_commands.guild_only()
+    @app_commands.describe(start="The first index to remove.", end="The last index to remove.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
+    @app_commands.check(MusicCommandChecks.queue_has_element)
+    async def delete_range(self, interaction: discord.Interaction, start: Range[int, 1], end: Range[int, 1]):
+        """Remove every track from one position to another, both included."""
+        await interaction.response.defer()
+
+        player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
+
+        if start > end or start > player.queue.count:
+            await interaction.followup.send("Oops! You picked the positions beyond the queue.")
+            return
+
+        deleted = player.queue.delete_range(start - 1, end)
+        await interaction.followup.send(f"Deleted {deleted} track(s), from #{start} to #{start + deleted - 1}.")
+
+    @queue.command()
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
+    @app_commands.check(MusicCommandChecks.queue_has_element)
+    async def dedupe(self, interaction: discord.Interaction):
+        """Remove the tracks queued more than once, the first of them stays."""
+        await interaction.response.defer()
+
+        player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
+
+        deleted = player.queue.dedupe()
+        await interaction.followup.send(f"Removed {deleted} duplicated track(s).")
+
+    @queue.command()
+    @app_commands.guild_only()
+    @app_commands.describe(member="The member whose tracks are removed.")
+    @app_commands.check(MusicCommandChecks.user_and_bot_in_voice)
+    @app_commands.check(MusicCommandChecks.queue_has_element)
+    async def remove_user(self, interaction: discord.Interaction, member: discord.Member):
+        """Remove every track added by a member - anyone can remove their own, MANAGE_GUILD is needed otherwise."""
+        await interaction.response.defer()
+
+        player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
+
+        if (
+            member.id != interaction.user.id
+            and not cast(discord.Member, interaction.user).guild_permissions.manage_guild
+        ):
+            await interaction.followup.send("You can only remove your own tracks.")
+            return
+
+        deleted = player.queue.remove_where(lambda track: dict(track.extras).get("requester_id") == member.id)
+        await interaction.followup.send(f"Removed {deleted} track(s) added by {member.mention}.")
+
     @queue.command()
     @app_commands.guild_only()
     @app_commands.describe(pos="Current position.", value="Position value.", mode="Move mode.")
@@ -647,9 +1145,7 @@ class MusicCommands(commands.GroupCog, name="music"):
             await interaction.followup.send(f"Invalid position(s): `before: {before} -> after: {after}`")
             return
 
-        track_temp = player.queue.get_at(before - 1)
-        player.queue.delete(before - 1)
-        player.queue.put_at(after - 1, track_temp)
+        player.queue.move(before - 1, after - 1)
 
         await interaction.followup.send(f"Moved track from #{before} to #{after}")
 
@@ -742,6 +1238,11 @@ class MusicCommands(commands.GroupCog, name="music"):
         player: NamelessPlayer = cast(NamelessPlayer, interaction.guild.voice_client)  # type: ignore
         player.play_now_allowed = bool(value)
 
+        if player.play_now_allowed:
+            self.refresh_now_playing(player)
+        else:
+            self.live_now_playing.forget(player.guild.id)
+
         await interaction.followup.send(f"Now playing message is now {'on' if player.play_now_allowed else 'off'}")
 
     @config.command()
@@ -795,6 +1296,7 @@ class MusicCommands(commands.GroupCog, name="music"):
             return
 
         player.queue.mode = enum_mode
+        self.refresh_now_playing(player)
         await interaction.followup.send(f"Loop mode set to {normalize_enum_name(enum_mode)}")
 
 
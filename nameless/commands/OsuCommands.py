@@ -6,11 +6,10 @@ from discord import Color, app_commands
 from discord.app_commands import Choice, Range
 from discord.ext import commands
 from ossapi import GameMode, Ossapi, Score, ScoreType, User, UserLookupKey
-from reactionmenu import ViewButton, ViewMenu
 
 from nameless import Nameless
-from nameless.customs.ui_kit import NamelessYNPrompt
-from nameless.database import CRUD
+from nameless.customs.ui_kit import NamelessPaginator, NamelessYNPrompt
+from nameless.database import AsyncCRUD
 from NamelessConfig import NamelessConfig
 
 __all__ = ["OsuCommands"]
@@ -48,7 +47,7 @@ class OsuCommands(commands.GroupCog, name="osu"):
     async def profile(self, interaction: discord.Interaction, member: discord.Member | None):
         """View someone's osu! *linked* profile"""
         await interaction.response.defer()
-        db_user = CRUD.get_or_create_user_record(member if member else interaction.user)
+        db_user = await AsyncCRUD.get_or_create_user_record(member if member else interaction.user)
 
         if not db_user.osu_username:
             if member is None:
@@ -81,8 +80,9 @@ class OsuCommands(commands.GroupCog, name="osu"):
     async def update(self, interaction: discord.Interaction, username: str, mode: str = "osu"):
         """Update your linked profile with me"""
         await interaction.response.defer()
-        db_user = CRUD.get_or_create_user_record(interaction.user)
+        db_user = await AsyncCRUD.get_or_create_user_record(interaction.user)
         db_user.osu_username, db_user.osu_mode = username, mode.title()
+        await AsyncCRUD.save_user_record(db_user)
 
         await interaction.followup.send("Successfully updated your profile details with me! Yay!")
 
@@ -95,11 +95,60 @@ class OsuCommands(commands.GroupCog, name="osu"):
     ):
         """Force database to update a member's auto search. For guild managers."""
         await interaction.response.defer()
-        db_user = CRUD.get_or_create_user_record(member)
+        db_user = await AsyncCRUD.get_or_create_user_record(member)
         db_user.osu_username, db_user.osu_mode = username, mode.title()
+        await AsyncCRUD.save_user_record(db_user)
 
         await interaction.followup.send(f"Successfully updated the profile details of **@{member.display_name}**!")
 
+    @staticmethod
+    def make_score_embed(position: int, score: Score) -> discord.Embed:
+        beatmap_set = score.beatmapset
+        beatmap = score.beatmap
+        sender = score.user()
+        score_stats = score.statistics
+
+        return (
+            discord.Embed(
+                description=f"Score position #{position}",
+                color=Color.brand_red(),
+                timestamp=datetime.datetime.now(),
+            )
+            .set_author(
+                name=f"{beatmap_set.artist} - {beatmap_set.title} [{beatmap.version if beatmap else '???'}] "
+                if beatmap_set
+                else "No map found online!" f"+{score.mods.long_name().replace(' ', '')}",
+                url=beatmap.url if beatmap else "",
+                icon_url=sender.avatar_url,
+            )
+            .set_thumbnail(url=beatmap_set.covers.cover_2x if beatmap_set and beatmap_set.covers else "")
+            .add_field(
+                name="Score",
+                value=f"{sender.country_code} #{score.rank_country} - GLB #{score.rank_global}",
+                inline=False,
+            )
+            .add_field(name="Ranking", value=score.rank.name)
+            .add_field(name="Accuracy", value=f"{round(score.accuracy * 100, 2)}%")
+            .add_field(
+                name="Max combo",
+                value=f"{score.max_combo}x/{beatmap.max_combo if beatmap and beatmap.max_combo else '???'}x",
+            )
+            .add_field(
+                name="Hit count",
+                value=f"{score_stats.count_300}/"
+                f"{score_stats.count_100}/"
+                f"{score_stats.count_50}/"
+                f"{score_stats.count_miss}",
+            )
+            .add_field(
+                name="PP",
+                value=f"{score.pp} * {round(score.weight.percentage, 3)}% = {round(score.weight.pp, 3)}"
+                if score.weight is not None
+                else "0",
+            )
+            .add_field(name="Submission time", value=f"<t:{int(score.created_at.timestamp())}:R>")
+        )
+
     async def __generic_check(
         self,
         interaction: discord.Interaction,
@@ -194,68 +243,9 @@ class OsuCommands(commands.GroupCog, name="osu"):
                 await m.edit(content="No suitable scores found", view=None)
                 return
 
-            embeds = []
-
-            for idx, score in enumerate(scores):
-                beatmap_set = score.beatmapset
-                beatmap = score.beatmap
-                sender = score.user()
-                score_stats = score.statistics
-
-                embed = (
-                    discord.Embed(
-                        description=f"Score position #{idx + 1}",
-                        color=Color.brand_red(),
-                        timestamp=datetime.datetime.now(),
-                    )
-                    .set_author(
-                        name=f"{beatmap_set.artist} - {beatmap_set.title} [{beatmap.version if beatmap else '???'}] "
-                        if beatmap_set
-                        else "No map found online!" f"+{score.mods.long_name().replace(' ', '')}",
-                        url=beatmap.url if beatmap else "",
-                        icon_url=sender.avatar_url,
-                    )
-                    .set_thumbnail(url=beatmap_set.covers.cover_2x if beatmap_set and beatmap_set.covers else "")
-                    .add_field(
-                        name="Score",
-                        value=f"{sender.country_code} #{score.rank_country} - GLB #{score.rank_global}",
-                        inline=False,
-                    )
-                    .add_field(name="Ranking", value=score.rank.name)
-                    .add_field(name="Accuracy", value=f"{round(score.accuracy * 100, 2)}%")
-                    .add_field(
-                        name="Max combo",
-                        value=f"{score.max_combo}x/{beatmap.max_combo if beatmap and beatmap.max_combo else '???'}x",
-                    )
-                    .add_field(
-                        name="Hit count",
-                        value=f"{score_stats.count_300}/"
-                        f"{score_stats.count_100}/"
-                        f"{score_stats.count_50}/"
-                        f"{score_stats.count_miss}",
-                    )
-                    .add_field(
-                        name="PP",
-                        value=f"{score.pp} * {round(score.weight.percentage, 3)}% = {round(score.weight.pp, 3)}"
-                        if score.weight is not None
-                        else "0",
-                    )
-                    .add_field(name="Submission time", value=f"<t:{int(score.created_at.timestamp())}:R>")
-                )
-
-                embeds.append(embed)
-
-            if len(embeds) != 1:
-                view_menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed)
-                view_menu.add_pages(embeds)
-
-                view_menu.add_button(ViewButton.back())
-                view_menu.add_button(ViewButton.end_session())
-                view_menu.add_button(ViewButton.next())
-
-                await view_menu.start()
-            else:
-                await m.edit(embed=embeds[0], view=None)
+            # Built as the pages are flipped, each score costs a request for its player.
+            score_embeds = (self.make_score_embed(idx + 1, score) for idx, score in enumerate(scores))
+            await NamelessPaginator(score_embeds).start(interaction, message=m)
 
     @app_commands.command()
     @app_commands.guild_only()
@@ -282,7 +272,7 @@ class OsuCommands(commands.GroupCog, name="osu"):
         """View osu! specific detail(s) of a member."""
         await interaction.response.defer()
 
-        db_user = CRUD.get_or_create_user_record(member if member else interaction.user)
+        db_user = await AsyncCRUD.get_or_create_user_record(member if member else interaction.user)
 
         if not db_user.osu_username:
             if member is None:
@@ -16,7 +16,9 @@ from discord.utils import escape_markdown
 import nameless.runtime_config as runtime_config
 from nameless import Nameless
 from nameless.commands.checks import BaseCheck
+from nameless.customs import NamelessSearchCache
 from nameless.customs.ui_kit import NamelessModal
+from nameless.database import AsyncCRUD
 
 __all__ = ["OwnerCommands"]
 
@@ -101,6 +103,10 @@ class OwnerCommands(commands.Cog):
         await interaction.response.defer()
         await interaction.followup.send("See you soon!")
 
+        # `os.execl` skips `close()`, save what would be lost by hand.
+        await self.bot.save_player_states()
+        await AsyncCRUD.close()
+
         os.execl(sys.executable, sys.executable, *sys.argv)
 
     @app_commands.command()
@@ -181,6 +187,50 @@ class OwnerCommands(commands.Cog):
 
         await interaction.followup.send("Command cleaning done, you should restart me to update the new commands")
 
+    @app_commands.command()
+    @app_commands.guild_only()
+    @BaseCheck.owns_the_bot()
+    async def cache_stats(self, interaction: discord.Interaction):
+        """View hit rates of the in-memory caches."""
+        await interaction.response.defer()
+
+        guild_cache = AsyncCRUD.guild_cache
+        embed = discord.Embed(
+            title="Cache statistics", timestamp=datetime.datetime.now(), color=discord.Color.orange()
+        ).add_field(
+            name="Guild settings",
+            value=f"{len(guild_cache)} entries\n"
+            f"{guild_cache.hits} hits, {guild_cache.misses} misses\n"
+            f"Hit rate: {guild_cache.hit_rate:.2%}",
+            inline=False,
+        )
+
+        search_cache: NamelessSearchCache | None = getattr(self.bot.get_cog("music"), "search_cache", None)
+
+        if search_cache is not None:
+            embed.add_field(
+                name="Music searches",
+                value=f"{len(search_cache)} entries\n"
+                f"{search_cache.hits} hits, {search_cache.negative_hits} empty hits, {search_cache.misses} misses\n"
+                f"Hit rate: {search_cache.hit_rate:.2%}",
+                inline=False,
+            )
+
+        recommendation_cache: NamelessSearchCache | None = getattr(
+            self.bot.get_cog("music"), "recommendation_cache", None
+        )
+
+        if recommendation_cache is not None:
+            embed.add_field(
+                name="Autoplay recommendations",
+                value=f"{len(recommendation_cache)} entries\n"
+                f"{recommendation_cache.hits} hits, {recommendation_cache.misses} misses\n"
+                f"Hit rate: {recommendation_cache.hit_rate:.2%}",
+                inline=False,
+            )
+
+        await interaction.followup.send(embed=embed)
+
 
 async def setup(bot: Nameless):
     await bot.add_cog(OwnerCommands(bot))
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import cast
 
@@ -6,23 +7,223 @@ from discord import app_commands
 from discord.ext import commands
 
 import nameless
-from nameless import Nameless
-from nameless.database import CRUD
+from nameless import Nameless, get_config_option
+from nameless.database import AsyncCRUD
 
 __all__ = ["VoiceMasterCommands"]
 
 
 class VoiceMasterCommands(commands.GroupCog, name="voicemaster"):
+    # Owner ID of the pooled rooms, nobody owns them yet.
+    POOLED_ROOM_OWNER_ID = 0
+
     def __init__(self, bot: nameless.Nameless):
         super().__init__()
         self.bot = bot
 
+        # In-memory index of the VoiceRooms table.
         # user_id -> voice_channel_id
         self.channel_track: dict[int, int] = {}
 
         # voice_channel_id -> user_id
         self.channel_owner: dict[int, int] = {}
 
+        # voice_channel_id -> guild_id, of the owned rooms
+        self.channel_guild: dict[int, int] = {}
+
+        # guild_id -> hidden voice_channel_ids, ready to be handed over
+        self.channel_pool: dict[int, list[int]] = {}
+
+        # Configured master channels, across every guild.
+        self.master_channel_ids: set[int] = set()
+
+        self.pool_size: int = get_config_option("VOICE_MASTER", "POOL_SIZE", 0)
+        self.refilling_guild_ids: set[int] = set()
+
+    async def cog_load(self) -> None:
+        self.master_channel_ids = await AsyncCRUD.get_voice_room_channel_ids()
+
+        for room in await AsyncCRUD.get_voice_room_records():
+            if room.owner_id == self.POOLED_ROOM_OWNER_ID:
+                self.channel_pool.setdefault(room.guild_id, []).append(room.discord_id)
+            else:
+                self.track_room(room.discord_id, room.owner_id, room.guild_id)
+
+        self.bot.loop.create_task(self.reconcile_rooms())
+
+    def track_room(self, channel_id: int, owner_id: int, guild_id: int) -> None:
+        self.channel_track[owner_id] = channel_id
+        self.channel_owner[channel_id] = owner_id
+        self.channel_guild[channel_id] = guild_id
+
+    def untrack_room(self, channel_id: int) -> None:
+        if (owner_id := self.channel_owner.pop(channel_id, None)) is not None:
+            self.channel_track.pop(owner_id, None)
+
+        self.channel_guild.pop(channel_id, None)
+
+        for pool in self.channel_pool.values():
+            if channel_id in pool:
+                pool.remove(channel_id)
+
+    async def reconcile_rooms(self):
+        """
+        Delete the rooms emptied while we were away, and adopt the populated ones again.
+        Pooled rooms are adopted back into their pool, up to the configured size, then pools are refilled.
+        Rooms of the guilds we cannot see right now are left alone, their channels are missing, not deleted.
+        """
+        await self.bot.wait_until_ready()
+
+        gone: list[int] = []
+        empty: list[discord.VoiceChannel] = []
+
+        def is_available(guild_id: int | None) -> bool:
+            guild = self.bot.get_guild(guild_id) if guild_id is not None else None
+            return guild is not None and not guild.unavailable
+
+        for channel_id in list(self.channel_owner):
+            if not is_available(self.channel_guild.get(channel_id)):
+                continue
+
+            channel = self.bot.get_channel(channel_id)
+
+            if not isinstance(channel, discord.VoiceChannel):
+                gone.append(channel_id)
+            elif not channel.members:
+                empty.append(channel)
+
+        for guild_id, pool in self.channel_pool.items():
+            if not is_available(guild_id):
+                continue
+
+            kept = 0
+
+            for channel_id in pool:
+                channel = self.bot.get_channel(channel_id)
+
+                if not isinstance(channel, discord.VoiceChannel):
+                    gone.append(channel_id)
+                elif kept >= self.pool_size:
+                    empty.append(channel)
+                else:
+                    kept += 1
+
+        results = await asyncio.gather(
+            *[vc.delete(reason="Orphaned voice room") for vc in empty], return_exceptions=True
+        )
+        deleted = [
+            vc.id
+            for vc, result in zip(empty, results, strict=True)
+            if not isinstance(result, Exception) or isinstance(result, discord.NotFound)
+        ]
+
+        # Rooms that could not be deleted stay tracked, the next sweep tries again.
+        stale = gone + deleted
+
+        for channel_id in stale:
+            self.untrack_room(channel_id)
+
+        await AsyncCRUD.delete_voice_room_records(stale)
+
+        logging.info(
+            "Voice rooms reconciled: %d deleted (%d failed), %d already gone, %d adopted, %d pooled",
+            len(deleted),
+            len(empty) - len(deleted),
+            len(gone),
+            len(self.channel_owner),
+            sum(len(pool) for pool in self.channel_pool.values()),
+        )
+
+        for master_id in self.master_channel_ids:
+            if isinstance(master := self.bot.get_channel(master_id), discord.VoiceChannel):
+                self.schedule_pool_refill(master)
+
+    def schedule_pool_refill(self, master: discord.VoiceChannel) -> None:
+        """Refill the room pool of the master channel guild in the background, unless it is being refilled."""
+        if self.pool_size <= 0 or master.guild.id in self.refilling_guild_ids:
+            return
+
+        self.refilling_guild_ids.add(master.guild.id)
+        self.bot.loop.create_task(self.refill_pool(master))
+
+    async def refill_pool(self, master: discord.VoiceChannel):
+        """Create hidden rooms next to the master channel, until the guild pool is full."""
+        guild = master.guild
+        pool = self.channel_pool.setdefault(guild.id, [])
+        hidden = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True),
+        }
+
+        try:
+            while len(pool) < self.pool_size:
+                vc = await guild.create_voice_channel(
+                    "Voice room", category=master.category, position=master.position + 1, overwrites=hidden
+                )
+
+                try:
+                    await AsyncCRUD.create_voice_room_record(vc.id, guild.id, self.POOLED_ROOM_OWNER_ID)
+                except Exception:
+                    # Nothing would ever clean up a room the database does not know about.
+                    logging.exception("Unable to record a pooled voice room of guild %s, deleting it!", guild.id)
+                    await vc.delete(reason="Unable to record the voice room")
+                    return
+
+                pool.append(vc.id)
+        except discord.HTTPException as err:
+            logging.warning("Unable to refill the voice room pool of guild %s: %s", guild.id, err)
+        finally:
+            self.refilling_guild_ids.discard(guild.id)
+
+    async def take_pooled_room(
+        self, member: discord.Member, master: discord.VoiceChannel
+    ) -> discord.VoiceChannel | None:
+        """
+        Hand a pooled room over to a member, renamed and as visible as the master channel.
+        :return: The room, or None if the pool ran dry.
+        """
+        pool = self.channel_pool.get(member.guild.id, [])
+        taken: discord.VoiceChannel | None = None
+        gone: list[int] = []
+        failed: list[int] = []
+
+        try:
+            while pool:
+                channel_id = pool.pop()
+
+                if isinstance(vc := member.guild.get_channel(channel_id), discord.VoiceChannel):
+                    try:
+                        await vc.edit(name=f"@{member.name}'s Voice", overwrites=master.overwrites)
+                    except discord.NotFound:
+                        pass
+                    except discord.HTTPException as err:
+                        # Still there, it goes back to the pool once we are done.
+                        logging.warning("Unable to hand pooled voice room %s over: %s", channel_id, err)
+                        failed.append(channel_id)
+                        continue
+                    else:
+                        self.track_room(vc.id, member.id, member.guild.id)
+                        taken = vc
+                        break
+
+                # Deleted behind our back.
+                gone.append(channel_id)
+
+            pool[:0] = failed
+
+            # Written in one go once Discord is done, a scope is never held across an API call.
+            if taken or gone:
+                async with AsyncCRUD.session_scope() as session:
+                    if gone:
+                        await AsyncCRUD.delete_voice_room_records(gone, session=session)
+
+                    if taken:
+                        await AsyncCRUD.set_voice_room_owner(taken.id, member.id, session=session)
+        finally:
+            self.schedule_pool_refill(master)
+
+        return taken
+
     @commands.Cog.listener()
     async def on_voice_state_update(
         self,
@@ -30,29 +231,33 @@ class VoiceMasterCommands(commands.GroupCog, name="voicemaster"):
         before: discord.VoiceState,
         after: discord.VoiceState,
     ):
-        db_guild = CRUD.get_or_create_guild_record(member.guild)
+        before_id = before.channel.id if before.channel else None
+        after_id = after.channel.id if after.channel else None
 
-        if db_guild.voice_room_channel_id == 0:
+        # Mute/deafen toggles, and channels we do not manage, are dropped without touching the database.
+        if before_id == after_id or (after_id not in self.master_channel_ids and before_id not in self.channel_owner):
             return
 
         is_a_join = before.channel is None and after.channel is not None
         is_a_leave = before.channel is not None and after.channel is None
 
         # If join to master channel, create the voice channel for that person, or just put them there.
-        if is_a_join and after.channel.id == db_guild.voice_room_channel_id:
+        if is_a_join and after_id in self.master_channel_ids:
             target_vc_id = self.channel_track.get(member.id, None)
-            vc: discord.VoiceChannel
+            master = cast(discord.VoiceChannel, after.channel)
+            vc: discord.VoiceChannel | None
 
             if target_vc_id is None:
-                current_category = after.channel.category
-                current_position = after.channel.position
-                vc = await after.channel.guild.create_voice_channel(
-                    f"@{member.name}'s Voice", category=current_category, position=current_position + 1
-                )
-                self.channel_track[member.id] = vc.id
-                self.channel_owner[vc.id] = member.id
+                vc = await self.take_pooled_room(member, master)
+
+                if vc is None:
+                    vc = await master.guild.create_voice_channel(
+                        f"@{member.name}'s Voice", category=master.category, position=master.position + 1
+                    )
+                    self.track_room(vc.id, member.id, member.guild.id)
+                    await AsyncCRUD.create_voice_room_record(vc.id, member.guild.id, member.id)
             else:
-                vc = cast(discord.VoiceChannel, after.channel.guild.get_channel(target_vc_id))
+                vc = cast(discord.VoiceChannel, master.guild.get_channel(target_vc_id))
 
             await member.move_to(vc)
 
@@ -61,13 +266,23 @@ class VoiceMasterCommands(commands.GroupCog, name="voicemaster"):
             is_a_leave
             # Did d.py had a bug???
             and len(before.channel.members) == 0
-            and self.channel_owner.get(before.channel.id, None) is not None
+            and before_id in self.channel_owner
         ):
+            self.untrack_room(before_id)
+            await AsyncCRUD.delete_voice_room_records([before_id])
+
             vc = cast(discord.VoiceChannel, before.channel.guild.get_channel(before.channel.id))
             await vc.delete()
 
-            del self.channel_track[member.id]
-            del self.channel_owner[before.channel.id]
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        # No one can join a deleted master channel, stop looking out for it.
+        self.master_channel_ids.discard(channel.id)
+
+        # Someone deleted a room by hand.
+        if channel.id in self.channel_owner or any(channel.id in pool for pool in self.channel_pool.values()):
+            self.untrack_room(channel.id)
+            await AsyncCRUD.delete_voice_room_records([channel.id])
 
     @app_commands.command()
     @app_commands.guild_only()
@@ -79,8 +294,12 @@ class VoiceMasterCommands(commands.GroupCog, name="voicemaster"):
 
         vc = await interaction.guild.create_voice_channel("Create your own VC!")
 
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
+        self.master_channel_ids.discard(db_guild.voice_room_channel_id)
+        self.master_channel_ids.add(vc.id)
         db_guild.voice_room_channel_id = vc.id
+        await AsyncCRUD.save_guild_record(db_guild)
+        self.schedule_pool_refill(vc)
 
         await interaction.followup.send(f"Done creating voice room: {vc.mention}. You can put it anywhere you like!")
 
@@ -91,8 +310,12 @@ class VoiceMasterCommands(commands.GroupCog, name="voicemaster"):
     async def set_channel(self, interaction: discord.Interaction, dest_channel: discord.VoiceChannel):
         """Set voice room master channel."""
         await interaction.response.defer()
-        db_guild = CRUD.get_or_create_guild_record(interaction.guild)
+        db_guild = await AsyncCRUD.get_or_create_guild_record(interaction.guild)
+        self.master_channel_ids.discard(db_guild.voice_room_channel_id)
+        self.master_channel_ids.add(dest_channel.id)
         db_guild.voice_room_channel_id = dest_channel.id
+        await AsyncCRUD.save_guild_record(db_guild)
+        self.schedule_pool_refill(dest_channel)
 
         await interaction.followup.send(f"Done setting voice room to {dest_channel.mention}")
 
@@ -3,7 +3,6 @@ import wavelink
 from discord.app_commands import CheckFailure
 
 from nameless.commands.checks import BaseCheck
-from nameless.database import CRUD
 
 __all__ = ["MusicCommandChecks"]
 
@@ -77,22 +76,3 @@ class MusicCommandChecks(BaseCheck):
             raise CheckFailure("I need to play something.")
 
         return True
-
-    @staticmethod
-    def has_audio_role(interaction: discord.Interaction):
-        dbg = CRUD.get_or_create_guild_record(interaction.guild)
-        role_id: int
-
-        if dbg and dbg.audio_role_id:
-            role_id = dbg.audio_role_id
-        else:
-            role_id = discord.utils.get(interaction.guild.roles, name="Audio").id  # type: ignore
-            dbg.audio_role_id = role_id
-
-        if not role_id:
-            return True  # guild dont have audio role, just return True I guess
-
-        if interaction.guild and role_id in interaction.user._roles:  # type: ignore
-            raise CheckFailure("You must have an audio role to use this command.")
-
-        return True
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from collections import Counter
+
+import wavelink
+from wavelink import NodeStatus
+
+__all__ = ["NamelessNodeBalancer"]
+
+
+class NamelessNodeBalancer:
+    """
+    Place players on the least loaded Lavalink node.
+    Nodes are scored with the penalties Lavalink clients commonly use: playing players, CPU load,
+    then missing and nulled audio frames, which grow fast once a node struggles to keep up.
+    """
+
+    def __init__(self, nodes: list[wavelink.Node]):
+        self.nodes = nodes
+
+        # node identifier -> last stats fetched
+        self.stats: dict[str, wavelink.StatsResponsePayload] = {}
+
+        # node identifier -> players connected since its stats were fetched, not counted by Lavalink yet
+        self.placed: Counter[str] = Counter()
+
+    async def refresh(self) -> None:
+        """Fetch the stats of every connected node."""
+        nodes = [node for node in self.nodes if node.status is NodeStatus.CONNECTED]
+        results = await asyncio.gather(*[node.fetch_stats() for node in nodes], return_exceptions=True)
+
+        for node, result in zip(nodes, results, strict=True):
+            self.placed.pop(node.identifier, None)
+
+            if isinstance(result, Exception):
+                logging.warning("Unable to fetch the stats of node {%s}: %s", node.identifier, repr(result))
+                self.stats.pop(node.identifier, None)
+            else:
+                self.stats[node.identifier] = result
+
+    def penalty(self, node: wavelink.Node) -> float:
+        """Load score of a node, lower is better."""
+        stats = self.stats.get(node.identifier)
+
+        if stats is None:
+            return float(len(node.players) + self.placed[node.identifier])
+
+        penalty = stats.playing + self.placed[node.identifier]
+        penalty += 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+
+        if stats.frames is not None:
+            # Frame stats are per minute, 3000 frames are sent in a minute.
+            penalty += 1.03 ** (500 * stats.frames.deficit / 3000) * 600 - 600
+            penalty += (1.03 ** (500 * stats.frames.nulled / 3000) * 300 - 300) * 2
+
+        return penalty
+
+    def best_node(self, exclude: wavelink.Node | None = None) -> wavelink.Node:
+        """
+        Pick the node a new player should go to, see `count_placement` once it is connected there.
+        :param exclude: Node to leave out, the one a player is moving away from.
+        :raises wavelink.InvalidNodeException: No node is connected.
+        """
+        penalties = {
+            node: self.penalty(node)
+            for node in self.nodes
+            if node.status is NodeStatus.CONNECTED and node is not exclude
+        }
+
+        if not penalties:
+            raise wavelink.InvalidNodeException("No connected Lavalink node to place the player on.")
+
+        best = min(penalties, key=penalties.__getitem__)
+
+        logging.info(
+            "Lavalink placement: node=%s penalty=%.2f candidates=[%s]",
+            best.identifier,
+            penalties[best],
+            ", ".join(f"{node.identifier}:{penalty:.2f}" for node, penalty in penalties.items()),
+        )
+
+        return best
+
+    def count_placement(self, node: wavelink.Node) -> None:
+        """Count a player that connected to a node, until the node reports it in its stats."""
+        self.placed[node.identifier] += 1
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+import discord
+
+from .NamelessPlayer import NamelessPlayer
+
+__all__ = ["NamelessNowPlayingUpdater"]
+
+# Discord allows 5 message edits in 5 seconds per channel, room is left for the other messages of the bot.
+CHANNEL_EDIT_GAP = 1.5
+
+# Edits sent in one tick over every guild, far from the global limit of 50 requests per second.
+MAX_EDITS_PER_TICK = 10
+
+
+class NamelessNowPlayingUpdater:
+    """
+    One task keeping the now-playing message of every player up to date, each player owning a single message.
+    Updates are coalesced: marking a player again before its edit goes out costs nothing.
+    Edits are spaced per channel and capped per tick, players waiting the longest go first.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[NamelessPlayer], discord.Embed],
+        *,
+        refresh_interval: float = 15,
+        tick_interval: float = 1,
+    ):
+        self.refresh_interval = refresh_interval
+        self.tick_interval = tick_interval
+
+        self._render = render
+
+        # guild id -> player with a now-playing message
+        self.players: dict[int, NamelessPlayer] = {}
+
+        # guild ids waiting for an edit right away, in the order they were marked
+        self._dirty: dict[int, None] = {}
+
+        # guild id -> monotonic time of the last update of its message
+        self._updated_at: dict[int, float] = {}
+
+        # channel id -> monotonic time of the last edit made in it
+        self._edited_at: dict[int, float] = {}
+
+        self.requests: int = 0
+
+        # Cleared by `stop`, `run` returns at its next tick.
+        self.running: bool = False
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def mark(self, player: NamelessPlayer) -> None:
+        """Ask for the message of a player to be updated at the next tick, sending it if there is none yet."""
+        assert player.guild is not None
+
+        self.players[player.guild.id] = player
+        self._dirty[player.guild.id] = None
+
+    def forget(self, guild_id: int) -> None:
+        """Stop updating the message of a guild, for players going away."""
+        self.players.pop(guild_id, None)
+        self._dirty.pop(guild_id, None)
+        self._updated_at.pop(guild_id, None)
+
+    def due(self, now: float) -> list[NamelessPlayer]:
+        """Players to update in a tick, marked ones first, then the ones with a stale progress bar."""
+        for guild_id, player in list(self.players.items()):
+            if not player.connected or player.current is None:
+                self.forget(guild_id)
+
+        stale = sorted(
+            (
+                guild_id
+                for guild_id, player in self.players.items()
+                if guild_id not in self._dirty
+                and not player.paused
+                and now - self._updated_at.get(guild_id, 0) >= self.refresh_interval
+            ),
+            key=lambda guild_id: self._updated_at.get(guild_id, 0),
+        )
+
+        picked: list[NamelessPlayer] = []
+        channels: set[int] = set()
+
+        for guild_id in [*self._dirty, *stale]:
+            player = self.players[guild_id]
+            channel_id = player.trigger_channel_id
+
+            if channel_id in channels or now - self._edited_at.get(channel_id, -CHANNEL_EDIT_GAP) < CHANNEL_EDIT_GAP:
+                continue
+
+            channels.add(channel_id)
+            picked.append(player)
+
+            if len(picked) == MAX_EDITS_PER_TICK:
+                break
+
+        return picked
+
+    async def tick(self, now: float | None = None) -> None:
+        """Send the edits that are due, within the rate limits."""
+        now = time.monotonic() if now is None else now
+        players = self.due(now)
+
+        for player in players:
+            assert player.guild is not None
+
+            self._dirty.pop(player.guild.id, None)
+            self._updated_at[player.guild.id] = now
+            self._edited_at[player.trigger_channel_id] = now
+
+        results = await asyncio.gather(*[self.update(player) for player in players], return_exceptions=True)
+
+        for player, result in zip(players, results, strict=True):
+            if isinstance(result, Exception):
+                assert player.guild is not None
+
+                logging.warning(
+                    "Unable to update the now-playing message of guild %s: %s", player.guild.id, repr(result)
+                )
+                self.forget(player.guild.id)
+
+    async def run(self) -> None:
+        """Tick until stopped, one task for every guild."""
+        self.running = True
+
+        while self.running:
+            await asyncio.sleep(self.tick_interval)
+
+            if self.running:
+                await self.tick()
+
+    def stop(self) -> None:
+        """Stop ticking, for the cog going away. The messages are left as they are."""
+        self.running = False
+
+    async def update(self, player: NamelessPlayer) -> None:
+        """Edit the now-playing message of a player, sending a new one if it is gone or in another channel."""
+        assert player.guild is not None
+
+        embed = self._render(player)
+        message = player.now_playing_message
+
+        if message is not None and message.channel.id == player.trigger_channel_id:
+            try:
+                await message.edit(embed=embed)
+                self.requests += 1
+                return
+            except discord.NotFound:
+                pass
+
+        channel = player.guild.get_channel(player.trigger_channel_id)
+
+        if not isinstance(channel, discord.abc.Messageable):
+            self.forget(player.guild.id)
+            return
+
+        player.now_playing_message = await channel.send(embed=embed)
+        self.requests += 1
@@ -1,10 +1,181 @@
+import asyncio
+import contextlib
+import datetime
+import random
+from collections import deque
+
 import discord
 import wavelink
+from discord.utils import MISSING
+
+from .NamelessQueue import NamelessQueue
+from .NamelessTrackSummary import NamelessTrackSummary
+
+__all__ = ["NamelessPlayer"]
+
+# Tracks kept in the play history of a player, the oldest ones are dropped past it.
+PLAY_HISTORY_SIZE = 50
 
 
 class NamelessPlayer(wavelink.Player):
-    def __init__(self, client: discord.Client, channel: discord.abc.Connectable, **kwargs):
+    def __init__(
+        self,
+        client: discord.Client = MISSING,
+        channel: discord.abc.Connectable = MISSING,
+        *,
+        compact_queue: bool = False,
+        **kwargs,
+    ):
+        """
+        :param compact_queue: Keep queued tracks as summaries, for players holding very large queues.
+        """
         super().__init__(client, channel, **kwargs)
 
+        self.queue: NamelessQueue = NamelessQueue(compact=compact_queue)
+
         self.trigger_channel_id: int = 0
         self.play_now_allowed: int = 0
+
+        # Session data read by the now-playing messages, kept here so track changes never touch the database.
+        self.stream_start_time: datetime.datetime = discord.utils.utcnow()
+        self.now_playing_message: discord.Message | None = None
+
+        # Set while the current track is replayed on another node, its start is not announced again.
+        self.migrating: bool = False
+
+        # Held while tracks are added in the background, a second add waits for the first to be in.
+        self.ingest_lock: asyncio.Lock = asyncio.Lock()
+
+        # Tracks that started playing, the newest last, the current one included.
+        self.play_history: deque[NamelessTrackSummary] = deque(maxlen=PLAY_HISTORY_SIZE)
+
+    async def switch_node(self, node: wavelink.Node) -> None:
+        """
+        Move this player to another node, the current track resumes where it was.
+        Wavelink has no way to do this on its own, so the voice session is handed over to the new node by hand.
+        """
+        assert self.guild is not None
+
+        old_node = self.node
+
+        # Not `self.position`, it keeps counting from the last update while the node is gone.
+        track, position = self.current, self._last_position
+
+        old_node._players.pop(self.guild.id, None)
+
+        # The old node may still be up, when a player is moved away from a loaded node.
+        if old_node.status is wavelink.NodeStatus.CONNECTED:
+            with contextlib.suppress(wavelink.LavalinkException, wavelink.NodeException):
+                await old_node._destroy_player(self.guild.id)
+
+        self._node = node
+        node._players[self.guild.id] = self
+
+        await self._dispatch_voice_update()
+
+        if track is not None:
+            self.migrating = True
+
+            try:
+                await self.play(track, start=position if not track.is_stream else 0, add_history=False)
+            except Exception:
+                self.migrating = False
+                raise
+
+    def remember(self, track: wavelink.Playable) -> None:
+        """Add a track that just started to the play history, a track looping or resuming is only added once."""
+        if self.play_history and self.play_history[-1] == track:
+            return
+
+        self.play_history.append(NamelessTrackSummary.from_playable(track))
+
+    @property
+    def previous_track(self) -> NamelessTrackSummary | None:
+        """The track played before the current one, None if there is none in the history."""
+        history = self.play_history
+        skip = 1 if self.current is not None and history and history[-1] == self.current else 0
+
+        return history[-1 - skip] if len(history) > skip else None
+
+    async def play_previous(self) -> wavelink.Playable | None:
+        """
+        Play the track played before the current one again, from the history, without searching for it.
+        The current track goes back to the front of the queue.
+        :return: The track going back on, None if there is nothing to go back to.
+        """
+        previous = self.previous_track
+        current = self.current
+
+        if previous is None:
+            return None
+
+        # The current track leaves the history too, the previous one is added back when it starts.
+        if self.play_history[-1] is not previous:
+            self.play_history.pop()
+
+        self.play_history.pop()
+
+        if current is not None:
+            self.queue.put_at(0, current)
+
+        track = previous.to_playable()
+        await self.play(track, add_history=False)
+        return track
+
+    def time_until(self, index: int) -> int | None:
+        """
+        Milliseconds until the queued track at the index starts playing.
+        :return: None when it can not be told, while a stream or a looping track plays.
+        """
+        track = self.current
+        remaining = 0
+
+        if track is not None:
+            if track.is_stream or self.queue.mode is wavelink.QueueMode.loop:
+                return None
+
+            remaining = max(track.length - self.position, 0)
+
+        return remaining + self.queue.duration_before(index)
+
+    async def add_recommendations(self, tracks: list[wavelink.Playable]) -> int:
+        """
+        Fill the auto_queue with recommended tracks, skipping the ones played or queued lately.
+        :return: Number of tracks added.
+        """
+        recent = [
+            *self.auto_queue[:40],
+            *self.queue[:40],
+            *self.queue.history[:-41:-1],  # type: ignore
+            *self.auto_queue.history[:-61:-1],  # type: ignore
+            self.current,
+        ]
+
+        tracks = [track for track in tracks if track not in recent]
+        random.shuffle(tracks)
+
+        added = 0
+
+        for track in tracks[: max(0, self._auto_cutoff - len(self.auto_queue))]:
+            track._recommended = True
+            added += await self.auto_queue.put_wait(track)
+
+        return added
+
+    async def _do_recommendation(
+        self,
+        *,
+        populate_track: wavelink.Playable | None = None,
+        max_population: int | None = None,
+    ) -> None:
+        # Recommendations prefetched while the last track played go on right away, without asking Lavalink.
+        if populate_track is None and self.current is None and self.auto_queue:
+            self._inactivity_start()
+
+            track = self.auto_queue.get()
+            self.auto_queue.history.put(track)  # type: ignore
+
+            await self.play(track, add_history=False)
+            return
+
+        await super()._do_recommendation(populate_track=populate_track, max_population=max_population)
@@ -0,0 +1,559 @@
+import asyncio
+import itertools
+import operator
+import random
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from typing import SupportsIndex, cast, overload
+
+import wavelink
+from wavelink import Playable, QueueEmpty, QueueMode
+
+from .NamelessTrackSummary import NamelessTrackSummary
+
+__all__ = ["NamelessQueue"]
+
+_identifier = operator.attrgetter("identifier")
+
+# Tracks per block, a block twice as large is split, neighbours small enough are merged back.
+BLOCK_SIZE = 1024
+
+
+class NamelessQueue(wavelink.Queue):
+    """
+    Drop-in `wavelink.Queue` storing its tracks in a list of blocks of about BLOCK_SIZE tracks.
+    Positional operations only touch one block after finding it, O(n / BLOCK_SIZE + BLOCK_SIZE) instead of O(n),
+    which is about O(sqrt(n)) for the queue sizes we deal with.
+    A count of every track identifier is kept along, so membership checks never scan the queue,
+    and so is the duration of each block, so the time until a track plays is found without summing the whole queue.
+    Both are only brought up to date when read: edits note the tracks put in and taken out,
+    and block durations are summed again after a change, so positional operations never pay for them.
+
+    In compact mode, tracks are kept as `NamelessTrackSummary` and only turned back into `Playable` by `get`/`get_at`,
+    right before they play. Everything else reading the queue sees the summaries.
+    """
+
+    def __init__(self, *, history: bool = True, compact: bool = False):
+        self.compact = compact
+
+        self._blocks: list[list[Playable]] = []
+        self._count: int = 0
+
+        # Milliseconds of each block, None once the block changed and until it is read again. Streams count as 0.
+        self._durations: list[int | None] = []
+
+        # track identifier -> times it was put in the queue, then times it was taken out, since the last `_reindex`.
+        self._index: Counter[str] = Counter()
+        self._unindexed: Counter[str] = Counter()
+        self._unindexed_count: int = 0
+
+        # Tracks put in and taken out since the counters were last brought up to date.
+        # A track is only noted as taken out once it left its block, `_reindex` counts the blocks again.
+        self._added: list[Playable] = []
+        self._removed: list[Playable] = []
+
+        super().__init__(history=history)
+
+    @property
+    def _items(self) -> list[Playable]:  # type: ignore[override]
+        """Flat copy of the queue, for code written against `wavelink.Queue` internals. Writes to it are lost."""
+        return list(self)
+
+    @_items.setter
+    def _items(self, items: Iterable[Playable]) -> None:
+        items = self._pack(list(items))
+        self._blocks = [items[i : i + BLOCK_SIZE] for i in range(0, len(items), BLOCK_SIZE)]
+        self._count = len(items)
+        self._durations = [None] * len(self._blocks)
+        self._reindex()
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Playable]:
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __reversed__(self) -> Iterator[Playable]:
+        return itertools.chain.from_iterable(reversed(block) for block in reversed(self._blocks))
+
+    def __contains__(self, item: Playable) -> bool:
+        # Tracks with the same identifier are equal, the index answers exactly.
+        return isinstance(item, Playable | NamelessTrackSummary) and self._queued(item.identifier) > 0
+
+    @overload
+    def __getitem__(self, index: SupportsIndex, /) -> Playable: ...
+
+    @overload
+    def __getitem__(self, index: slice, /) -> list[Playable]: ...
+
+    def __getitem__(self, index: SupportsIndex | slice, /) -> Playable | list[Playable]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+
+            if step < 0:
+                return self._items[index]
+
+            return list(itertools.islice(self._iter_from(start), 0, max(stop - start, 0), step))
+
+        block, offset = self._locate(index)
+        return self._blocks[block][offset]
+
+    def __setitem__(self, index: SupportsIndex, value: Playable, /) -> None:
+        if not isinstance(value, NamelessTrackSummary):
+            self._check_compatibility(value)
+
+        (value,) = self._pack([value])
+        block, offset = self._locate(index)
+        old, self._blocks[block][offset] = self._blocks[block][offset], value
+        self._added.append(value)
+        self._durations[block] = None
+        self._removed.append(old)
+        self._trim_index()
+        self._wakeup_next()
+
+    def __delitem__(self, index: int | slice, /) -> None:
+        if not isinstance(index, slice):
+            self._pop(index)
+            return
+
+        start, stop, step = index.indices(self._count)
+
+        if step != 1:
+            items = self._items
+            del items[index]
+            self._items = items
+            return
+
+        if start >= stop:
+            return
+
+        first, offset = self._locate(start)
+        number, remaining = first, stop - start
+
+        while remaining:
+            block = self._blocks[number]
+            high = min(offset + remaining, len(block))
+
+            self._removed += block[offset:high]
+            del block[offset:high]
+            self._durations[number] = None
+            self._count -= high - offset
+            remaining -= high - offset
+            number, offset = number + 1, 0
+
+        self._merge_blocks(max(first - 1, 0), number + 1)
+        self._trim_index()
+
+    @staticmethod
+    def _length(track: Playable) -> int:
+        return 0 if track.is_stream else track.length
+
+    @classmethod
+    def _sum_lengths(cls, tracks: Iterable[Playable]) -> int:
+        return sum(map(cls._length, tracks))
+
+    def _pack(self, tracks: list[Playable]) -> list[Playable]:
+        """Turn tracks into summaries in compact mode, they stand in for them everywhere in the queue."""
+        if not self.compact:
+            return tracks
+
+        return cast(
+            list[Playable],
+            [NamelessTrackSummary.from_playable(track) if isinstance(track, Playable) else track for track in tracks],
+        )
+
+    @staticmethod
+    def _unpack(track: Playable) -> Playable:
+        if isinstance(track, NamelessTrackSummary):
+            return track.to_playable()
+
+        return track
+
+    def _block_duration(self, block: int) -> int:
+        duration = self._durations[block]
+
+        if duration is None:
+            duration = self._durations[block] = self._sum_lengths(self._blocks[block])
+
+        return duration
+
+    def _merge_blocks(self, start: int, stop: int) -> None:
+        """Drop the empty blocks between `start` and `stop`, and merge the neighbours small enough to share one."""
+        blocks: list[list[Playable]] = []
+        durations: list[int | None] = []
+
+        for items, duration in zip(self._blocks[start:stop], self._durations[start:stop], strict=True):
+            if not items:
+                continue
+
+            if blocks and len(blocks[-1]) + len(items) <= BLOCK_SIZE:
+                blocks[-1].extend(items)
+                durations[-1] = None
+            else:
+                blocks.append(items)
+                durations.append(duration)
+
+        self._blocks[start:stop] = blocks
+        self._durations[start:stop] = durations
+
+    def _queued(self, identifier: str) -> int:
+        if self._added:
+            self._index.update(map(_identifier, self._added))
+            self._added.clear()
+
+        if self._removed:
+            self._unindexed.update(map(_identifier, self._removed))
+            self._unindexed_count += len(self._removed)
+            self._removed.clear()
+            self._trim_index()
+
+        return self._index.get(identifier, 0) - self._unindexed.get(identifier, 0)
+
+    def _trim_index(self) -> None:
+        if len(self._removed) + self._unindexed_count > self._count + BLOCK_SIZE:
+            self._reindex()
+
+    def _reindex(self) -> None:
+        """Count the queued tracks again, once as many have been taken out as are left. O(1) amortized per track."""
+        self._index = Counter(map(_identifier, self))
+        self._unindexed = Counter()
+        self._unindexed_count = 0
+        self._added = []
+        self._removed = []
+
+    def _locate(self, index: SupportsIndex) -> tuple[int, int]:
+        """Find the block holding a track, and where the track is in that block."""
+        index = operator.index(index)
+        count = self._count
+
+        if index < 0:
+            index += count
+
+        if not 0 <= index < count:
+            raise IndexError("Queue index out of range.")
+
+        blocks = self._blocks
+
+        # Most queues fit in one block.
+        if len(blocks) == 1:
+            return 0, index
+
+        # Walk from whichever end of the queue is closer, the ends are where most operations happen.
+        if index < count >> 1:
+            for block, items in enumerate(blocks):
+                if index < len(items):
+                    return block, index
+
+                index -= len(items)
+        else:
+            index -= count
+
+            for block in range(len(blocks) - 1, -1, -1):
+                index += len(blocks[block])
+
+                if index >= 0:
+                    return block, index
+
+        raise IndexError("Queue index out of range.")
+
+    def _iter_from(self, index: int) -> Iterator[Playable]:
+        if index >= self._count:
+            return iter(())
+
+        block, offset = self._locate(index)
+        return itertools.chain(
+            itertools.islice(self._blocks[block], offset, None),
+            itertools.chain.from_iterable(self._blocks[block + 1 :]),
+        )
+
+    def _splice(self, index: int, tracks: list[Playable]) -> None:
+        """Insert tracks before the index, clamped like `list.insert`."""
+        if len(tracks) <= 1:
+            if tracks:
+                self._insert(index, tracks[0])
+
+            return
+
+        tracks = self._pack(tracks)
+
+        if index < 0:
+            index = max(index + self._count, 0)
+
+        if index >= self._count:
+            if not self._blocks:
+                self._blocks.append([])
+                self._durations.append(None)
+
+            block, offset = len(self._blocks) - 1, len(self._blocks[-1])
+        else:
+            block, offset = self._locate(index)
+
+        items = self._blocks[block]
+        items[offset:offset] = tracks
+        self._count += len(tracks)
+        self._durations[block] = None
+        self._added += tracks
+
+        if len(items) > 2 * BLOCK_SIZE:
+            self._split(block)
+
+    def _insert(self, index: int, track: Playable) -> None:
+        """`_splice` of a single track, kept apart as it is what `put_at`, `move` and most `put` calls do."""
+        if self.compact and isinstance(track, Playable):
+            track = cast(Playable, NamelessTrackSummary.from_playable(track))
+
+        count = self._count
+        blocks = self._blocks
+
+        if index < 0:
+            index = max(index + count, 0)
+
+        if index >= count:
+            if not blocks:
+                blocks.append([])
+                self._durations.append(None)
+
+            block = len(blocks) - 1
+            items = blocks[block]
+            items.append(track)
+        else:
+            block, offset = self._locate(index)
+            items = blocks[block]
+            items.insert(offset, track)
+
+        self._count = count + 1
+        self._durations[block] = None
+        self._added.append(track)
+
+        if len(items) > 2 * BLOCK_SIZE:
+            self._split(block)
+
+    def _split(self, block: int) -> None:
+        items = self._blocks[block]
+        parts = [items[i : i + BLOCK_SIZE] for i in range(0, len(items), BLOCK_SIZE)]
+        self._blocks[block : block + 1] = parts
+        self._durations[block : block + 1] = [None] * len(parts)
+
+    def _pop(self, index: SupportsIndex) -> Playable:
+        block, offset = self._locate(index)
+        blocks = self._blocks
+        items = blocks[block]
+        track = items.pop(offset)
+        self._count -= 1
+        self._durations[block] = None
+        self._removed.append(track)
+
+        if not items:
+            del blocks[block]
+            del self._durations[block]
+        elif block + 1 < len(blocks) and len(items) + len(blocks[block + 1]) <= BLOCK_SIZE:
+            items.extend(blocks.pop(block + 1))
+            del self._durations[block + 1]
+
+        if len(self._removed) > self._count + BLOCK_SIZE:
+            self._reindex()
+
+        return track
+
+    def _accept(self, item: list[Playable] | Playable | wavelink.Playlist, atomic: bool) -> list[Playable]:
+        """Check what is being put in the queue, the same way `wavelink.Queue.put` does."""
+        if not isinstance(item, Iterable):
+            self._check_compatibility(item)
+            return [item]
+
+        if atomic:
+            tracks = list(item)
+
+            # `_check_atomic`, without a call per track.
+            if not all(map(isinstance, tracks, itertools.repeat(Playable))):
+                raise TypeError("This queue is restricted to Playable objects.")
+
+            return tracks
+
+        return [track for track in item if isinstance(track, Playable)]
+
+    def get(self) -> Playable:
+        if self.mode is QueueMode.loop and self._loaded:
+            return self._loaded
+
+        if self.mode is QueueMode.loop_all and not self:
+            assert self.history is not None
+            self._splice(0, list(self.history))
+            self.history.clear()
+
+        if not self:
+            raise QueueEmpty("There are no items currently in this queue.")
+
+        track = self._unpack(self._pop(0))
+        self._loaded = track
+        return track
+
+    def get_at(self, index: int, /) -> Playable:
+        if not self:
+            raise QueueEmpty("There are no items currently in this queue.")
+
+        track = self._unpack(self._pop(index))
+        self._loaded = track
+        return track
+
+    def put_at(self, index: int, value: Playable, /) -> None:
+        self._check_compatibility(value)
+        self._insert(index, value)
+        self._wakeup_next()
+
+    def put_many_at(self, index: int, item: list[Playable] | wavelink.Playlist, /, *, atomic: bool = True) -> int:
+        """
+        Insert tracks before the index in one go.
+        :param index: 0-based position, clamped like `list.insert`.
+        :return: Number of tracks inserted.
+        """
+        tracks = self._accept(item, atomic)
+        self._splice(index, tracks)
+        self._wakeup_next()
+        return len(tracks)
+
+    def put(self, item: list[Playable] | Playable | wavelink.Playlist, /, *, atomic: bool = True) -> int:
+        tracks = self._accept(item, atomic)
+        self._splice(self._count, tracks)
+        self._wakeup_next()
+        return len(tracks)
+
+    async def put_wait(self, item: list[Playable] | Playable | wavelink.Playlist, /, *, atomic: bool = True) -> int:
+        async with self._lock:
+            added = self.put(item, atomic=atomic)
+            await asyncio.sleep(0)
+
+        return added
+
+    def move(self, source: int, destination: int, /) -> None:
+        """Move the track at `source` so it ends up at `destination`."""
+        self._insert(destination, self._pop(source))
+
+    def delete(self, index: int, /) -> None:
+        self._pop(index)
+
+    def delete_range(self, start: int, stop: int, /) -> int:
+        """
+        Delete the tracks from `start` up to, but not including, `stop`.
+        :return: Number of tracks deleted.
+        """
+        count = self._count
+        del self[start:stop]
+        return count - self._count
+
+    def remove_where(self, predicate: Callable[[Playable], bool], /) -> int:
+        """
+        Delete every track matching a predicate, in one pass over the queue.
+        :return: Number of tracks deleted.
+        """
+        count = self._count
+        self._items = [track for track in self if not predicate(track)]
+        return count - self._count
+
+    def dedupe(self) -> int:
+        """
+        Keep only the first of the tracks queued more than once.
+        :return: Number of tracks deleted.
+        """
+        self._reindex()
+
+        if len(self._index) == self._count:
+            return 0
+
+        seen: set[str] = set()
+        kept: list[Playable] = []
+
+        for track in self:
+            if track.identifier not in seen:
+                seen.add(track.identifier)
+                kept.append(track)
+
+        count = self._count
+        self._items = kept
+        return count - self._count
+
+    def count_of(self, item: Playable, /) -> int:
+        """Number of times a track is queued."""
+        return self._queued(item.identifier)
+
+    @property
+    def duration(self) -> int:
+        """Milliseconds to play the whole queue, streams left out."""
+        return sum(map(self._block_duration, range(len(self._blocks))))
+
+    def duration_before(self, index: int, /) -> int:
+        """
+        Milliseconds to play the tracks before the index, streams left out.
+        Whole blocks are added up from their totals, O(n / BLOCK_SIZE + BLOCK_SIZE).
+        :param index: 0-based position, clamped to the queue.
+        """
+        if index <= 0:
+            return 0
+
+        if index >= self._count:
+            return self.duration
+
+        block, offset = self._locate(index)
+        return sum(map(self._block_duration, range(block))) + self._sum_lengths(self._blocks[block][:offset])
+
+    def index(self, item: Playable, /) -> int:
+        if item not in self:
+            raise ValueError(f"{item!r} is not in the queue.")
+
+        for position, track in enumerate(self):
+            if track == item:
+                return position
+
+        raise ValueError(f"{item!r} is not in the queue.")
+
+    def shuffle(self) -> None:
+        items = self._items
+        random.shuffle(items)
+        self._items = items
+
+    def clear(self) -> None:
+        self._blocks = []
+        self._count = 0
+        self._index = Counter()
+        self._unindexed = Counter()
+        self._unindexed_count = 0
+        self._added = []
+        self._removed = []
+        self._durations = []
+
+    def copy(self) -> "NamelessQueue":
+        copy_queue = NamelessQueue(history=self.history is not None, compact=self.compact)
+        copy_queue._blocks = [block.copy() for block in self._blocks]
+        copy_queue._count = self._count
+        copy_queue._index = self._index.copy()
+        copy_queue._unindexed = self._unindexed.copy()
+        copy_queue._unindexed_count = self._unindexed_count
+        copy_queue._added = self._added.copy()
+        copy_queue._removed = self._removed.copy()
+        copy_queue._durations = self._durations.copy()
+        return copy_queue
+
+    def remove(self, item: Playable, /, count: int | None = 1) -> int:
+        if item not in self:
+            return 0
+
+        deleted_count = 0
+
+        for number, block in enumerate(self._blocks):
+            position = 0
+
+            while position < len(block) and (count is None or deleted_count < count):
+                if block[position] == item:
+                    self._removed.append(block.pop(position))
+                    self._durations[number] = None
+                    deleted_count += 1
+                else:
+                    position += 1
+
+        self._merge_blocks(0, len(self._blocks))
+        self._count -= deleted_count
+        self._trim_index()
+        return deleted_count
@@ -0,0 +1,84 @@
+import asyncio
+import copy
+
+import wavelink
+from cachetools import TTLCache
+
+__all__ = ["NamelessSearchCache"]
+
+
+class NamelessSearchCache:
+    """
+    Bounded TTL cache of Lavalink search results, keyed on (query, origin).
+    Empty results are cached too, for a shorter while, and identical searches in flight share one request.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 600, negative_ttl: float = 60):
+        self._results: TTLCache[tuple[str, str], wavelink.Search] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._empty: TTLCache[tuple[str, str], bool] = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self._in_flight: dict[tuple[str, str], asyncio.Task[wavelink.Search]] = {}
+
+        self.hits: int = 0
+        self.negative_hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._results) + len(self._empty)
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of searches served from memory, empty results included, between 0 and 1."""
+        total = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / total if total else 0.0
+
+    async def search(self, query: str, origin: str, source: wavelink.TrackSource | str | None) -> wavelink.Search:
+        """
+        Search for tracks, skipping the Lavalink round trip if the same search was made recently.
+        :param query: Query or URL to search for.
+        :param origin: Name of the search origin, part of the cache key.
+        :param source: Search source to pass to wavelink.
+        :return: Fresh copies of the results, safe to be modified by the caller.
+        """
+        key = (query.strip(), origin)
+
+        if key in self._empty:
+            self.negative_hits += 1
+            return []
+
+        if (cached := self._results.get(key)) is not None:
+            self.hits += 1
+            return self._copy(cached)
+
+        self.misses += 1
+
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.create_task(wavelink.Playable.search(key[0], source=source))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Another waiter cancelling must not cancel the request for everyone.
+        results = await asyncio.shield(task)
+
+        if results:
+            self._results[key] = results
+        else:
+            self._empty[key] = True
+
+        return self._copy(results)
+
+    def clear(self) -> None:
+        """Drop every cached result, the counters are kept."""
+        self._results.clear()
+        self._empty.clear()
+
+    @staticmethod
+    def _copy(results: wavelink.Search) -> wavelink.Search:
+        def copy_track(track: wavelink.Playable) -> wavelink.Playable:
+            return wavelink.Playable(track.raw_data, playlist=track.playlist)
+
+        if isinstance(results, wavelink.Playlist):
+            playlist = copy.copy(results)
+            playlist.tracks = [copy_track(track) for track in results.tracks]
+            return playlist
+
+        return [copy_track(track) for track in results]
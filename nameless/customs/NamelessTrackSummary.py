@@ -0,0 +1,193 @@
+import base64
+import struct
+import sys
+from typing import Any
+
+import wavelink
+
+__all__ = ["NamelessTrackSummary", "decode_track_info", "encode_track_info"]
+
+# Lavalink marks the messages carrying a version byte with this flag, in the 2 highest bits of the header.
+TRACK_INFO_VERSIONED = 1
+TRACK_INFO_VERSION = 3
+
+
+class NamelessTrackSummary:
+    """
+    What a compact queue keeps of a track: the Lavalink encoded string, and the few fields shown or indexed.
+    It reads like a `wavelink.Playable` for everything done with a queued track, and turns back into one before playing.
+    Authors are interned, the same few artists fill most playlists.
+    """
+
+    __slots__ = ("encoded", "identifier", "title", "author", "length", "uri", "is_stream", "user_data")
+
+    def __init__(
+        self,
+        encoded: str,
+        identifier: str,
+        title: str,
+        author: str,
+        length: int,
+        uri: str | None,
+        is_stream: bool,
+        user_data: dict[str, Any] | None = None,
+    ):
+        self.encoded = encoded
+        self.identifier = identifier
+        self.title = title
+        self.author = sys.intern(author)
+        self.length = length
+        self.uri = uri
+        self.is_stream = is_stream
+
+        # None rather than an empty dict, most tracks have no extras.
+        self.user_data = user_data or None
+
+    @classmethod
+    def from_playable(cls, track: wavelink.Playable) -> "NamelessTrackSummary":
+        return cls(
+            track.encoded,
+            track.identifier,
+            track.title,
+            track.author,
+            track.length,
+            track.uri,
+            track.is_stream,
+            dict(track.extras),
+        )
+
+    @property
+    def extras(self) -> wavelink.ExtrasNamespace:
+        return wavelink.ExtrasNamespace(self.user_data or {})
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NamelessTrackSummary | wavelink.Playable):
+            return NotImplemented
+
+        return self.encoded == other.encoded or self.identifier == other.identifier
+
+    def __hash__(self) -> int:
+        return hash(self.encoded)
+
+    def __repr__(self) -> str:
+        return f"NamelessTrackSummary(identifier={self.identifier!r}, title={self.title!r})"
+
+    def to_playable(self) -> wavelink.Playable:
+        """Rebuild the full track, its other fields are decoded from the encoded string without asking Lavalink."""
+        try:
+            info = decode_track_info(self.encoded)
+        except ValueError:
+            info = {"sourceName": "unknown", "artworkUrl": None, "isrc": None}
+
+        info.update(
+            identifier=self.identifier,
+            title=self.title,
+            author=self.author,
+            length=self.length,
+            uri=self.uri,
+            isStream=self.is_stream,
+            isSeekable=not self.is_stream,
+            position=0,
+        )
+
+        return wavelink.Playable(
+            {
+                "encoded": self.encoded,
+                "info": info,  # type: ignore
+                "pluginInfo": {},
+                "userData": self.user_data or {},
+            }
+        )
+
+
+class _TrackReader:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def read(self, fmt: str) -> Any:
+        try:
+            (value,) = struct.unpack_from(fmt, self.data, self.offset)
+        except struct.error as err:
+            raise ValueError("Encoded track is truncated.") from err
+
+        self.offset += struct.calcsize(fmt)
+        return value
+
+    def read_text(self) -> str:
+        size = self.read(">H")
+        raw = self.data[self.offset : self.offset + size]
+        self.offset += size
+
+        if len(raw) != size:
+            raise ValueError("Encoded track is truncated.")
+
+        # Java writes a modified UTF-8: NUL takes 2 bytes, and characters past the BMP are written as 2 surrogates.
+        text = raw.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return text.encode("utf-16", "surrogatepass").decode("utf-16")
+
+    def read_nullable_text(self) -> str | None:
+        return self.read_text() if self.read(">?") else None
+
+
+def decode_track_info(encoded: str) -> dict[str, Any]:
+    """
+    Read the track info out of a Lavalink encoded track, the way Lavalink does on `decodetrack`.
+    :raises ValueError: The string is not an encoded track, or uses a format version we do not know.
+    """
+    reader = _TrackReader(base64.b64decode(encoded))
+
+    header = reader.read(">I")
+    version = reader.read(">B") if header >> 30 & TRACK_INFO_VERSIONED else 1
+
+    if not 1 <= version <= TRACK_INFO_VERSION:
+        raise ValueError(f"Unknown encoded track version {version}.")
+
+    info: dict[str, Any] = {
+        "title": reader.read_text(),
+        "author": reader.read_text(),
+        "length": reader.read(">q"),
+        "identifier": reader.read_text(),
+        "isStream": reader.read(">?"),
+        "uri": reader.read_nullable_text() if version >= 2 else None,
+        "artworkUrl": reader.read_nullable_text() if version >= 3 else None,
+        "isrc": reader.read_nullable_text() if version >= 3 else None,
+    }
+    info["sourceName"] = reader.read_text()
+
+    return info
+
+
+def encode_track_info(info: dict[str, Any]) -> str:
+    """
+    Encode track info the way Lavalink does, the latest version without source specific fields.
+    Lavalink needs the source specific fields to play a track, so this is for tests and benchmarks.
+    """
+
+    def text(value: str) -> bytes:
+        # Back to Java's modified UTF-8, see `_TrackReader.read_text`.
+        units = value.encode("utf-16-le", "surrogatepass")
+        split = "".join(chr(unit) for unit in struct.unpack(f"<{len(units) // 2}H", units))
+        raw = split.encode("utf-8", "surrogatepass").replace(b"\x00", b"\xc0\x80")
+        return struct.pack(">H", len(raw)) + raw
+
+    def nullable_text(value: str | None) -> bytes:
+        return struct.pack(">?", False) if value is None else struct.pack(">?", True) + text(value)
+
+    body = (
+        struct.pack(">B", TRACK_INFO_VERSION)
+        + text(info["title"])
+        + text(info["author"])
+        + struct.pack(">q", info["length"])
+        + text(info["identifier"])
+        + struct.pack(">?", info["isStream"])
+        + nullable_text(info.get("uri"))
+        + nullable_text(info.get("artworkUrl"))
+        + nullable_text(info.get("isrc"))
+        + text(info["sourceName"])
+        + struct.pack(">q", info.get("position", 0))
+    )
+
+    return base64.b64encode(struct.pack(">I", len(body) | TRACK_INFO_VERSIONED << 30) + body).decode()
@@ -1 +1,6 @@
+from .NamelessNodeBalancer import *
+from .NamelessNowPlayingUpdater import *
 from .NamelessPlayer import *
+from .NamelessQueue import *
+from .NamelessSearchCache import *
+from .NamelessTrackSummary import *
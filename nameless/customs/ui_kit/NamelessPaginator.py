@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+from collections.abc import Callable, Iterable, Sequence
+
+import discord
+
+__all__ = ["NamelessPaginator"]
+
+# Anything able to hand pages over: a callable taking the page index, a list of embeds, or a generator of them.
+PageProvider = Callable[[int], discord.Embed | None] | Sequence[discord.Embed] | Iterable[discord.Embed]
+
+# Seconds a paginator lives, whatever the activity on it.
+HARD_TIMEOUT = 300
+
+# Live paginators per guild, starting one more closes the oldest.
+MAX_LIVE_PER_GUILD = 3
+
+
+def _no_pages(_: int) -> discord.Embed | None:
+    return None
+
+
+class NamelessPaginator(discord.ui.View):
+    """
+    Flip through embeds asked one at a time from a page provider, only the invoker can flip.
+    Once closed, by the buttons, by either timeout, or by too many paginators in the guild,
+    it lets go of the pages and the message so they can be collected.
+    """
+
+    # guild_id (0 outside guilds) -> live paginators, oldest first
+    live: dict[int, list["NamelessPaginator"]] = {}
+
+    _tasks: set[asyncio.Task[None]] = set()
+
+    def __init__(self, pages: PageProvider, timeout: int = 60, hard_timeout: float = HARD_TIMEOUT):
+        """
+        :param pages: Callable returning the embed of a page or None past the end, or the embeds themselves.
+        :param timeout: Seconds without a click before closing.
+        :param hard_timeout: Seconds before closing, clicks or not.
+        """
+        super().__init__(timeout=timeout)
+
+        self.page_provider = self._as_provider(pages)
+        self.hard_timeout = hard_timeout
+        self.page = 0
+        self.author_id: int = 0
+        self.guild_id: int = 0
+        self.message: discord.WebhookMessage | None = None
+
+        self._expiry: asyncio.TimerHandle | None = None
+
+    @staticmethod
+    def _as_provider(pages: PageProvider) -> Callable[[int], discord.Embed | None]:
+        if callable(pages):
+            return pages
+
+        if isinstance(pages, Sequence):
+            return lambda page: pages[page] if 0 <= page < len(pages) else None
+
+        # Generators are only advanced as far as the reader goes, pages already seen are kept to flip back.
+        iterator = iter(pages)
+        seen: list[discord.Embed] = []
+
+        def provider(page: int) -> discord.Embed | None:
+            while len(seen) <= page:
+                if (embed := next(iterator, None)) is None:
+                    return None
+
+                seen.append(embed)
+
+            return seen[page] if page >= 0 else None
+
+        return provider
+
+    async def start(self, interaction: discord.Interaction, message: discord.WebhookMessage | None = None):
+        """
+        Show the first page as a followup of a deferred interaction.
+        :param message: Followup message to show the pages in, instead of sending a new one.
+        """
+        embed = self.page_provider(0)
+
+        if embed is None:
+            self.release()
+            return
+
+        self.author_id = interaction.user.id
+        self.back.disabled = True
+
+        if self.page_provider(1) is None:
+            if message is None:
+                await interaction.followup.send(embed=embed)
+            else:
+                await message.edit(content="", embed=embed, view=None)
+
+            self.release()
+            return
+
+        self.guild_id = interaction.guild_id or 0
+        live = self.live.setdefault(self.guild_id, [])
+
+        while len(live) >= MAX_LIVE_PER_GUILD:
+            live[0]._close_in_background()
+
+        live.append(self)
+        self._expiry = asyncio.get_running_loop().call_later(self.hard_timeout, self._close_in_background)
+
+        if message is None:
+            self.message = await interaction.followup.send(embed=embed, view=self, wait=True)
+        else:
+            self.message = await message.edit(content="", embed=embed, view=self)
+
+        # Closed while the message was on its way.
+        if self.is_finished():
+            self._close_in_background()
+
+    async def flip(self, interaction: discord.Interaction, page: int):
+        embed = self.page_provider(page)
+
+        if embed is None:
+            self.next.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+
+        self.page = page
+        self.back.disabled = page == 0
+        self.next.disabled = False
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def close(self):
+        """Remove the buttons from the message, then release everything."""
+        await self._remove_buttons(self.release())
+
+    def release(self) -> discord.WebhookMessage | None:
+        """
+        Stop listening, and drop the references to the pages and the message.
+        :return: The message the paginator was shown in, if any.
+        """
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+
+        live = self.live.get(self.guild_id, [])
+
+        if self in live:
+            live.remove(self)
+
+            if not live:
+                del self.live[self.guild_id]
+
+        message, self.message = self.message, None
+        self.page_provider = _no_pages
+        self.stop()
+
+        return message
+
+    def _close_in_background(self) -> None:
+        task = asyncio.create_task(self._remove_buttons(self.release()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _remove_buttons(message: discord.WebhookMessage | None):
+        if message is not None:
+            with contextlib.suppress(discord.HTTPException):
+                await message.edit(view=None)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.grey)
+    async def back(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.flip(interaction, self.page - 1)
+
+    @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.red)
+    async def end(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.release()
+        await interaction.response.edit_message(view=None)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.grey)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.flip(interaction, self.page + 1)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    async def on_timeout(self) -> None:
+        await self.close()
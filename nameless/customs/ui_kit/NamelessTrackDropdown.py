@@ -20,10 +20,11 @@ class NamelessTrackDropdown(NamelessDropdown):
                 description=track.uri[:100] if track.uri else "No URI",
                 value=str(index),
             )
-            for index, track in enumerate(tracks[:25])
+            # Discord allows 25 options, one of them is taken above.
+            for index, track in enumerate(tracks[:24])
         ]
 
         self.custom_id = "music-pick-select"
         self.placeholder = "Choose your tracks"
         self.min_values = 1
-        self.max_values = 10
+        self.max_values = min(10, len(self.options))
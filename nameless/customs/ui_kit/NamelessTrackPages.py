@@ -0,0 +1,83 @@
+from collections.abc import Callable, Sequence
+
+import discord
+import wavelink
+
+__all__ = ["NamelessTrackPages"]
+
+# Tracks fetched at once while filling a page.
+SCAN_SIZE = 25
+
+
+class NamelessTrackPages:
+    """
+    Page provider for a track list, rendering a page only when it is asked for.
+    It keeps where each page seen so far starts, not the embeds, so a page costs O(page) whatever the list size.
+    The list is read live, a queue changing underneath shifts the pages instead of showing stale tracks.
+    """
+
+    __slots__ = ("tracks", "title", "render_line", "max_length", "_starts")
+
+    def __init__(
+        self,
+        tracks: Sequence[wavelink.Playable],
+        title: str,
+        render_line: Callable[[int, wavelink.Playable], str],
+        max_length: int = 2048,
+    ):
+        """
+        :param tracks: Anything sliceable, a `wavelink.Queue` or a plain list.
+        :param render_line: Build the line of a track from its 1-based position.
+        :param max_length: Description length a page must fit in.
+        """
+        self.tracks = tracks
+        self.title = title
+        self.render_line = render_line
+        self.max_length = max_length
+
+        self._starts: list[int] = [0]
+
+    def __call__(self, page: int) -> discord.Embed | None:
+        """Render a page, or None if there is no such page."""
+        while len(self._starts) <= page + 1:
+            start = self._starts[-1]
+
+            if start >= len(self.tracks):
+                break
+
+            self._starts.append(start + len(self._fill(start)))
+
+        if page < 0 or page + 1 >= len(self._starts):
+            # An empty list still gets its empty page.
+            return self._embed("") if page == 0 else None
+
+        lines = self._fill(self._starts[page])
+
+        # The queue got shorter since this page was counted.
+        if not lines and page > 0:
+            return None
+
+        return self._embed("".join(lines))
+
+    def _fill(self, start: int) -> list[str]:
+        """Lines of the page starting at `start`, at least one even if it is too long."""
+        lines: list[str] = []
+        length = 0
+
+        while True:
+            chunk = self.tracks[start + len(lines) : start + len(lines) + SCAN_SIZE]
+
+            if not chunk:
+                return lines
+
+            for track in chunk:
+                line = self.render_line(start + len(lines) + 1, track)
+
+                if lines and length + len(line) > self.max_length:
+                    return lines
+
+                lines.append(line)
+                length += len(line)
+
+    def _embed(self, description: str) -> discord.Embed:
+        return discord.Embed(title=self.title, color=discord.Color.orange(), description=description)
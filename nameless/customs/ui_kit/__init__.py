@@ -1,5 +1,7 @@
 from .NamelessDropdown import *
 from .NamelessModal import *
+from .NamelessPaginator import *
 from .NamelessTrackDropdown import *
+from .NamelessTrackPages import *
 from .NamelessVoteMenu import *
 from .NamelessYNPrompt import *
@@ -1,2 +1,6 @@
+from .async_crud import *
 from .crud import *
+from .engine import *
+from .guild_cache import *
 from .models import *
+from .write_behind import *
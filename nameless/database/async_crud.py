@@ -0,0 +1,402 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import cast
+
+import discord
+from sqlalchemy import bindparam, delete, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from nameless.database.engine import apply_database_profile, get_database_url, get_engine_options
+from nameless.database.guild_cache import GuildSettingsCache
+from nameless.database.models import DbGuild, DbPlayerSnapshot, DbUser, DbVoiceRoom
+from nameless.database.models.base import Base
+from nameless.database.models.discord_snowflake import DiscordObject
+from nameless.database.statements import bulk_insert_if_missing, upsert
+from nameless.database.write_behind import WriteBehindQueue
+from nameless.utils import get_config_option
+
+__all__ = ["AsyncCRUD"]
+
+
+class AsyncCRUD:
+    """
+    Non-blocking database CRUD operations.
+    Every query is awaited on SQLAlchemy's asyncio engine, so a slow disk never stalls the event loop.
+
+    Each operation runs in its own short-lived session, unless one from `session_scope()` is passed in.
+    Returned records are detached, save them with `save_guild_record()` or `save_user_record()`.
+    """
+
+    # The aiosqlite dialect opens a connection per checkout by default, keep a real pool instead.
+    engine = create_async_engine(
+        get_database_url(use_async=True), poolclass=AsyncAdaptedQueuePool, **get_engine_options()
+    )
+    apply_database_profile(engine.sync_engine)
+
+    # Settings changes only reach the database when the write-behind queue commits them.
+    _session = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+
+    # Guild settings rarely change, but are read on almost every gateway event.
+    guild_cache = GuildSettingsCache(
+        maxsize=get_config_option("DATABASE", "GUILD_CACHE_SIZE", 4096),
+        ttl=get_config_option("DATABASE", "GUILD_CACHE_TTL", 0),
+    )
+
+    # Coalesce settings changes, and commit them in batches instead of once per command.
+    write_behind = WriteBehindQueue(lambda records: AsyncCRUD._commit_records(records), interval=0.5, max_pending=100)
+
+    @staticmethod
+    async def init():
+        async with AsyncCRUD.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    @staticmethod
+    async def close():
+        """Write pending changes, then release every pooled connection."""
+        await AsyncCRUD.write_behind.close()
+        AsyncCRUD.guild_cache.clear()
+
+        await AsyncCRUD.engine.dispose()
+
+    @staticmethod
+    @asynccontextmanager
+    async def session_scope() -> AsyncIterator[AsyncSession]:
+        """
+        Open a session for one unit of work, like an interaction or a gateway event.
+        It is committed when the block exits, and rolled back if the block raises.
+        """
+        async with AsyncCRUD._session.begin() as session:
+            yield session
+
+    @staticmethod
+    @asynccontextmanager
+    async def _use(session: AsyncSession | None) -> AsyncIterator[AsyncSession]:
+        """Use the caller's session if there is one, open a scope of our own otherwise."""
+        if session is not None:
+            yield session
+            return
+
+        async with AsyncCRUD.session_scope() as own_session:
+            yield own_session
+
+    @staticmethod
+    async def get_or_create_user_record(
+        discord_user: discord.Member | discord.User | discord.Object, *, session: AsyncSession | None = None
+    ) -> DbUser:
+        """
+        Get an existing discord_user record, create a new record if one doesn't exist
+        :param discord_user: User entity of discord.
+        :param session: Session to run in, a new one is opened if not given.
+        :return: User record in database
+        """
+        async with AsyncCRUD._use(session) as s:
+            u = await AsyncCRUD.get_user_record(discord_user, session=s)
+
+            if not u:
+                return await AsyncCRUD.create_user_record(discord_user, session=s)
+
+            return u
+
+    @staticmethod
+    async def get_or_create_guild_record(
+        discord_guild: discord.Guild | discord.Object | None, *, session: AsyncSession | None = None
+    ) -> DbGuild:
+        """
+        Get an existing guild record, create a new record if one doesn't exist
+        :param discord_guild: Guild entity of discord
+        :param session: Session to run in, a new one is opened if not given.
+        :return: Guild record in database
+        """
+        if not discord_guild:
+            raise ValueError("You are executing guild database query in a not-a-guild! This is invalid!")
+
+        if cached := AsyncCRUD.guild_cache.get(discord_guild.id):
+            return cached
+
+        async with AsyncCRUD._use(session) as s:
+            g = await AsyncCRUD._select_guild_record(discord_guild.id, s)
+
+            if not g:
+                return await AsyncCRUD.create_guild_record(discord_guild, session=s)
+
+            return g
+
+    @staticmethod
+    async def get_user_record(
+        discord_user: discord.Member | discord.User | discord.Object, *, session: AsyncSession | None = None
+    ) -> DbUser | None:
+        """Get user record, pending changes included"""
+        if pending := AsyncCRUD.write_behind.get(DbUser, discord_user.id):
+            return cast(DbUser, pending)
+
+        async with AsyncCRUD._use(session) as s:
+            return await s.scalar(select(DbUser).filter_by(discord_id=discord_user.id))
+
+    @staticmethod
+    async def get_guild_record(
+        discord_guild: discord.Guild | discord.Object | None, *, session: AsyncSession | None = None
+    ) -> DbGuild | None:
+        """Get guild record, from the cache if possible, from the database otherwise"""
+        if not discord_guild:
+            raise ValueError("You are executing guild database query in a not-a-guild! This is invalid!")
+
+        if cached := AsyncCRUD.guild_cache.get(discord_guild.id):
+            return cached
+
+        async with AsyncCRUD._use(session) as s:
+            return await AsyncCRUD._select_guild_record(discord_guild.id, s)
+
+    @staticmethod
+    async def prefetch_guild_records(guild_ids: Iterable[int], *, chunk_size: int = 500) -> list[DbGuild]:
+        """
+        Load the records of many guilds into the guild cache, creating the missing ones.
+        Rows are read with a few chunked `IN (...)` queries, and missing rows are created with one bulk insert.
+        :param guild_ids: IDs of the guilds to load.
+        :param chunk_size: Maximum number of IDs in one `IN (...)` query.
+        :return: Records of every requested guild.
+        """
+        start = time.perf_counter()
+        ids = list(dict.fromkeys(guild_ids))
+        records: dict[int, DbGuild] = {}
+
+        # Every record must fit, or the first ones would be evicted before the prefetch is done.
+        AsyncCRUD.guild_cache.reserve(len(ids))
+
+        async with AsyncCRUD.session_scope() as session:
+
+            async def load(chunked_ids: list[int]):
+                for i in range(0, len(chunked_ids), chunk_size):
+                    query = select(DbGuild).where(DbGuild.discord_id.in_(chunked_ids[i : i + chunk_size]))
+                    records.update((g.discord_id, g) for g in await session.scalars(query))
+
+            await load(ids)
+
+            if missing := [guild_id for guild_id in ids if guild_id not in records]:
+                await session.execute(
+                    bulk_insert_if_missing(DbGuild, AsyncCRUD.engine.dialect.name),
+                    [{"discord_id": guild_id} for guild_id in missing],
+                )
+                await load(missing)
+
+        # Pending changes are newer than what we just read.
+        prefetched = [cast(DbGuild, AsyncCRUD.write_behind.get(DbGuild, i)) or g for i, g in records.items()]
+
+        for g in prefetched:
+            AsyncCRUD.guild_cache.put(g)
+
+        logging.info(
+            "Prefetched %d guild record(s), created %d, in %.2f ms",
+            len(records),
+            len(missing),
+            (time.perf_counter() - start) * 1000,
+        )
+
+        return prefetched
+
+    @staticmethod
+    async def get_voice_room_channel_ids(*, session: AsyncSession | None = None) -> set[int]:
+        """Get the ID of every configured VoiceMaster master channel"""
+        # Pending changes must be read back as well.
+        await AsyncCRUD.write_behind.flush()
+
+        async with AsyncCRUD._use(session) as s:
+            return set(await s.scalars(select(DbGuild.voice_room_channel_id).where(DbGuild.voice_room_channel_id != 0)))
+
+    @staticmethod
+    async def get_voice_room_records(*, session: AsyncSession | None = None) -> list[DbVoiceRoom]:
+        """Get every tracked VoiceMaster room"""
+        async with AsyncCRUD._use(session) as s:
+            return list(await s.scalars(select(DbVoiceRoom)))
+
+    @staticmethod
+    async def create_voice_room_record(
+        channel_id: int, guild_id: int, owner_id: int, *, session: AsyncSession | None = None
+    ) -> DbVoiceRoom:
+        """
+        Track a VoiceMaster room in the database
+        :param channel_id: ID of the room voice channel.
+        :param guild_id: ID of the guild the room is in.
+        :param owner_id: ID of the member owning the room.
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        room = DbVoiceRoom(channel_id, guild_id, owner_id)
+
+        async with AsyncCRUD._use(session) as s:
+            s.add(room)
+
+        return room
+
+    @staticmethod
+    async def set_voice_room_owner(channel_id: int, owner_id: int, *, session: AsyncSession | None = None) -> None:
+        """
+        Hand a tracked VoiceMaster room over to another member
+        :param channel_id: ID of the room voice channel.
+        :param owner_id: ID of the new owner.
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        async with AsyncCRUD._use(session) as s:
+            await s.execute(update(DbVoiceRoom).filter_by(discord_id=channel_id).values(owner_id=owner_id))
+
+    @staticmethod
+    async def delete_voice_room_records(channel_ids: Iterable[int], *, session: AsyncSession | None = None) -> None:
+        """
+        Stop tracking many VoiceMaster rooms at once
+        :param channel_ids: IDs of the room voice channels.
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        if not (ids := list(channel_ids)):
+            return
+
+        async with AsyncCRUD._use(session) as s:
+            await s.execute(delete(DbVoiceRoom).where(DbVoiceRoom.discord_id.in_(ids)))
+
+    @staticmethod
+    async def get_player_snapshots(*, session: AsyncSession | None = None) -> list[DbPlayerSnapshot]:
+        """Get every saved music player state"""
+        async with AsyncCRUD._use(session) as s:
+            return list(await s.scalars(select(DbPlayerSnapshot)))
+
+    @staticmethod
+    async def replace_player_snapshots(
+        snapshots: Iterable[DbPlayerSnapshot], *, session: AsyncSession | None = None
+    ) -> None:
+        """
+        Replace every saved music player state at once, players missing from `snapshots` are forgotten
+        :param snapshots: States of the players alive right now.
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        async with AsyncCRUD._use(session) as s:
+            await s.execute(delete(DbPlayerSnapshot))
+            s.add_all(snapshots)
+
+    @staticmethod
+    async def _select_guild_record(guild_id: int, session: AsyncSession) -> DbGuild | None:
+        """Query a guild record bypassing the cache, and cache it if found."""
+        g = cast(DbGuild | None, AsyncCRUD.write_behind.get(DbGuild, guild_id)) or await session.scalar(
+            select(DbGuild).filter_by(discord_id=guild_id)
+        )
+
+        if g:
+            AsyncCRUD.guild_cache.put(g)
+
+        return g
+
+    @staticmethod
+    async def create_user_record(
+        discord_user: discord.Member | discord.User | discord.Object, *, session: AsyncSession | None = None
+    ) -> DbUser:
+        """Create a database entry for the Discord user and return one"""
+        async with AsyncCRUD._use(session) as s:
+            u = await s.scalar(
+                upsert(DbUser, discord_user.id, AsyncCRUD.engine.dialect.name),
+                execution_options={"populate_existing": True},
+            )
+
+        # Pending changes are newer than the row.
+        return cast(DbUser | None, AsyncCRUD.write_behind.get(DbUser, discord_user.id)) or u
+
+    @staticmethod
+    async def create_guild_record(
+        discord_guild: discord.Guild | discord.Object | None, *, session: AsyncSession | None = None
+    ) -> DbGuild:
+        """Create a database entry for the Discord guild and return one"""
+        if not discord_guild:
+            raise ValueError("You are executing guild database query in a not-a-guild! This is invalid!")
+
+        async with AsyncCRUD._use(session) as s:
+            g = await s.scalar(
+                upsert(DbGuild, discord_guild.id, AsyncCRUD.engine.dialect.name),
+                execution_options={"populate_existing": True},
+            )
+
+        # Pending changes are newer than the row.
+        g = cast(DbGuild | None, AsyncCRUD.write_behind.get(DbGuild, discord_guild.id)) or g
+        AsyncCRUD.guild_cache.put(g)
+        return g
+
+    @staticmethod
+    async def delete_guild_record(guild_record: DbGuild | None, *, session: AsyncSession | None = None) -> None:
+        """
+        Delete a guild record from the database
+        :param guild_record: Guild record to delete
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        if guild_record is None:
+            raise ValueError("You are deleting a null guild! Did you ensure that this is not a DM?")
+
+        logging.info("Removing guild entry with ID %s from the database", guild_record.discord_id)
+        AsyncCRUD.guild_cache.invalidate(guild_record.discord_id)
+        AsyncCRUD.write_behind.discard(guild_record)
+
+        async with AsyncCRUD._use(session) as s:
+            await s.execute(delete(DbGuild).filter_by(discord_id=guild_record.discord_id))
+
+    @staticmethod
+    async def delete_user_record(user_record: DbUser | None, *, session: AsyncSession | None = None) -> None:
+        """
+        Delete a discord_user record from the database
+        :param user_record: User record to delete
+        :param session: Session to run in, a new one is opened if not given.
+        """
+        if user_record is None:
+            raise ValueError("You are deleting a null user!")
+
+        logging.info("Removing user entry with ID %s from the database", user_record.discord_id)
+        AsyncCRUD.write_behind.discard(user_record)
+
+        async with AsyncCRUD._use(session) as s:
+            await s.execute(delete(DbUser).filter_by(discord_id=user_record.discord_id))
+
+    @staticmethod
+    async def rollback() -> None:
+        """Revert changes waiting to be written"""
+        AsyncCRUD.write_behind.clear()
+
+        # Cached records may hold the reverted changes, they must be loaded again.
+        AsyncCRUD.guild_cache.clear()
+        logging.info("Rolling back changes in databases")
+
+    @staticmethod
+    async def save_guild_record(guild_record: DbGuild) -> None:
+        """
+        Save changes made on a guild record.
+        They are written through the guild cache right away, and behind to the database shortly after.
+        :param guild_record: Guild record to save
+        """
+        AsyncCRUD.guild_cache.put(guild_record)
+        AsyncCRUD.write_behind.mark_dirty(guild_record)
+
+    @staticmethod
+    async def save_user_record(user_record: DbUser) -> None:
+        """
+        Save changes made on a user record, they are written behind to the database shortly after.
+        :param user_record: User record to save
+        """
+        AsyncCRUD.write_behind.mark_dirty(user_record)
+
+    @staticmethod
+    async def save_changes() -> None:
+        """Write every pending change now, without waiting for the write-behind queue"""
+        await AsyncCRUD.write_behind.flush()
+
+    @staticmethod
+    async def _commit_records(records: list[DiscordObject]) -> None:
+        """Commit a batch of dirty records in one transaction, with one UPDATE statement per table."""
+        batches: dict[type[DiscordObject], list[dict]] = {}
+
+        for record in records:
+            mapper = inspect(type(record))
+            row = {attr.columns[0].name: getattr(record, attr.key) for attr in mapper.column_attrs}
+            row["record_id"] = record.discord_id
+
+            batches.setdefault(type(record), []).append(row)
+
+        # Failed batches go back to the write-behind queue, the cached records are still what will be written.
+        async with AsyncCRUD.session_scope() as session:
+            for model, rows in batches.items():
+                # Core statements skip the ORM row count check, a row deleted meanwhile is simply left alone.
+                stmt = update(model.__table__).where(inspect(model).primary_key[0] == bindparam("record_id"))
+                await session.execute(stmt, rows)
@@ -4,29 +4,28 @@ import discord
 import sqlalchemy
 from sqlalchemy import create_engine
 from sqlalchemy.exc import InvalidRequestError
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 
-import nameless.runtime_config as runtime_config
+from nameless.database.engine import apply_database_profile, get_database_url, get_engine_options
 from nameless.database.models import DbGuild, DbUser
 from nameless.database.models.base import Base
+from nameless.database.statements import upsert
 
 __all__ = ["CRUD"]
 
 
 class CRUD:
     """
-    Basic database CRUD operations.
+    Basic database CRUD operations, blocking edition.
+    Kept as a compatibility shim for scripts and tests, cogs should await `AsyncCRUD` instead.
     """
 
-    engine = create_engine(
-        "sqlite:///nameless.db",
-        logging_name="nameless",
-        hide_parameters=not runtime_config.is_debug,
-        isolation_level="AUTOCOMMIT",
-    )
+    engine = create_engine(get_database_url(use_async=False), isolation_level="AUTOCOMMIT", **get_engine_options())
+    apply_database_profile(engine)
 
+    # One session per thread, instead of one for the whole process.
     _session = sessionmaker(bind=engine)
-    session = _session()
+    session = scoped_session(_session)
 
     @staticmethod
     def init():
@@ -88,14 +87,10 @@ class CRUD:
     @staticmethod
     def create_user_record(discord_user: discord.Member | discord.User | discord.Object) -> DbUser:
         """Create a database entry for the Discord user and return one"""
-        decoy_user = DbUser(discord_user.id)
-
-        if not CRUD.session.query(DbUser).filter_by(discord_id=discord_user.id).one_or_none():  # noqa
-            CRUD.session.add(decoy_user)
-
-            return decoy_user
-
-        return CRUD.session.query(DbUser).filter_by(discord_id=discord_user.id).one()
+        return CRUD.session.scalars(
+            upsert(DbUser, discord_user.id, CRUD.engine.dialect.name),
+            execution_options={"populate_existing": True},
+        ).one()
 
     @staticmethod
     def create_guild_record(discord_guild: discord.Guild | discord.Object | None) -> DbGuild:
@@ -103,14 +98,10 @@ class CRUD:
         if not discord_guild:
             raise ValueError("You are executing guild database query in a not-a-guild! This is invalid!")
 
-        decoy_guild = DbGuild(discord_guild.id)
-
-        if not CRUD.session.query(DbGuild).filter_by(discord_id=discord_guild.id).one_or_none():  # noqa
-            CRUD.session.add(decoy_guild)
-
-            return decoy_guild
-
-        return CRUD.session.query(DbGuild).filter_by(discord_id=discord_guild.id).one()
+        return CRUD.session.scalars(
+            upsert(DbGuild, discord_guild.id, CRUD.engine.dialect.name),
+            execution_options={"populate_existing": True},
+        ).one()
 
     @staticmethod
     def delete_guild_record(guild_record: DbGuild | None) -> None:
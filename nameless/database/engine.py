@@ -0,0 +1,75 @@
+from typing import Any
+
+from sqlalchemy import URL, Engine, event, make_url
+
+import nameless.runtime_config as runtime_config
+from nameless.utils import get_config_option
+
+__all__ = ["get_database_url", "get_engine_options", "apply_database_profile"]
+
+# Database used when the config has none, a SQLite file next to the bot.
+DEFAULT_DATABASE_URL = "sqlite:///nameless.db"
+
+# Drivers to use when the configured URL does not name one.
+ASYNC_DRIVERS: dict[str, str] = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# Set on every new SQLite connection by the "performance" profile.
+SQLITE_PERFORMANCE_PRAGMAS: list[str] = [
+    # Readers keep reading while a writer commits, instead of waiting for it.
+    "journal_mode=WAL",
+    # In WAL mode, this is still safe from corruption, only the last commits may be lost on power loss.
+    "synchronous=NORMAL",
+    # 256 MiB of memory-mapped reads.
+    "mmap_size=268435456",
+    # 64 MiB of page cache, negative values are in KiB.
+    "cache_size=-65536",
+    # Wait up to 5 seconds for a lock before failing with "database is locked".
+    "busy_timeout=5000",
+]
+
+
+def get_database_url(*, use_async: bool) -> URL:
+    """
+    Get the configured database URL, with a driver matching the engine flavor.
+    :param use_async: Whether the URL is meant for an asyncio engine.
+    """
+    url = make_url(get_config_option("DATABASE", "URL", DEFAULT_DATABASE_URL))
+    backend = url.get_backend_name()
+
+    if not use_async:
+        return url.set(drivername=backend)
+
+    if "+" in url.drivername:
+        return url
+
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS.get(backend, url.get_driver_name())}")
+
+
+def get_engine_options() -> dict[str, Any]:
+    """Get the keyword arguments shared by every engine, pool sizing included."""
+    return {
+        "logging_name": "nameless",
+        "hide_parameters": not runtime_config.is_debug,
+        "pool_size": get_config_option("DATABASE", "POOL_SIZE", 5),
+        "max_overflow": get_config_option("DATABASE", "MAX_OVERFLOW", 10),
+        # Server side databases may drop idle connections, a local SQLite file never does.
+        "pool_pre_ping": get_database_url(use_async=False).get_backend_name() != "sqlite",
+    }
+
+
+def apply_database_profile(engine: Engine) -> None:
+    """
+    Apply the configured database profile on every new connection of an engine.
+    :param engine: Engine to tune, pass `sync_engine` for an asyncio engine.
+    """
+    if engine.dialect.name != "sqlite" or get_config_option("DATABASE", "PROFILE", "default") != "performance":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+
+        for pragma in SQLITE_PERFORMANCE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+
+        cursor.close()
@@ -0,0 +1,79 @@
+from cachetools import LRUCache, TTLCache
+
+from nameless.database.models import DbGuild
+
+__all__ = ["GuildSettingsCache"]
+
+
+class GuildSettingsCache:
+    """
+    Bounded LRU/TTL cache of guild records, keyed by guild ID.
+    Least recently used entries are evicted when full, every entry expires after `ttl` seconds if it is set.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 0):
+        """
+        :param maxsize: Records kept at most, see `reserve` to grow it.
+        :param ttl: Seconds a record is kept, '0' keeps it until it is evicted.
+        """
+        self.ttl = ttl
+        self._records: LRUCache[int, DbGuild] = self._make_records(maxsize)
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _make_records(self, maxsize: int) -> LRUCache[int, DbGuild]:
+        return TTLCache(maxsize=maxsize, ttl=self.ttl) if self.ttl > 0 else LRUCache(maxsize=maxsize)
+
+    @property
+    def maxsize(self) -> int:
+        return int(self._records.maxsize)
+
+    def reserve(self, count: int) -> None:
+        """
+        Grow the cache to hold `count` records, with room left for a quarter more.
+        Records already cached are kept.
+        """
+        wanted = count + count // 4
+
+        if wanted <= self.maxsize:
+            return
+
+        records = self._make_records(wanted)
+        records.update(self._records)
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._records
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups served from memory, between 0 and 1."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, guild_id: int) -> DbGuild | None:
+        """Get the cached record of a guild, counting the lookup as a hit or a miss."""
+        record = self._records.get(guild_id)
+
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return record
+
+    def put(self, record: DbGuild) -> None:
+        """Cache (or replace) a guild record."""
+        self._records[record.discord_id] = record
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drop a guild record, the next lookup will hit the database."""
+        self._records.pop(guild_id, None)
+
+    def clear(self) -> None:
+        """Drop every record, the counters are kept."""
+        self._records.clear()
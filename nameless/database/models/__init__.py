@@ -1,4 +1,6 @@
 from .base import Base
 from .discord_guild import *
+from .discord_player_snapshot import *
 from .discord_snowflake import *
 from .discord_user import *
+from .discord_voice_room import *
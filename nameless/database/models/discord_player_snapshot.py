@@ -0,0 +1,42 @@
+import zlib
+
+from sqlalchemy import BigInteger, LargeBinary, UnicodeText
+from sqlalchemy.orm import Mapped, mapped_column
+
+from nameless.database.models.discord_snowflake import DiscordObject
+
+__all__ = ["DbPlayerSnapshot"]
+
+
+class DbPlayerSnapshot(DiscordObject):
+    """
+    Saved state of a music player, keyed by the guild ID.
+    Tracks are kept as Lavalink encoded strings, so they are decoded back without searching again.
+    """
+
+    __tablename__ = "PlayerSnapshots"
+
+    channel_id: Mapped[int] = mapped_column("ChannelId", BigInteger)
+    trigger_channel_id: Mapped[int] = mapped_column("TriggerChannelId", BigInteger, default=0)
+    play_now_allowed: Mapped[bool] = mapped_column("PlayNowAllowed", default=False)
+    current_track: Mapped[str] = mapped_column("CurrentTrack", UnicodeText, default="")
+    position: Mapped[int] = mapped_column("Position", BigInteger, default=0)
+    paused: Mapped[bool] = mapped_column("Paused", default=False)
+    volume: Mapped[int] = mapped_column("Volume", default=100)
+    queue_mode: Mapped[int] = mapped_column("QueueMode", default=0)
+    autoplay: Mapped[int] = mapped_column("AutoPlay", default=2)
+    packed_queue: Mapped[bytes] = mapped_column("PackedQueue", LargeBinary, default=b"")
+
+    def __init__(self, guild_id: int, channel_id: int):
+        super().__init__(guild_id)
+        self.channel_id = channel_id
+
+    @property
+    def queue(self) -> list[str]:
+        """Encoded tracks waiting in the queue."""
+        return zlib.decompress(self.packed_queue).decode().split("\n") if self.packed_queue else []
+
+    @queue.setter
+    def queue(self, encoded_tracks: list[str]) -> None:
+        # Encoded tracks are base64, a newline never shows up in them. They share a lot, so they compress well.
+        self.packed_queue = zlib.compress("\n".join(encoded_tracks).encode()) if encoded_tracks else b""
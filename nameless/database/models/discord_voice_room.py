@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from nameless.database.models.discord_snowflake import DiscordObject
+
+__all__ = ["DbVoiceRoom"]
+
+
+class DbVoiceRoom(DiscordObject):
+    """A temporary VoiceMaster channel, keyed by the channel ID."""
+
+    __tablename__ = "VoiceRooms"
+
+    guild_id: Mapped[int] = mapped_column("GuildId", BigInteger, index=True)
+    owner_id: Mapped[int] = mapped_column("OwnerId", BigInteger)
+
+    def __init__(self, channel_id: int, guild_id: int, owner_id: int):
+        super().__init__(channel_id)
+        self.guild_id = guild_id
+        self.owner_id = owner_id
@@ -0,0 +1,36 @@
+from sqlalchemy import Insert, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from nameless.database.models.discord_snowflake import DiscordObject
+
+__all__ = ["upsert", "bulk_insert_if_missing"]
+
+
+def _insert(model: type[DiscordObject], dialect_name: str) -> postgresql.Insert | sqlite.Insert:
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+
+    return sqlite.insert(model)
+
+
+def upsert(model: type[DiscordObject], discord_id: int, dialect_name: str = "sqlite") -> Insert:
+    """
+    Build an `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement for a Discord entity.
+    The row is returned in the same round trip, whether it was just created or was already there,
+    which includes losing a race against another insert.
+    The update only sets `discord_id` to itself, `DO NOTHING` would not return the existing row.
+    :param dialect_name: Name of the dialect the statement will run on.
+    """
+    stmt = _insert(model, dialect_name).values(discord_id=discord_id)
+    key = inspect(model).primary_key[0]
+    stmt = stmt.on_conflict_do_update(index_elements=[key], set_={key: stmt.excluded[key.name]})
+
+    return stmt.returning(model)
+
+
+def bulk_insert_if_missing(model: type[DiscordObject], dialect_name: str = "sqlite") -> Insert:
+    """
+    Build an `INSERT ... ON CONFLICT DO NOTHING` statement to be executed with many `discord_id` parameters at once.
+    :param dialect_name: Name of the dialect the statement will run on.
+    """
+    return _insert(model, dialect_name).on_conflict_do_nothing(index_elements=[inspect(model).primary_key[0]])
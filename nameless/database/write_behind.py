@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from nameless.database.models.discord_snowflake import DiscordObject
+
+__all__ = ["WriteBehindQueue"]
+
+
+class WriteBehindQueue:
+    """
+    Coalesce dirty records, then hand them over to be committed in one transaction.
+    A batch is written every `interval` seconds, or as soon as `max_pending` distinct records are waiting.
+    A batch failing to commit is put back, and tried again `interval` seconds later.
+    """
+
+    def __init__(
+        self,
+        committer: Callable[[list[DiscordObject]], Awaitable[None]],
+        *,
+        interval: float = 0.5,
+        max_pending: int = 100,
+    ):
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self._committer = committer
+        self._pending: dict[tuple[type[DiscordObject], int], DiscordObject] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+        # Bumped by `clear`, a batch failing after it must not bring back what was forgotten.
+        self._generation: int = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def mark_dirty(self, record: DiscordObject) -> None:
+        """Queue a record to be written, marking the same record again before the flush costs nothing."""
+        self._pending[(type(record), record.discord_id)] = record
+
+        if len(self._pending) >= self.max_pending:
+            self._flush_in_background()
+        else:
+            self._start_timer()
+
+    def get(self, model: type[DiscordObject], discord_id: int) -> DiscordObject | None:
+        """Get a record waiting to be written, it is newer than what the database holds."""
+        return self._pending.get((model, discord_id))
+
+    def discard(self, record: DiscordObject) -> None:
+        """Forget a pending record without writing it, for records about to be deleted."""
+        self._pending.pop((type(record), record.discord_id), None)
+
+    def clear(self) -> None:
+        """Forget every pending record without writing them."""
+        self._cancel_timer()
+        self._pending.clear()
+        self._generation += 1
+
+    async def flush(self) -> None:
+        """Write every pending record right now."""
+        self._cancel_timer()
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        generation = self._generation
+
+        logging.debug("Writing %d record(s) back to the database", len(pending))
+
+        try:
+            await self._committer(list(pending.values()))
+        except Exception:
+            # Marked again meanwhile, the newer record wins.
+            if generation == self._generation:
+                self._pending = pending | self._pending
+                self._start_timer()
+
+            raise
+
+    async def close(self) -> None:
+        """Wait for in-flight batches, then write whatever is left."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        await self.flush()
+
+    def _start_timer(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._flush_in_background)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_in_background(self) -> None:
+        async def runner():
+            try:
+                await self.flush()
+            except Exception:
+                logging.exception("Unable to write pending records back to the database!")
+
+        task = asyncio.create_task(runner())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -24,6 +24,9 @@ class Nameless(commands.AutoShardedBot):
         self.log_level: int = logging.DEBUG if is_debug else logging.INFO
         self.is_debug = is_debug
 
+        # on_ready fires again after a reconnect, the guild records only need to be warmed up once.
+        self.guild_records_prefetched: bool = False
+
         self.loggers: list[logging.Logger] = [
             logging.getLogger(),
             logging.getLogger("sqlalchemy.engine"),
@@ -93,9 +96,9 @@ class Nameless(commands.AutoShardedBot):
 
     async def setup_hook(self) -> None:
         logging.info("Initiating database.")
-        from .database import CRUD
+        from .database import AsyncCRUD
 
-        CRUD.init()
+        await AsyncCRUD.init()
 
         logging.info("Registering commands")
         await self.register_all_commands()
@@ -113,6 +116,17 @@ class Nameless(commands.AutoShardedBot):
             logging.warning("Please wait at least one hour before using global commands")
 
     async def on_ready(self):
+        if not self.guild_records_prefetched:
+            logging.info("Prefetching guild records")
+            from .database import AsyncCRUD
+
+            try:
+                await AsyncCRUD.prefetch_guild_records(guild.id for guild in self.guilds)
+                self.guild_records_prefetched = True
+            except Exception:
+                # Records are then fetched as they are needed, and the prefetch is tried again on the next ready.
+                logging.exception("Unable to prefetch the guild records!")
+
         logging.info("Setting presence")
         status = NamelessConfig.STATUS
 
@@ -144,7 +158,29 @@ class Nameless(commands.AutoShardedBot):
         logging.info("Starting the bot...")
         self.run(NamelessConfig.TOKEN, log_handler=None)
 
+    async def save_player_states(self) -> None:
+        """Save the music players, so they resume where they were on the next start."""
+        save = getattr(self.get_cog("music"), "save_player_states", None)
+
+        if save is None:
+            return
+
+        try:
+            await save()
+        except Exception:
+            logging.exception("Unable to save the music player states!")
+
     async def close(self) -> None:
         logging.warning("Shutting down...")
         close_all_sessions()
-        await super().close()
+
+        # Before the players are disconnected by discord.py.
+        await self.save_player_states()
+
+        from .database import AsyncCRUD
+
+        # Writes back the pending settings changes first, nothing is lost at shutdown.
+        try:
+            await AsyncCRUD.close()
+        finally:
+            await super().close()
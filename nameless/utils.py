@@ -1,6 +1,21 @@
+from typing import TypeVar
 from urllib.parse import urlparse
 
+from NamelessConfig import NamelessConfig
+
+__all__ = ["is_an_url", "get_config_option"]
+
+T = TypeVar("T")
+
 
 def is_an_url(url: str) -> bool:
     """Verifies if the provided string is a URL."""
     return urlparse(url).netloc != ""
+
+
+def get_config_option(section: str, name: str, default: T) -> T:
+    """
+    Get an option from a section of the config, or its default value.
+    Configs written before the section or the option existed keep working.
+    """
+    return getattr(getattr(NamelessConfig, section, None), name, default)
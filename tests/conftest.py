@@ -0,0 +1,47 @@
+"""Track factories shared by the tests."""
+
+import wavelink
+
+from nameless.customs import encode_track_info
+
+
+def make_track(identifier: str) -> wavelink.Playable:
+    return wavelink.Playable(
+        {
+            "encoded": f"encoded-{identifier}",
+            "info": {
+                "identifier": identifier,
+                "isSeekable": True,
+                "author": "nameless*",
+                "length": 1000,
+                "isStream": False,
+                "position": 0,
+                "title": f"Track {identifier}",
+                "sourceName": "youtube",
+            },
+            "pluginInfo": {},
+        }
+    )
+
+
+def make_info(identifier: str, **fields) -> dict:
+    info = {
+        "identifier": identifier,
+        "isSeekable": True,
+        "author": "nameless* - Topic",
+        "length": 1000,
+        "isStream": False,
+        "position": 0,
+        "title": f"Track {identifier}",
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+        "artworkUrl": f"https://i.ytimg.com/vi/{identifier}/maxresdefault.jpg",
+        "isrc": None,
+        "sourceName": "youtube",
+    }
+    info.update(fields)
+    return info
+
+
+def make_playable(identifier: str, **fields) -> wavelink.Playable:
+    info = make_info(identifier, **fields)
+    return wavelink.Playable({"encoded": encode_track_info(info), "info": info, "pluginInfo": {}})  # type: ignore
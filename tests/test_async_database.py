@@ -0,0 +1,293 @@
+import asyncio
+
+import discord
+import pytest
+
+from nameless.database import AsyncCRUD
+from nameless.database.models import DbPlayerSnapshot
+
+
+class TestAsyncDatabase:
+    @pytest.fixture(autouse=True)
+    def fixture(self):
+        self.mock_user = discord.Object(id=3)  # pylint: disable=W0201
+        self.mock_guild = discord.Object(id=4)  # pylint: disable=W0201
+
+        yield
+
+        # Post-testing cleanup
+        async def cleanup():
+            if u := await AsyncCRUD.get_user_record(self.mock_user):
+                await AsyncCRUD.delete_user_record(u)
+
+            if g := await AsyncCRUD.get_guild_record(self.mock_guild):
+                await AsyncCRUD.delete_guild_record(g)
+
+        self.run(cleanup())
+
+    @staticmethod
+    def run(coro):
+        # Every test gets a fresh event loop, so the pooled connections must not outlive it.
+        async def runner():
+            try:
+                await AsyncCRUD.init()
+                return await coro
+            finally:
+                await AsyncCRUD.close()
+
+        return asyncio.run(runner())
+
+    def test_user_read_pass(self):
+        async def case():
+            await AsyncCRUD.create_user_record(self.mock_user)
+            assert await AsyncCRUD.get_user_record(self.mock_user) is not None
+
+        self.run(case())
+
+    def test_guild_read_pass(self):
+        async def case():
+            await AsyncCRUD.create_guild_record(self.mock_guild)
+            assert await AsyncCRUD.get_guild_record(self.mock_guild) is not None
+
+        self.run(case())
+
+    def test_guild_defaults_populated(self):
+        async def case():
+            g = await AsyncCRUD.create_guild_record(self.mock_guild)
+            assert g.voice_room_channel_id == 0
+            assert g.is_welcome_enabled
+
+        self.run(case())
+
+    def test_guild_delete(self):
+        async def case():
+            g = await AsyncCRUD.create_guild_record(self.mock_guild)
+
+            await AsyncCRUD.delete_guild_record(g)
+            assert await AsyncCRUD.get_guild_record(self.mock_guild) is None
+
+        self.run(case())
+
+    def test_guild_write_once_more(self):
+        async def case():
+            await AsyncCRUD.create_guild_record(self.mock_guild)
+            await AsyncCRUD.create_guild_record(self.mock_guild)
+            assert await AsyncCRUD.get_guild_record(self.mock_guild) is not None
+
+        self.run(case())
+
+    def test_get_or_create_user(self):
+        async def case():
+            assert await AsyncCRUD.get_user_record(self.mock_user) is None
+            await AsyncCRUD.get_or_create_user_record(self.mock_user)
+            assert await AsyncCRUD.get_user_record(self.mock_user) is not None
+
+        self.run(case())
+
+    def test_changes_are_saved(self):
+        async def case():
+            g = await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            g.welcome_message = "Hello {name}"
+            await AsyncCRUD.save_guild_record(g)
+            await AsyncCRUD.save_changes()
+
+            assert len(AsyncCRUD.write_behind) == 0
+
+        self.run(case())
+
+        async def verify():
+            g = await AsyncCRUD.get_guild_record(self.mock_guild)
+            assert g is not None
+            assert g.welcome_message == "Hello {name}"
+
+        self.run(verify())
+
+    def test_concurrent_get_or_create(self):
+        async def case():
+            records = await asyncio.gather(*[AsyncCRUD.get_or_create_guild_record(self.mock_guild) for _ in range(10)])
+            assert all(r.discord_id == self.mock_guild.id for r in records)
+
+        self.run(case())
+
+    def test_get_or_create_dm_channel(self):
+        with pytest.raises(ValueError):
+            self.run(AsyncCRUD.get_or_create_guild_record(None))
+
+    def test_guild_delete_none(self):
+        with pytest.raises(ValueError):
+            self.run(AsyncCRUD.delete_guild_record(None))
+
+    def test_guild_lookup_cached(self):
+        async def case():
+            await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            hits, misses = AsyncCRUD.guild_cache.hits, AsyncCRUD.guild_cache.misses
+
+            for _ in range(5):
+                await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+
+            assert AsyncCRUD.guild_cache.hits == hits + 5
+            assert AsyncCRUD.guild_cache.misses == misses
+
+        self.run(case())
+
+    def test_guild_cache_write_through(self):
+        async def case():
+            g = await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            g.is_dm_preferred = True
+            await AsyncCRUD.save_guild_record(g)
+
+            cached = await AsyncCRUD.get_guild_record(self.mock_guild)
+            assert cached is not None
+            assert cached.is_dm_preferred
+
+        self.run(case())
+
+    def test_guild_cache_invalidated_on_delete(self):
+        async def case():
+            g = await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            await AsyncCRUD.delete_guild_record(g)
+
+            assert self.mock_guild.id not in AsyncCRUD.guild_cache
+
+        self.run(case())
+
+    def test_create_keeps_existing_record(self):
+        async def case():
+            g = await AsyncCRUD.create_guild_record(self.mock_guild)
+            g.goodbye_message = "Bye {name}"
+            await AsyncCRUD.save_guild_record(g)
+
+            again = await AsyncCRUD.create_guild_record(self.mock_guild)
+            assert again.goodbye_message == "Bye {name}"
+
+        self.run(case())
+
+    def test_pending_changes_written_on_close(self):
+        async def case():
+            u = await AsyncCRUD.get_or_create_user_record(self.mock_user)
+            u.osu_username = "peppy"
+            await AsyncCRUD.save_user_record(u)
+
+            assert len(AsyncCRUD.write_behind) == 1
+
+        self.run(case())
+
+        async def verify():
+            u = await AsyncCRUD.get_user_record(self.mock_user)
+            assert u is not None
+            assert u.osu_username == "peppy"
+
+        self.run(verify())
+
+    def test_session_scope_shared(self):
+        async def case():
+            async with AsyncCRUD.session_scope() as session:
+                created = await AsyncCRUD.get_or_create_user_record(self.mock_user, session=session)
+                found = await AsyncCRUD.get_user_record(self.mock_user, session=session)
+
+                assert created is found
+
+        self.run(case())
+
+    def test_session_scope_rolled_back(self):
+        async def case():
+            with pytest.raises(RuntimeError):
+                async with AsyncCRUD.session_scope() as session:
+                    await AsyncCRUD.create_user_record(self.mock_user, session=session)
+                    raise RuntimeError
+
+            assert await AsyncCRUD.get_user_record(self.mock_user) is None
+
+        self.run(case())
+
+    def test_deleted_record_does_not_fail_batch(self):
+        async def case():
+            u = await AsyncCRUD.get_or_create_user_record(self.mock_user)
+            g = await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            u.osu_mode = "Taiko"
+            g.welcome_message = "Still here"
+
+            await AsyncCRUD.save_user_record(u)
+            await AsyncCRUD.save_guild_record(g)
+            await AsyncCRUD.delete_user_record(u)
+            await AsyncCRUD.save_user_record(u)
+            await AsyncCRUD.save_changes()
+
+            AsyncCRUD.guild_cache.clear()
+            g = await AsyncCRUD.get_guild_record(self.mock_guild)
+            assert g is not None
+            assert g.welcome_message == "Still here"
+            assert await AsyncCRUD.get_user_record(self.mock_user) is None
+
+        self.run(case())
+
+    def test_prefetch_guild_records(self):
+        async def case():
+            existing = await AsyncCRUD.create_guild_record(self.mock_guild)
+            existing.welcome_message = "Welcome back"
+            await AsyncCRUD.save_guild_record(existing)
+            await AsyncCRUD.save_changes()
+            AsyncCRUD.guild_cache.clear()
+
+            records = await AsyncCRUD.prefetch_guild_records([self.mock_guild.id, 5, 6, 5], chunk_size=2)
+            assert sorted(g.discord_id for g in records) == [self.mock_guild.id, 5, 6]
+            assert all(g.discord_id in AsyncCRUD.guild_cache for g in records)
+
+            g = await AsyncCRUD.get_guild_record(self.mock_guild)
+            assert g is not None
+            assert g.welcome_message == "Welcome back"
+
+            created = await AsyncCRUD.get_guild_record(discord.Object(id=5))
+            assert created is not None
+            assert created.is_welcome_enabled
+
+            for guild_id in (5, 6):
+                await AsyncCRUD.delete_guild_record(await AsyncCRUD.get_guild_record(discord.Object(id=guild_id)))
+
+        self.run(case())
+
+    def test_voice_room_channel_ids(self):
+        async def case():
+            g = await AsyncCRUD.get_or_create_guild_record(self.mock_guild)
+            assert 42 not in await AsyncCRUD.get_voice_room_channel_ids()
+
+            g.voice_room_channel_id = 42
+            await AsyncCRUD.save_guild_record(g)
+
+            ids = await AsyncCRUD.get_voice_room_channel_ids()
+            assert 42 in ids
+            assert 0 not in ids
+
+        self.run(case())
+
+    def test_voice_room_records(self):
+        async def case():
+            await AsyncCRUD.create_voice_room_record(100, self.mock_guild.id, self.mock_user.id)
+            await AsyncCRUD.create_voice_room_record(101, self.mock_guild.id, 5)
+
+            rooms = {room.discord_id: room for room in await AsyncCRUD.get_voice_room_records()}
+            assert rooms[100].owner_id == self.mock_user.id
+            assert rooms[101].guild_id == self.mock_guild.id
+
+            await AsyncCRUD.delete_voice_room_records([100, 101])
+            assert not {100, 101} & {room.discord_id for room in await AsyncCRUD.get_voice_room_records()}
+
+        self.run(case())
+
+    def test_player_snapshots_replaced(self):
+        async def case():
+            first = DbPlayerSnapshot(self.mock_guild.id, 100)
+            first.queue = ["a", "b"]
+            await AsyncCRUD.replace_player_snapshots([first, DbPlayerSnapshot(5, 101)])
+
+            second = DbPlayerSnapshot(self.mock_guild.id, 102)
+            second.queue = ["c"]
+            await AsyncCRUD.replace_player_snapshots([second])
+
+            snapshots = await AsyncCRUD.get_player_snapshots()
+            assert [(s.discord_id, s.channel_id, s.queue) for s in snapshots] == [(self.mock_guild.id, 102, ["c"])]
+
+            await AsyncCRUD.replace_player_snapshots([])
+            assert not await AsyncCRUD.get_player_snapshots()
+
+        self.run(case())
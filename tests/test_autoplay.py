@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import wavelink
+from wavelink import AutoPlayMode, QueueMode
+
+from nameless.commands.MusicCommands import MusicCommands
+from nameless.customs import NamelessPlayer
+from tests.conftest import make_track
+
+
+def make_player() -> NamelessPlayer:
+    player = NamelessPlayer(nodes=[MagicMock()])
+    player.autoplay = AutoPlayMode.enabled
+    player.play = AsyncMock()
+    player.inactive_timeout = None
+    return player
+
+
+class TestAutoplay:
+    @pytest.fixture(autouse=True)
+    def cog(self, monkeypatch: pytest.MonkeyPatch):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+
+        self.cog = MusicCommands(bot)  # pylint: disable=W0201
+        self.queries: list[str] = []  # pylint: disable=W0201
+
+        async def search(query: str, *, source=None):
+            self.queries.append(query)
+            return [make_track(f"related-{i}") for i in range(30)]
+
+        monkeypatch.setattr(wavelink.Playable, "search", search)
+
+    def test_recommendations_are_shared_by_guilds(self):
+        async def case():
+            seed = make_track("seed")
+            players = [MagicMock(current=seed, add_recommendations=AsyncMock()) for _ in range(3)]
+
+            await asyncio.gather(*[self.cog.prefetch_recommendations(player) for player in players[:2]])
+            await self.cog.prefetch_recommendations(players[2])
+
+            assert self.queries == [self.cog.recommendation_query(seed)]
+            assert self.cog.recommendation_cache.hits == 1
+
+            for player in players:
+                tracks = player.add_recommendations.await_args.args[0]
+                assert [track.identifier for track in tracks] == [f"related-{i}" for i in range(30)]
+
+        asyncio.run(case())
+
+    def test_recommendations_skip_recent_tracks(self):
+        async def case():
+            player = make_player()
+            player.queue.history.put(make_track("related-0"))  # type: ignore
+            player.queue.put(make_track("related-1"))
+
+            added = await player.add_recommendations([make_track(f"related-{i}") for i in range(30)])
+
+            identifiers = {track.identifier for track in player.auto_queue}
+            assert added == len(player.auto_queue) == player._auto_cutoff
+            assert not identifiers & {"related-0", "related-1"}
+            assert all(track.recommended for track in player.auto_queue)
+
+        asyncio.run(case())
+
+    def test_prefetched_tracks_play_without_fetching(self, monkeypatch: pytest.MonkeyPatch):
+        async def case():
+            fetch = AsyncMock()
+            monkeypatch.setattr(wavelink.Player, "_do_recommendation", fetch)
+
+            player = make_player()
+            await player.add_recommendations([make_track("next")])
+            await player._do_recommendation()
+
+            fetch.assert_not_awaited()
+            player.play.assert_awaited_once()
+            assert player.play.await_args.args[0].identifier == "next"
+            assert not player.auto_queue
+
+            await player._do_recommendation()
+            fetch.assert_awaited_once()
+
+        asyncio.run(case())
+
+    def test_prefetch_only_when_autoplay_picks_next(self):
+        async def case():
+            player = make_player()
+            assert self.cog.should_prefetch_recommendations(player)
+
+            player.queue.mode = QueueMode.loop
+            assert not self.cog.should_prefetch_recommendations(player)
+
+            player.queue.mode = QueueMode.normal
+            player.queue.put(make_track("queued"))
+            assert not self.cog.should_prefetch_recommendations(player)
+
+            player.queue.clear()
+            await player.add_recommendations([make_track(str(i)) for i in range(10)])
+            assert not self.cog.should_prefetch_recommendations(player)
+
+        asyncio.run(case())
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from nameless.database import DbGuild, apply_database_profile, get_database_url, get_engine_options
+from nameless.database.models.base import Base
+from nameless.database.statements import upsert
+from NamelessConfig import NamelessConfig
+
+
+class TestDatabaseEngine:
+    def test_sqlite_drivers(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "URL", "sqlite:///nameless.db")
+
+        assert get_database_url(use_async=True).drivername == "sqlite+aiosqlite"
+        assert get_database_url(use_async=False).drivername == "sqlite"
+        assert not get_engine_options()["pool_pre_ping"]
+
+    def test_postgresql_drivers(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "URL", "postgresql+psycopg://nameless:secret@db/nameless")
+
+        assert get_database_url(use_async=True).drivername == "postgresql+psycopg"
+        assert get_database_url(use_async=False).drivername == "postgresql"
+        assert get_database_url(use_async=False).password == "secret"
+        assert get_engine_options()["pool_pre_ping"]
+
+    def test_pool_sizes(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "POOL_SIZE", 20)
+
+        assert get_engine_options()["pool_size"] == 20
+
+    def test_performance_profile(self, monkeypatch: pytest.MonkeyPatch, tmp_path):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "PROFILE", "performance")
+        engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+        apply_database_profile(engine)
+
+        with engine.connect() as conn:
+            assert conn.scalar(text("PRAGMA journal_mode")) == "wal"
+            assert conn.scalar(text("PRAGMA synchronous")) == 1  # NORMAL
+            assert conn.scalar(text("PRAGMA busy_timeout")) == 5000
+
+        engine.dispose()
+
+    def test_performance_profile_async(self, monkeypatch: pytest.MonkeyPatch, tmp_path):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "PROFILE", "performance")
+
+        async def case():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+            apply_database_profile(engine.sync_engine)
+
+            async with engine.connect() as conn:
+                assert await conn.scalar(text("PRAGMA journal_mode")) == "wal"
+
+            await engine.dispose()
+
+        asyncio.run(case())
+
+    def test_default_profile_untouched(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+        apply_database_profile(engine)
+
+        with engine.connect() as conn:
+            assert conn.scalar(text("PRAGMA journal_mode")) == "delete"
+
+        engine.dispose()
+
+    def test_postgresql_upsert(self):
+        statement = upsert(DbGuild, 1, "postgresql")
+        assert 'ON CONFLICT ("DiscordId") DO UPDATE' in str(statement.compile(dialect=postgresql.dialect()))
+
+    def test_upsert_returns_existing_row(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'upsert.db'}")
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            created = session.scalars(upsert(DbGuild, 1)).one()
+            created.is_dm_preferred = True
+            session.commit()
+            session.expunge_all()
+
+            existing = session.scalars(upsert(DbGuild, 1)).one()
+
+            assert existing.discord_id == 1
+            assert existing.is_dm_preferred is True
+            assert session.scalar(select(func.count()).select_from(DbGuild)) == 1
+
+        engine.dispose()
@@ -0,0 +1,63 @@
+import time
+
+from nameless.database import DbGuild, GuildSettingsCache
+
+
+class TestGuildSettingsCache:
+    def test_hit_and_miss_counters(self):
+        cache = GuildSettingsCache()
+
+        assert cache.get(1) is None
+        cache.put(DbGuild(1))
+        assert cache.get(1) is not None
+
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+    def test_bounded_size(self):
+        cache = GuildSettingsCache(maxsize=2)
+
+        for i in range(5):
+            cache.put(DbGuild(i))
+
+        assert len(cache) == 2
+        assert 4 in cache
+
+    def test_expiry(self):
+        cache = GuildSettingsCache(ttl=0.01)
+        cache.put(DbGuild(1))
+
+        time.sleep(0.02)
+        assert cache.get(1) is None
+
+    def test_no_expiry_by_default(self):
+        cache = GuildSettingsCache()
+        cache.put(DbGuild(1))
+
+        time.sleep(0.02)
+        assert cache.get(1) is not None
+
+    def test_reserve_keeps_records(self):
+        cache = GuildSettingsCache(maxsize=2, ttl=60)
+        cache.put(DbGuild(1))
+
+        cache.reserve(1)
+        assert cache.maxsize == 2
+
+        cache.reserve(100)
+        assert cache.maxsize == 125
+        assert 1 in cache
+
+        for i in range(100):
+            cache.put(DbGuild(i))
+
+        assert len(cache) == 100
+
+    def test_invalidate(self):
+        cache = GuildSettingsCache()
+        cache.put(DbGuild(1))
+        cache.invalidate(1)
+        cache.invalidate(2)
+
+        assert 1 not in cache
@@ -0,0 +1,280 @@
+import asyncio
+import random
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import wavelink
+
+from nameless.commands.MusicCommands import INGEST_CHUNK_SIZE, MusicCommands
+from nameless.customs import NamelessQueue
+from nameless.customs.NamelessQueue import BLOCK_SIZE
+from tests.conftest import make_track
+
+
+def make_player(queued: int = 0) -> MagicMock:
+    player = MagicMock()
+    player.connected = True
+    player.current = None
+    player.queue = NamelessQueue()
+    player.ingest_lock = asyncio.Lock()
+    player.queue.put([make_track(f"queued-{i}") for i in range(queued)])
+
+    async def play(track):
+        player.current = track
+
+    player.play = AsyncMock(side_effect=play)
+    return player
+
+
+class TestIngestTracks:
+    def test_tracks_are_appended_in_order(self):
+        player = make_player(queued=2)
+        tracks = [make_track(str(i)) for i in range(INGEST_CHUNK_SIZE * 2 + 1)]
+
+        asyncio.run(MusicCommands.ingest_tracks(player, tracks))
+
+        assert [t.identifier for t in player.queue] == ["queued-0", "queued-1"] + [t.identifier for t in tracks]
+
+    def test_tracks_are_inserted_at_position(self):
+        player = make_player(queued=3)
+        tracks = [make_track(str(i)) for i in range(INGEST_CHUNK_SIZE * 3 + 5)]
+
+        asyncio.run(MusicCommands.ingest_tracks(player, tracks, position=2))
+
+        identifiers = [t.identifier for t in player.queue]
+        assert identifiers[0] == "queued-0"
+        assert identifiers[1 : len(tracks) + 1] == [t.identifier for t in tracks]
+        assert identifiers[-2:] == ["queued-1", "queued-2"]
+
+    def test_other_tasks_run_between_chunks(self):
+        async def case():
+            player = make_player()
+            tracks = [make_track(str(i)) for i in range(INGEST_CHUNK_SIZE * 3)]
+            seen: list[int] = []
+
+            async def observer():
+                while len(player.queue) < len(tracks):
+                    seen.append(len(player.queue))
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(MusicCommands.ingest_tracks(player, tracks), observer())
+            assert any(0 < n < len(tracks) for n in seen)
+
+        asyncio.run(case())
+
+    def test_concurrent_adds_do_not_interleave(self):
+        async def case():
+            player = make_player(queued=2)
+            first = [make_track(f"a-{i}") for i in range(INGEST_CHUNK_SIZE * 3)]
+            second = [make_track(f"b-{i}") for i in range(INGEST_CHUNK_SIZE * 3)]
+
+            await asyncio.gather(
+                MusicCommands.ingest_tracks(player, first, position=2),
+                MusicCommands.ingest_tracks(player, second, position=2),
+            )
+
+            identifiers = [t.identifier for t in player.queue]
+            assert identifiers[1 : len(second) + 1] == [t.identifier for t in second]
+            assert identifiers[len(second) + 1 : -1] == [t.identifier for t in first]
+            assert identifiers[0] == "queued-0" and identifiers[-1] == "queued-1"
+
+        asyncio.run(case())
+
+    def test_position_follows_the_started_track(self):
+        player = make_player()
+        tracks = [make_track(str(i)) for i in range(INGEST_CHUNK_SIZE * 2 + 1)]
+
+        asyncio.run(MusicCommands.ingest_tracks(player, tracks, position=1, play_when_idle=True))
+
+        assert player.current is tracks[0]
+        assert list(player.queue) == tracks[1:]
+
+    def test_idle_player_starts_once_tracks_are_in(self):
+        player = make_player(queued=1)
+        tracks = [make_track(str(i)) for i in range(3)]
+
+        asyncio.run(MusicCommands.ingest_tracks(player, tracks, play_when_idle=True))
+
+        player.play.assert_awaited_once()
+        assert player.current.identifier == "queued-0"
+        assert len(player.queue) == 3
+
+    def test_stops_when_disconnected(self):
+        player = make_player()
+        player.connected = False
+
+        asyncio.run(MusicCommands.ingest_tracks(player, [make_track("a")]))
+
+        assert not player.queue
+
+
+class TestNamelessQueue:
+    @staticmethod
+    def make_queue(size: int) -> tuple[NamelessQueue, list[wavelink.Playable]]:
+        tracks = [make_track(str(i)) for i in range(size)]
+        queue = NamelessQueue()
+        queue.put(tracks)
+        return queue, list(tracks)
+
+    def test_matches_list_semantics(self):
+        rng = random.Random(42)
+        queue, model = self.make_queue(BLOCK_SIZE * 5)
+        new = 0
+
+        for _ in range(3000):
+            op = rng.randrange(5)
+
+            if op == 0:
+                index = rng.randint(-5, len(model) + 5)
+                chunk = [make_track(f"new-{new + i}") for i in range(rng.randint(1, BLOCK_SIZE * 3))]
+                new += len(chunk)
+                queue.put_many_at(index, chunk)
+                model[index:index] = chunk
+            elif op == 1 and model:
+                index = rng.randrange(len(model))
+                assert queue.get_at(index) == model.pop(index)
+            elif op == 2 and model:
+                source, destination = rng.randrange(len(model)), rng.randrange(len(model))
+                queue.move(source, destination)
+                model.insert(destination, model.pop(source))
+            elif op == 3 and model:
+                start = rng.randrange(len(model))
+                stop = start + rng.randint(0, BLOCK_SIZE * 2)
+                del queue[start:stop]
+                del model[start:stop]
+            elif op == 4 and model:
+                assert queue.get() == model.pop(0)
+
+            assert len(queue) == len(model)
+
+        assert list(queue) == model
+        assert list(reversed(queue)) == model[::-1]
+        assert all(len(block) <= BLOCK_SIZE * 2 for block in queue._blocks)
+        assert {track.identifier: queue.count_of(track) for track in model} == Counter(t.identifier for t in model)
+        assert [queue._block_duration(i) for i in range(len(queue._blocks))] == [
+            sum(track.length for track in block) for block in queue._blocks
+        ]
+        assert queue.duration == sum(track.length for track in model)
+
+    def test_indexing_and_slicing(self):
+        queue, model = self.make_queue(BLOCK_SIZE * 3 + 7)
+
+        assert queue[0] == model[0]
+        assert queue[-1] == model[-1]
+        assert queue[BLOCK_SIZE] == model[BLOCK_SIZE]
+        assert queue[:40] == model[:40]
+        assert queue[BLOCK_SIZE - 3 : BLOCK_SIZE * 2 + 3] == model[BLOCK_SIZE - 3 : BLOCK_SIZE * 2 + 3]
+        assert queue[5::7] == model[5::7]
+        assert queue[::-1] == model[::-1]
+        assert queue[len(model) + 10 :] == []
+
+        with pytest.raises(IndexError):
+            queue[len(model)]
+
+    def test_wavelink_queue_api(self):
+        queue, model = self.make_queue(10)
+
+        assert isinstance(queue, wavelink.Queue)
+        assert queue._items == model
+        assert queue.peek(2) == model[2]
+        assert queue.index(model[3]) == 3
+        assert model[4] in queue
+
+        queue.swap(0, 9)
+        assert queue[0] == model[9] and queue[9] == model[0]
+
+        queue.put(model[1])
+        assert queue.remove(model[1], count=None) == 2
+        assert model[1] not in queue
+
+        copied = queue.copy()
+        copied.clear()
+        assert len(queue) == 9 and not copied
+
+        queue.shuffle()
+        assert sorted(t.identifier for t in queue) == sorted(t.identifier for t in model if t != model[1])
+
+        with pytest.raises(TypeError):
+            queue.put(["not a track"])  # type: ignore
+
+    def test_bulk_operations(self):
+        queue, model = self.make_queue(BLOCK_SIZE * 2)
+        queue.put(model[:BLOCK_SIZE])
+        queue.put(model[:10])
+
+        for track in queue:
+            track.extras = {"requester_id": int(track.identifier) % 3}
+
+        assert queue.count_of(model[0]) == 3
+        assert queue.dedupe() == BLOCK_SIZE + 10
+        assert list(queue) == model
+        assert queue.dedupe() == 0
+
+        assert queue.delete_range(10, 20) == 10
+        assert queue.delete_range(len(queue) - 5, len(queue) + 100) == 5
+        model = model[:10] + model[20:-5]
+        assert list(queue) == model
+
+        assert queue.remove_where(lambda track: track.extras.requester_id == 0) == sum(
+            int(track.identifier) % 3 == 0 for track in model
+        )
+        assert all(int(track.identifier) % 3 for track in queue)
+
+        assert {track.identifier: queue.count_of(track) for track in queue} == Counter(t.identifier for t in queue)
+        assert model[0] not in queue and model[1] in queue
+
+    def test_delete_range_merges_blocks(self):
+        queue, model = self.make_queue(BLOCK_SIZE * 8)
+
+        # Leave a handful of tracks in every block.
+        for block in range(7, -1, -1):
+            start = block * BLOCK_SIZE + 5
+            queue.delete_range(start, start + BLOCK_SIZE - 10)
+            del model[start : start + BLOCK_SIZE - 10]
+
+        assert list(queue) == model
+        assert len(queue._blocks) == 1
+        assert queue.duration == sum(track.length for track in model)
+
+    def test_index_catches_up_lazily(self):
+        queue, model = self.make_queue(BLOCK_SIZE)
+
+        # Cycle every track through the queue a few times without asking the index anything.
+        for _ in range(BLOCK_SIZE * 5):
+            queue.put(queue.get())
+
+        queue[0] = make_track("replaced")
+
+        assert len(queue._removed) <= len(queue) + BLOCK_SIZE
+        assert queue.count_of(model[0]) == 0
+        assert queue.count_of(model[1]) == 1
+        assert make_track("replaced") in queue
+
+    def test_duration_before(self):
+        queue, model = self.make_queue(BLOCK_SIZE * 3 + 7)
+
+        for i, track in enumerate(model):
+            track._length = i
+
+        queue._items = model
+        queue.put_at(BLOCK_SIZE, make_track("inserted"))
+        queue.delete(BLOCK_SIZE * 2)
+        model.insert(BLOCK_SIZE, queue[BLOCK_SIZE])
+        del model[BLOCK_SIZE * 2]
+
+        for index in (-1, 0, 1, BLOCK_SIZE - 1, BLOCK_SIZE, BLOCK_SIZE * 2 + 5, len(model) - 1, len(model) + 3):
+            assert queue.duration_before(index) == sum(track.length for track in model[: max(index, 0)])
+
+        queue.shuffle()
+        assert queue.duration == sum(track.length for track in model)
+
+    def test_loop_all_refills_from_history(self):
+        queue, model = self.make_queue(2)
+        queue.mode = wavelink.QueueMode.loop_all
+
+        for track in (queue.get(), queue.get()):
+            queue.history.put(track)
+
+        assert queue.get() == model[0]
+        assert list(queue) == model[1:]
@@ -0,0 +1,71 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import wavelink
+
+import nameless.commands.MusicCommands as music
+from nameless.commands.MusicCommands import MusicCommands
+from tests.conftest import make_track
+
+
+class TestSearchAllOrigins:
+    @pytest.fixture(autouse=True)
+    def cog(self, monkeypatch: pytest.MonkeyPatch):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+
+        self.cog = MusicCommands(bot)  # pylint: disable=W0201
+        self.delays = {"youtube": 0, "ytmusic": 0, "soundcloud": 0}  # pylint: disable=W0201
+        self.results = {  # pylint: disable=W0201
+            "youtube": [make_track("a"), make_track("b")],
+            "ytmusic": [make_track("a"), make_track("c")],
+            "soundcloud": [make_track("d")],
+        }
+
+        async def search(query, origin, source):
+            await asyncio.sleep(self.delays[origin])
+            return self.results[origin]
+
+        monkeypatch.setattr(self.cog.search_cache, "search", search)
+        monkeypatch.setattr(music, "SEARCH_TIMEOUT", 0.05)
+
+    def test_results_are_merged_and_deduped(self):
+        tracks = asyncio.run(self.cog.search_tracks("query", "all"))
+
+        assert [track.identifier for track in tracks] == ["a", "d", "b", "c"]
+
+    def test_slow_source_is_skipped(self):
+        self.delays["soundcloud"] = 1
+
+        async def case():
+            start = asyncio.get_running_loop().time()
+            tracks = await self.cog.search_tracks("query", "all")
+
+            assert asyncio.get_running_loop().time() - start < 0.5
+            assert "d" not in [track.identifier for track in tracks]
+
+        asyncio.run(case())
+
+    def test_same_title_on_other_sources_is_deduped(self):
+        duplicate = make_track("sc-a")
+        duplicate._title = self.results["youtube"][0].title
+        self.results["soundcloud"] = [duplicate]
+
+        tracks = asyncio.run(self.cog.search_tracks("query", "all"))
+
+        assert "sc-a" not in [track.identifier for track in tracks]
+
+    def test_single_origin_is_untouched(self):
+        tracks = asyncio.run(self.cog.search_tracks("query", "soundcloud"))
+
+        assert tracks == self.results["soundcloud"]
+
+    def test_playlist_results_are_flattened(self):
+        self.results["youtube"] = wavelink.Playlist(
+            {"info": {"name": "Mix", "selectedTrack": -1}, "tracks": [make_track("e").raw_data], "pluginInfo": {}}
+        )
+
+        tracks = asyncio.run(self.cog.search_tracks("query", "all"))
+
+        assert "e" in [track.identifier for track in tracks]
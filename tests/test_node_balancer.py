@@ -0,0 +1,204 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import wavelink
+from wavelink import NodeStatus
+
+from nameless.commands.MusicCommands import MusicCommands
+from nameless.customs import NamelessNodeBalancer, NamelessPlayer
+from tests.conftest import make_track
+
+
+def make_node(identifier: str, players: int = 0, status: NodeStatus = NodeStatus.CONNECTED) -> MagicMock:
+    node = MagicMock()
+    node.identifier = identifier
+    node.status = status
+    node.players = {i: object() for i in range(players)}
+    return node
+
+
+def make_stats(playing: int = 0, system_load: float = 0.0, deficit: int = 0, nulled: int = 0) -> SimpleNamespace:
+    frames = SimpleNamespace(deficit=deficit, nulled=nulled) if deficit or nulled else None
+    return SimpleNamespace(playing=playing, cpu=SimpleNamespace(system_load=system_load), frames=frames)
+
+
+class TestNodeBalancer:
+    def test_least_players_without_stats(self):
+        busy, idle = make_node("busy", players=5), make_node("idle", players=1)
+
+        assert NamelessNodeBalancer([busy, idle]).best_node() is idle
+
+    def test_penalties_from_stats(self):
+        cpu_bound, lagging, healthy = make_node("cpu"), make_node("lag"), make_node("ok")
+        balancer = NamelessNodeBalancer([cpu_bound, lagging, healthy])
+        balancer.stats = {
+            "cpu": make_stats(playing=2, system_load=0.9),
+            "lag": make_stats(playing=2, deficit=600),
+            "ok": make_stats(playing=10, system_load=0.1),
+        }
+
+        assert balancer.penalty(cpu_bound) > balancer.penalty(healthy)
+        assert balancer.penalty(lagging) > balancer.penalty(healthy)
+        assert balancer.best_node() is healthy
+
+    def test_placements_spread_before_stats_catch_up(self):
+        first, second = make_node("first"), make_node("second")
+        balancer = NamelessNodeBalancer([first, second])
+        balancer.stats = {"first": make_stats(), "second": make_stats()}
+
+        picked = []
+        for _ in range(4):
+            node = balancer.best_node()
+            balancer.count_placement(node)
+            picked.append(node.identifier)
+
+        assert sorted(picked) == ["first", "first", "second", "second"]
+
+    def test_picking_alone_does_not_count(self):
+        first, second = make_node("first"), make_node("second", players=1)
+        balancer = NamelessNodeBalancer([first, second])
+
+        # As when connecting to the picked node keeps failing.
+        assert [balancer.best_node() for _ in range(3)] == [first, first, first]
+        assert not balancer.placed
+
+    def test_disconnected_and_excluded_nodes_are_skipped(self):
+        down = make_node("down", status=NodeStatus.DISCONNECTED)
+        current, other = make_node("current"), make_node("other", players=10)
+        balancer = NamelessNodeBalancer([down, current, other])
+
+        assert balancer.best_node(exclude=current) is other
+
+        with pytest.raises(wavelink.InvalidNodeException):
+            NamelessNodeBalancer([down]).best_node()
+
+    def test_refresh_drops_failing_nodes(self):
+        ok, failing = make_node("ok"), make_node("failing")
+        ok.fetch_stats = AsyncMock(return_value=make_stats(playing=3))
+        failing.fetch_stats = AsyncMock(side_effect=wavelink.NodeException())
+
+        balancer = NamelessNodeBalancer([ok, failing])
+        balancer.stats["failing"] = make_stats()
+        balancer.placed["ok"] = 2
+
+        asyncio.run(balancer.refresh())
+
+        assert set(balancer.stats) == {"ok"}
+        assert balancer.penalty(ok) == 3
+
+
+class TestPlayerMigration:
+    def test_stranded_players_are_moved(self):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+        cog = MusicCommands(bot)
+
+        dead, alive = make_node("dead", status=NodeStatus.DISCONNECTED), make_node("alive")
+        cog.balancer = NamelessNodeBalancer([dead, alive])
+
+        stranded = MagicMock(spec=NamelessPlayer)
+        stranded.node = dead
+        healthy = MagicMock(spec=NamelessPlayer)
+        healthy.node = alive
+        bot.voice_clients = [stranded, healthy]
+
+        asyncio.run(cog.migrate_stranded_players())
+
+        stranded.switch_node.assert_awaited_once_with(alive)
+        healthy.switch_node.assert_not_awaited()
+        assert cog.balancer.placed == {"alive": 1}
+
+    def test_failed_moves_are_not_counted(self):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+        cog = MusicCommands(bot)
+
+        dead, alive = make_node("dead", status=NodeStatus.DISCONNECTED), make_node("alive")
+        cog.balancer = NamelessNodeBalancer([dead, alive])
+
+        stranded = MagicMock(spec=NamelessPlayer)
+        stranded.node = dead
+        stranded.switch_node = AsyncMock(side_effect=wavelink.NodeException())
+        bot.voice_clients = [stranded]
+
+        asyncio.run(cog.migrate_stranded_players())
+
+        assert not cog.balancer.placed
+
+    def test_players_of_a_closed_node_are_restored_elsewhere(self):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+        bot.is_closed.return_value = False
+        cog = MusicCommands(bot)
+
+        closed, alive = make_node("closed", status=NodeStatus.DISCONNECTED), make_node("alive")
+        cog.balancer = NamelessNodeBalancer([closed, alive])
+        cog.restore_snapshots = AsyncMock()
+
+        player = MagicMock(spec=NamelessPlayer)
+        player.guild.id = 7
+        player.channel = MagicMock()
+        left = MagicMock(spec=NamelessPlayer)
+        left.channel = None
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(MusicCommands, "snapshot_player", staticmethod(lambda p: p.guild.id))
+            asyncio.run(cog.on_wavelink_node_closed(closed, [player, left]))
+
+        cog.restore_snapshots.assert_awaited_once_with(alive, [7])
+
+    def test_switch_node_resumes_from_the_last_update(self):
+        async def case():
+            dead, alive = make_node("dead", status=NodeStatus.DISCONNECTED), make_node("alive")
+            player = NamelessPlayer(nodes=[dead])
+            player.inactive_timeout = None
+            player._guild = MagicMock(id=1)
+            player._dispatch_voice_update = AsyncMock()
+            player.play = AsyncMock()
+
+            track = make_track("a")
+            player._current = track
+            player._last_position = 30_000
+            player._last_update = 0  # Long ago, `position` would be well past it.
+
+            await player.switch_node(alive)
+
+            player.play.assert_awaited_once_with(track, start=30_000, add_history=False)
+            assert player.node is alive and player.migrating
+
+        asyncio.run(case())
+
+    def test_migrated_track_is_not_announced(self):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+        cog = MusicCommands(bot)
+
+        player = MagicMock(spec=NamelessPlayer)
+        player.migrating = True
+        payload = MagicMock(player=player, track=make_track("a"), original=None)
+
+        asyncio.run(cog.on_wavelink_track_start(payload))
+
+        assert not player.migrating
+        player.guild.get_channel.assert_not_called()
+
+    def test_unload_stops_watching_nodes(self):
+        async def case():
+            bot = MagicMock()
+            bot.wait_until_ready = AsyncMock()
+            bot.loop.create_task.side_effect = lambda coro: coro.close()
+            cog = MusicCommands(bot)
+
+            with pytest.MonkeyPatch.context() as monkeypatch:
+                monkeypatch.setattr(wavelink.Pool, "connect", AsyncMock())
+                bot.loop.create_task.side_effect = None
+                await cog.connect_nodes()
+
+            bot.loop.create_task.call_args.args[0].close()
+            await cog.cog_unload()
+
+            cog.watch_task.cancel.assert_called()  # type: ignore
+
+        asyncio.run(case())
@@ -0,0 +1,218 @@
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import wavelink
+from wavelink import QueueMode
+
+from nameless.commands.MusicCommands import MusicCommands
+from nameless.customs import NamelessNowPlayingUpdater, NamelessPlayer, NamelessQueue
+from nameless.customs.NamelessNowPlayingUpdater import CHANNEL_EDIT_GAP, MAX_EDITS_PER_TICK
+from NamelessConfig import NamelessConfig
+from tests.conftest import make_track
+
+
+def make_live_player(guild_id: int, channel_id: int | None = None) -> MagicMock:
+    player = MagicMock()
+    player.guild.id = guild_id
+    player.trigger_channel_id = guild_id if channel_id is None else channel_id
+    player.connected = True
+    player.paused = False
+    player.now_playing_message = None
+    player.guild.get_channel.return_value = channel = MagicMock(spec=discord.TextChannel)
+    channel.send = AsyncMock(side_effect=lambda **_: make_message(player.trigger_channel_id))
+    return player
+
+
+def make_message(channel_id: int) -> MagicMock:
+    message = MagicMock()
+    message.channel.id = channel_id
+    message.edit = AsyncMock()
+    return message
+
+
+def make_stream(identifier: str) -> wavelink.Playable:
+    track = make_track(identifier)
+    track._is_stream = True
+    return track
+
+
+class TestNowPlaying:
+    @pytest.fixture(autouse=True)
+    def cog(self, monkeypatch: pytest.MonkeyPatch):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+
+        self.cog = MusicCommands(bot)  # pylint: disable=W0201
+        self.crud = MagicMock()  # pylint: disable=W0201
+        monkeypatch.setattr("nameless.commands.MusicCommands.AsyncCRUD", self.crud)
+
+    def test_track_start_does_no_database_io(self):
+        stream = make_stream("radio")
+        player = MagicMock()
+        player.current = make_track("song")
+        player.position = 0
+        player.queue = NamelessQueue()
+        player.play_now_allowed = 1
+        player.migrating = False
+        channel = player.guild.get_channel.return_value = MagicMock(spec=discord.TextChannel)
+        channel.send = AsyncMock()
+
+        before = discord.utils.utcnow()
+        asyncio.run(self.cog.on_wavelink_track_start(MagicMock(player=player, track=stream, original=None)))
+        asyncio.run(self.cog.on_wavelink_track_start(MagicMock(player=player, track=player.current, original=None)))
+
+        assert player.stream_start_time >= before
+        assert channel.send.await_count == 2
+        assert not self.crud.mock_calls
+
+    def test_stream_playtime_comes_from_player(self):
+        player = MagicMock()
+        player.stream_start_time = discord.utils.utcnow() - datetime.timedelta(minutes=5, seconds=3)
+
+        embed = self.cog.generate_embed_from_track(player, make_stream("radio"), MagicMock())
+        playtime = next(field for field in embed.fields if field.name == "Playtime")
+
+        assert playtime.value == "05:03"
+
+    def test_progress_bar(self):
+        assert self.cog.make_progress_bar(0, 1000, width=5) == "🔘▬▬▬▬"
+        assert self.cog.make_progress_bar(500, 1000, width=5) == "▬▬🔘▬▬"
+        assert self.cog.make_progress_bar(1000, 1000, width=5) == "▬▬▬▬🔘"
+        assert self.cog.make_progress_bar(10, 0, width=5) == "🔘▬▬▬▬"
+
+    def test_time_until_queued_tracks_play(self, monkeypatch: pytest.MonkeyPatch):
+        async def case():
+            monkeypatch.setattr(NamelessPlayer, "position", property(lambda _: 400))
+
+            player = NamelessPlayer(nodes=[MagicMock()])
+            player.queue.put([make_track(str(i)) for i in range(3)])
+            assert player.time_until(2) == 2000
+
+            player._current = make_track("current")
+            assert player.time_until(0) == 600
+            assert player.time_until(2) == 2600
+
+            pages = self.cog.generate_track_pages(player.queue, player=player)
+            assert "plays in ~00:02" in pages(0).description.splitlines()[2]
+
+            player.queue.mode = QueueMode.loop
+            assert player.time_until(1) is None
+
+            player.queue.mode = QueueMode.normal
+            player._current = make_stream("radio")
+            assert player.time_until(1) is None
+
+        asyncio.run(case())
+
+    def test_unload_stops_the_updater(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.MUSIC, "LIVE_NOW_PLAYING", True)
+        bot = MagicMock()
+        cog = MusicCommands(bot)
+
+        assert cog.now_playing_task is bot.loop.create_task.return_value
+
+        for call in bot.loop.create_task.call_args_list:
+            call.args[0].close()
+
+        asyncio.run(cog.cog_unload())
+
+        cog.now_playing_task.cancel.assert_called()
+        assert not cog.live_now_playing.running
+
+
+class TestNowPlayingUpdater:
+    @pytest.fixture(autouse=True)
+    def updater(self):
+        self.updater = NamelessNowPlayingUpdater(lambda _: discord.Embed(), refresh_interval=10)  # pylint: disable=W0201
+
+    def test_run_until_stopped(self):
+        async def case():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                ticks += 1
+
+                if ticks == 3:
+                    self.updater.stop()
+
+            self.updater.tick_interval = 0
+            self.updater.tick = tick  # type: ignore
+            await asyncio.wait_for(self.updater.run(), timeout=1)
+
+            assert ticks == 3
+
+        asyncio.run(case())
+
+    def test_marks_are_coalesced(self):
+        player = make_live_player(1)
+
+        for _ in range(5):
+            self.updater.mark(player)
+
+        asyncio.run(self.updater.tick(now=100))
+        asyncio.run(self.updater.tick(now=101))
+
+        player.guild.get_channel.return_value.send.assert_awaited_once()
+        assert self.updater.requests == 1
+
+        self.updater.mark(player)
+        asyncio.run(self.updater.tick(now=102))
+
+        player.now_playing_message.edit.assert_awaited_once()
+        player.guild.get_channel.return_value.send.assert_awaited_once()
+
+    def test_edits_are_spaced_per_channel(self):
+        first, second = make_live_player(1, channel_id=7), make_live_player(2, channel_id=7)
+        self.updater.mark(first)
+        self.updater.mark(second)
+
+        asyncio.run(self.updater.tick(now=100))
+        assert self.updater.requests == 1
+
+        asyncio.run(self.updater.tick(now=100 + CHANNEL_EDIT_GAP / 2))
+        assert self.updater.requests == 1
+
+        asyncio.run(self.updater.tick(now=100 + CHANNEL_EDIT_GAP))
+        assert self.updater.requests == 2
+        second.guild.get_channel.return_value.send.assert_awaited_once()
+
+    def test_edits_are_capped_per_tick(self):
+        for guild_id in range(MAX_EDITS_PER_TICK + 5):
+            self.updater.mark(make_live_player(guild_id))
+
+        asyncio.run(self.updater.tick(now=100))
+        assert self.updater.requests == MAX_EDITS_PER_TICK
+
+        asyncio.run(self.updater.tick(now=101))
+        assert self.updater.requests == MAX_EDITS_PER_TICK + 5
+
+    def test_progress_is_refreshed(self):
+        playing, paused = make_live_player(1), make_live_player(2)
+        self.updater.mark(playing)
+        self.updater.mark(paused)
+        asyncio.run(self.updater.tick(now=100))
+
+        paused.paused = True
+        asyncio.run(self.updater.tick(now=105))
+        asyncio.run(self.updater.tick(now=110))
+
+        playing.now_playing_message.edit.assert_awaited_once()
+        paused.now_playing_message.edit.assert_not_awaited()
+
+    def test_gone_players_and_messages(self):
+        player, leaving = make_live_player(1), make_live_player(2)
+        player.now_playing_message = make_message(1)
+        player.now_playing_message.edit.side_effect = discord.NotFound(MagicMock(), "Unknown Message")
+        leaving.connected = False
+
+        self.updater.mark(player)
+        self.updater.mark(leaving)
+        asyncio.run(self.updater.tick(now=100))
+
+        player.guild.get_channel.return_value.send.assert_awaited_once()
+        leaving.guild.get_channel.return_value.send.assert_not_awaited()
+        assert len(self.updater) == 1
@@ -0,0 +1,104 @@
+import asyncio
+import gc
+import weakref
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from nameless.customs.ui_kit import NamelessPaginator
+from nameless.customs.ui_kit.NamelessPaginator import MAX_LIVE_PER_GUILD
+
+
+def make_interaction(guild_id: int = 1) -> MagicMock:
+    interaction = MagicMock()
+    interaction.guild_id = guild_id
+    interaction.user.id = 42
+    interaction.followup.send = AsyncMock(side_effect=lambda **_: AsyncMock())
+    return interaction
+
+
+def make_pages(count: int) -> list[discord.Embed]:
+    return [discord.Embed(title=str(i)) for i in range(count)]
+
+
+def run(coro):
+    async def case():
+        try:
+            await coro
+        finally:
+            NamelessPaginator.live.clear()
+
+    asyncio.run(case())
+
+
+class TestNamelessPaginator:
+    def test_providers(self):
+        async def case():
+            pages = make_pages(3)
+            consumed: list[int] = []
+
+            def generator():
+                for i, page in enumerate(pages):
+                    consumed.append(i)
+                    yield page
+
+            from_callable = NamelessPaginator(lambda i: pages[i] if 0 <= i < 3 else None).page_provider
+            from_list = NamelessPaginator(pages).page_provider
+            from_generator = NamelessPaginator(generator()).page_provider
+
+            assert from_generator(1) is pages[1]
+            assert consumed == [0, 1]
+            assert from_generator(0) is pages[0]
+
+            for provider in (from_callable, from_list, from_generator):
+                assert [provider(i) for i in range(3)] == pages
+                assert provider(3) is None
+
+        run(case())
+
+    def test_single_page_has_no_buttons(self):
+        async def case():
+            interaction = make_interaction()
+            paginator = NamelessPaginator(make_pages(1))
+
+            await paginator.start(interaction)
+
+            assert "view" not in interaction.followup.send.call_args.kwargs
+            assert paginator.is_finished()
+            assert not NamelessPaginator.live
+
+        run(case())
+
+    def test_oldest_paginator_is_closed_past_the_cap(self):
+        async def case():
+            paginators = [NamelessPaginator(make_pages(2)) for _ in range(MAX_LIVE_PER_GUILD + 1)]
+
+            for paginator in paginators:
+                await paginator.start(make_interaction(guild_id=1))
+
+            await NamelessPaginator(make_pages(2)).start(make_interaction(guild_id=2))
+            await asyncio.sleep(0)
+
+            assert NamelessPaginator.live[1] == paginators[1:]
+            assert len(NamelessPaginator.live[2]) == 1
+            assert paginators[0].is_finished()
+            assert paginators[0].message is None
+
+        run(case())
+
+    def test_hard_timeout_releases_the_pages(self):
+        async def case():
+            paginator = NamelessPaginator(make_pages(2), hard_timeout=0.01)
+            await paginator.start(make_interaction())
+            message = paginator.message
+
+            pages = weakref.ref(paginator.page_provider)
+            await asyncio.sleep(0.05)
+            gc.collect()
+
+            assert paginator.is_finished()
+            assert not NamelessPaginator.live
+            assert pages() is None
+            message.edit.assert_awaited_once_with(view=None)
+
+        run(case())
@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import wavelink
+
+from nameless.customs import NamelessPlayer
+from nameless.customs.NamelessPlayer import PLAY_HISTORY_SIZE
+from tests.conftest import make_playable
+
+
+def make_player() -> NamelessPlayer:
+    player = NamelessPlayer(nodes=[MagicMock()])
+
+    async def play(track: wavelink.Playable, **_):
+        player._current = track
+        player.remember(track)
+        return track
+
+    player.play = AsyncMock(side_effect=play)
+    player.inactive_timeout = None
+    return player
+
+
+class TestPlayHistory:
+    def test_history_is_bounded(self):
+        player = make_player()
+
+        for i in range(PLAY_HISTORY_SIZE + 10):
+            player.remember(make_playable(str(i)))
+            player.remember(make_playable(str(i)))  # Looping or resuming.
+
+        assert len(player.play_history) == PLAY_HISTORY_SIZE
+        assert player.play_history[0].identifier == "10"
+        assert player.play_history[-1].identifier == str(PLAY_HISTORY_SIZE + 9)
+
+    def test_previous_replays_from_history(self):
+        async def case():
+            player = make_player()
+
+            for identifier in ("a", "b", "c"):
+                await player.play(make_playable(identifier))
+
+            player.queue.put(make_playable("d"))
+
+            replayed = await player.play_previous()
+
+            assert replayed is not None and replayed.identifier == "b"
+            assert replayed.artwork == make_playable("b").artwork
+            assert [track.identifier for track in player.queue] == ["c", "d"]
+            assert [track.identifier for track in player.play_history] == ["a", "b"]
+
+            assert (await player.play_previous()).identifier == "a"  # type: ignore
+            assert await player.play_previous() is None
+            assert [track.identifier for track in player.queue] == ["b", "c", "d"]
+
+        asyncio.run(case())
+
+    def test_previous_when_idle(self):
+        async def case():
+            player = make_player()
+            assert player.previous_track is None
+
+            player.remember(make_playable("last"))
+
+            assert (await player.play_previous()).identifier == "last"  # type: ignore
+            assert not player.queue
+
+        asyncio.run(case())
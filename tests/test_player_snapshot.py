@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+from wavelink import AutoPlayMode, QueueMode
+
+from nameless.commands.MusicCommands import MusicCommands
+from nameless.customs import NamelessQueue
+from nameless.database.models import DbPlayerSnapshot
+from NamelessConfig import NamelessConfig
+from tests.conftest import make_track
+
+
+class TestPlayerSnapshot:
+    @pytest.fixture(autouse=True)
+    def cog(self):
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()  # Not connecting to any node.
+
+        self.cog = MusicCommands(bot)  # pylint: disable=W0201
+
+    @staticmethod
+    def make_player() -> MagicMock:
+        player = MagicMock()
+        player.guild.id = 10
+        player.channel.id = 20
+        player.trigger_channel_id = 30
+        player.play_now_allowed = 1
+        player.current = make_track("current")
+        player.position = 12345
+        player.paused = True
+        player.volume = 42
+        player.autoplay = AutoPlayMode.partial
+        player.queue = NamelessQueue()
+        player.queue.mode = QueueMode.loop_all
+        player.queue.put([make_track(str(i)) for i in range(100)])
+        return player
+
+    def test_queue_is_packed(self):
+        snapshot = DbPlayerSnapshot(1, 2)
+        encoded = [make_track(str(i)).encoded for i in range(1000)]
+
+        snapshot.queue = encoded
+
+        assert snapshot.queue == encoded
+        assert len(snapshot.packed_queue) < len("".join(encoded)) / 2
+
+        snapshot.queue = []
+        assert snapshot.packed_queue == b""
+        assert snapshot.queue == []
+
+    @pytest.mark.parametrize("volume", [42, 0])
+    def test_snapshot_and_restore(self, volume: int):
+        saved = self.make_player()
+        saved.volume = volume
+        snapshot = self.cog.snapshot_player(saved)
+        payloads = {track.encoded: track.raw_data for track in [saved.current, *saved.queue]}
+
+        node = MagicMock()
+        node.send = AsyncMock(side_effect=lambda method, path, data: [payloads[encoded] for encoded in data])
+
+        restored = MagicMock()
+        restored.play = AsyncMock()
+        restored.set_volume = AsyncMock()
+        restored.queue = NamelessQueue()
+        channel = MagicMock(spec=discord.VoiceChannel)
+        channel.guild.voice_client = None
+        channel.connect = AsyncMock(return_value=restored)
+        self.cog.bot.get_guild.return_value.get_channel.return_value = channel
+        self.cog.balancer.best_node = MagicMock(return_value=node)
+
+        assert asyncio.run(self.cog.restore_player(node, snapshot))
+
+        node.send.assert_awaited_once()
+        restored.set_volume.assert_awaited_once_with(volume)
+        restored.play.assert_awaited_once_with(saved.current, start=12345, paused=True)
+        assert list(restored.queue) == list(saved.queue)
+        assert restored.queue.mode is QueueMode.loop_all
+        assert restored.autoplay is AutoPlayMode.partial
+        assert restored.trigger_channel_id == 30
+        assert restored.play_now_allowed
+
+    def test_restore_skips_missing_channel(self):
+        snapshot = self.cog.snapshot_player(self.make_player())
+        node = MagicMock()
+        node.send = AsyncMock()
+        self.cog.bot.get_guild.return_value.get_channel.return_value = None
+
+        assert not asyncio.run(self.cog.restore_player(node, snapshot))
+        node.send.assert_not_awaited()
+
+    def test_unload_stops_saving(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.MUSIC, "SNAPSHOT_INTERVAL", 60)
+        bot = MagicMock()
+        cog = MusicCommands(bot)
+
+        for call in bot.loop.create_task.call_args_list:
+            call.args[0].close()
+
+        asyncio.run(cog.cog_unload())
+
+        assert cog.snapshot_task is bot.loop.create_task.return_value
+        cog.snapshot_task.cancel.assert_called()
+
+    def test_nothing_saved_before_restore(self, monkeypatch: pytest.MonkeyPatch):
+        replace = AsyncMock()
+        monkeypatch.setattr("nameless.commands.MusicCommands.AsyncCRUD.replace_player_snapshots", replace)
+
+        asyncio.run(self.cog.save_player_states())
+        replace.assert_not_awaited()
+
+        self.cog.players_restored = True
+        self.cog.bot.voice_clients = []
+
+        asyncio.run(self.cog.save_player_states())
+        replace.assert_awaited_once_with([])
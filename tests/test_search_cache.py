@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+import wavelink
+
+from nameless.customs import NamelessSearchCache
+from tests.conftest import make_track
+
+
+class TestSearchCache:
+    @pytest.fixture(autouse=True)
+    def fake_search(self, monkeypatch: pytest.MonkeyPatch):
+        self.calls: list[str] = []  # pylint: disable=W0201
+
+        async def search(query: str, *, source=None):
+            self.calls.append(query)
+            await asyncio.sleep(0.01)
+            return [] if query == "nothing" else [make_track(query)]
+
+        monkeypatch.setattr(wavelink.Playable, "search", search)
+
+    def test_repeat_search_is_cached(self):
+        async def case():
+            cache = NamelessSearchCache()
+
+            first = await cache.search("never gonna", "youtube", wavelink.TrackSource.YouTube)
+            second = await cache.search("never gonna ", "youtube", wavelink.TrackSource.YouTube)
+
+            assert self.calls == ["never gonna"]
+            assert first == second
+            assert first[0] is not second[0]
+            assert cache.hits == 1
+            assert cache.misses == 1
+
+        asyncio.run(case())
+
+    def test_origin_is_part_of_the_key(self):
+        async def case():
+            cache = NamelessSearchCache()
+
+            await cache.search("query", "youtube", wavelink.TrackSource.YouTube)
+            await cache.search("query", "soundcloud", wavelink.TrackSource.SoundCloud)
+
+            assert len(self.calls) == 2
+
+        asyncio.run(case())
+
+    def test_empty_results_are_cached(self):
+        async def case():
+            cache = NamelessSearchCache(negative_ttl=60)
+
+            assert not await cache.search("nothing", "youtube", None)
+            assert not await cache.search("nothing", "youtube", None)
+
+            assert len(self.calls) == 1
+            assert cache.negative_hits == 1
+            assert cache.hit_rate == 0.5
+
+        asyncio.run(case())
+
+    def test_concurrent_searches_share_one_request(self):
+        async def case():
+            cache = NamelessSearchCache()
+            results = await asyncio.gather(*[cache.search("popular", "youtube", None) for _ in range(10)])
+
+            assert len(self.calls) == 1
+            assert all(r == results[0] for r in results)
+
+        asyncio.run(case())
+
+    def test_playlist_is_copied(self, monkeypatch: pytest.MonkeyPatch):
+        async def case():
+            playlist = wavelink.Playlist(
+                {
+                    "info": {"name": "Mix", "selectedTrack": -1},
+                    "tracks": [make_track("a").raw_data, make_track("b").raw_data],
+                    "pluginInfo": {},
+                }
+            )
+
+            async def search(query: str, *, source=None):
+                return playlist
+
+            monkeypatch.setattr(wavelink.Playable, "search", search)
+            cache = NamelessSearchCache()
+
+            first = await cache.search("https://example.com/mix", "youtube", None)
+            first.tracks.pop()
+            second = await cache.search("https://example.com/mix", "youtube", None)
+
+            assert isinstance(second, wavelink.Playlist)
+            assert len(second.tracks) == 2
+
+        asyncio.run(case())
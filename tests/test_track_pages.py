@@ -0,0 +1,62 @@
+import wavelink
+
+from nameless.customs import NamelessQueue
+from nameless.customs.ui_kit import NamelessTrackPages
+from tests.conftest import make_track
+
+
+def render_line(position: int, track: wavelink.Playable) -> str:
+    return f"{position} - {track.title}\n"
+
+
+class TestTrackPages:
+    def test_pages_cover_every_track_once(self):
+        tracks = [make_track(str(i)) for i in range(500)]
+        pages = NamelessTrackPages(tracks, "Queue", render_line, max_length=200)
+
+        lines: list[str] = []
+        page = 0
+
+        while (embed := pages(page)) is not None:
+            assert embed.title == "Queue"
+            assert len(embed.description) <= 200
+            lines += embed.description.splitlines()
+            page += 1
+
+        assert lines == [render_line(i, track).strip() for i, track in enumerate(tracks, start=1)]
+
+    def test_rendering_is_proportional_to_the_page(self):
+        calls: list[int] = []
+
+        def counting_render_line(position: int, track: wavelink.Playable) -> str:
+            calls.append(position)
+            return render_line(position, track)
+
+        queue = NamelessQueue()
+        queue.put([make_track(str(i)) for i in range(5000)])
+        pages = NamelessTrackPages(queue, "Queue", counting_render_line, max_length=200)
+
+        pages(0)
+        assert len(calls) < 100
+
+        calls.clear()
+        pages(0)
+        pages(1)
+        assert len(calls) < 200
+
+    def test_empty_and_missing_pages(self):
+        pages = NamelessTrackPages([], "Queue", render_line)
+
+        assert pages(0).description == ""
+        assert pages(1) is None
+        assert pages(-1) is None
+
+    def test_pages_follow_a_shrinking_queue(self):
+        queue = NamelessQueue()
+        queue.put([make_track(str(i)) for i in range(50)])
+        pages = NamelessTrackPages(queue, "Queue", render_line, max_length=100)
+
+        assert pages(1) is not None
+
+        queue.clear()
+        assert pages(1) is None
@@ -0,0 +1,81 @@
+import pytest
+import wavelink
+
+from nameless.customs import NamelessQueue, NamelessTrackSummary, decode_track_info, encode_track_info
+from tests.conftest import make_info, make_playable
+
+
+class TestTrackSummary:
+    def test_encoding_round_trip(self):
+        info = make_info("x", title="🎵 Tiếng Việt \x00 – edit", uri=None, isrc="USUM71703861")
+        decoded = decode_track_info(encode_track_info(info))
+
+        assert decoded == {key: value for key, value in info.items() if key not in ("isSeekable", "position")}
+
+    def test_unknown_encodings_are_rejected(self):
+        with pytest.raises(ValueError):
+            decode_track_info("bm90IGEgdHJhY2s=")
+
+        with pytest.raises(ValueError):
+            decode_track_info("not base64!")
+
+    def test_summary_stands_in_for_the_track(self):
+        track = make_playable("a")
+        track.extras = {"requester_id": 42}
+        summary = NamelessTrackSummary.from_playable(track)
+
+        assert summary == track and track == summary
+        assert summary != make_playable("b")
+        assert summary.extras.requester_id == 42  # type: ignore
+
+        restored = summary.to_playable()
+
+        assert restored == track
+        assert (restored.title, restored.author, restored.length, restored.uri) == (
+            track.title,
+            track.author,
+            track.length,
+            track.uri,
+        )
+        assert (restored.source, restored.artwork, restored.is_seekable) == ("youtube", track.artwork, True)
+        assert dict(restored.extras) == {"requester_id": 42}
+
+    def test_authors_are_interned(self):
+        first, second = (NamelessTrackSummary.from_playable(make_playable(str(i))) for i in range(2))
+
+        assert first.author is second.author
+
+
+class TestCompactQueue:
+    def test_tracks_are_kept_as_summaries(self):
+        queue = NamelessQueue(compact=True)
+        tracks = [make_playable(str(i), length=i * 1000) for i in range(10)]
+        queue.put(tracks[:5])
+        queue.put_at(0, tracks[5])
+        queue.put_many_at(1, tracks[6:])
+
+        assert all(isinstance(track, NamelessTrackSummary) for track in queue)
+        assert [track.identifier for track in queue] == ["5", "6", "7", "8", "9", "0", "1", "2", "3", "4"]
+        assert tracks[3] in queue and queue.index(tracks[3]) == 8
+        assert queue.duration == sum(track.length for track in tracks)
+
+        queue.swap(0, 9)
+        queue.shuffle()
+        assert queue.remove(tracks[0]) == 1
+
+        played = queue.get()
+        assert isinstance(played, wavelink.Playable)
+        assert played.artwork == tracks[int(played.identifier)].artwork
+        assert played not in queue
+        assert len(queue) == 8
+
+    def test_loop_all_keeps_the_queue_compact(self):
+        queue = NamelessQueue(compact=True)
+        queue.mode = wavelink.QueueMode.loop_all
+        queue.put([make_playable("a"), make_playable("b")])
+
+        for track in (queue.get(), queue.get()):
+            queue.history.put(track)  # type: ignore
+
+        assert queue.get().identifier == "a"
+        assert isinstance(queue[0], NamelessTrackSummary)
@@ -1,4 +1,7 @@
+import pytest
+
 import nameless.utils as utils
+from NamelessConfig import NamelessConfig
 
 
 class TestUtility:
@@ -12,3 +15,12 @@ class TestUtility:
         assert not utils.is_an_url("bao.moe")
         assert not utils.is_an_url("discord.com")
         assert not utils.is_an_url("m.me")
+
+    def test_config_option(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(NamelessConfig.DATABASE, "POOL_SIZE", 20)
+        assert utils.get_config_option("DATABASE", "POOL_SIZE", 5) == 20
+
+    def test_config_option_missing(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.delattr(NamelessConfig, "DATABASE")
+        assert utils.get_config_option("DATABASE", "POOL_SIZE", 5) == 5
+        assert utils.get_config_option("OSU", "NOT_AN_OPTION", "default") == "default"
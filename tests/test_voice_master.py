@@ -0,0 +1,225 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from nameless.commands.VoiceMasterCommands import VoiceMasterCommands
+
+
+def make_room(channel_id: int, error: Exception | None = None) -> MagicMock:
+    room = MagicMock(spec=discord.VoiceChannel)
+    room.id = channel_id
+    room.members = []
+    room.delete = AsyncMock(side_effect=error)
+    return room
+
+
+def make_bot(rooms: dict[int, MagicMock], guilds: dict[int, MagicMock] | None = None) -> MagicMock:
+    bot = MagicMock()
+    bot.wait_until_ready = AsyncMock()
+    bot.get_channel.side_effect = rooms.get
+    bot.get_guild.side_effect = (guilds or {7: MagicMock(unavailable=False)}).get
+    return bot
+
+
+class TestReconcileRooms:
+    def test_rooms_failing_to_delete_stay_tracked(self, monkeypatch: pytest.MonkeyPatch):
+        delete_records = AsyncMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD.delete_voice_room_records", delete_records)
+
+        response = MagicMock(status=500, reason="Internal Server Error")
+        rooms = {
+            1: make_room(1),
+            2: make_room(2, discord.NotFound(MagicMock(status=404, reason="Not Found"), "Unknown Channel")),
+            3: make_room(3, discord.HTTPException(response, "Oops")),
+        }
+
+        bot = make_bot(rooms)
+        cog = VoiceMasterCommands(bot)
+        for channel_id in [*rooms, 4]:
+            cog.track_room(channel_id, owner_id=channel_id * 10, guild_id=7)
+
+        asyncio.run(cog.reconcile_rooms())
+
+        delete_records.assert_awaited_once_with([4, 1, 2])
+        assert cog.channel_owner == {3: 30}
+        assert cog.channel_track == {30: 3}
+
+    def test_rooms_of_unavailable_guilds_are_left_alone(self, monkeypatch: pytest.MonkeyPatch):
+        delete_records = AsyncMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD.delete_voice_room_records", delete_records)
+
+        outage = MagicMock(unavailable=True)
+        bot = make_bot({}, guilds={7: MagicMock(unavailable=False), 8: outage})
+        cog = VoiceMasterCommands(bot)
+        cog.track_room(1, owner_id=10, guild_id=7)
+        cog.track_room(2, owner_id=20, guild_id=8)
+        cog.track_room(3, owner_id=30, guild_id=9)
+        cog.channel_pool = {7: [4], 8: [5], 9: [6]}
+
+        asyncio.run(cog.reconcile_rooms())
+
+        # None of the channels can be seen, only those of the guild we can see are gone.
+        delete_records.assert_awaited_once_with([1, 4])
+        assert cog.channel_owner == {2: 20, 3: 30}
+        assert cog.channel_guild == {2: 8, 3: 9}
+        assert cog.channel_pool == {7: [], 8: [5], 9: [6]}
+
+
+class TestVoiceStateUpdate:
+    @pytest.mark.parametrize(
+        ("before_id", "after_id"),
+        [
+            (100, 100),  # Muting or deafening in the master channel.
+            (1, 1),  # Muting or deafening in a room.
+            (None, 200),  # Joining a channel we do not manage.
+            (200, None),  # Leaving it.
+            (200, 300),  # Moving between two of them.
+        ],
+    )
+    def test_unmanaged_updates_skip_the_database(
+        self, monkeypatch: pytest.MonkeyPatch, before_id: int | None, after_id: int | None
+    ):
+        crud = MagicMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD", crud)
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.master_channel_ids = {100}
+        cog.track_room(1, owner_id=42, guild_id=7)
+
+        def state(channel_id: int | None) -> MagicMock:
+            return MagicMock(channel=MagicMock(id=channel_id) if channel_id else None)
+
+        member = MagicMock()
+        member.id = 42
+        asyncio.run(cog.on_voice_state_update(member, state(before_id), state(after_id)))
+
+        assert not crud.mock_calls
+        member.move_to.assert_not_called()
+
+    def test_deleted_master_channel_is_forgotten(self, monkeypatch: pytest.MonkeyPatch):
+        delete_records = AsyncMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD.delete_voice_room_records", delete_records)
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.master_channel_ids = {100, 101}
+
+        asyncio.run(cog.on_guild_channel_delete(MagicMock(id=100)))
+
+        assert cog.master_channel_ids == {101}
+        delete_records.assert_not_awaited()
+
+
+class TestPooledRooms:
+    def test_taking_a_room_writes_in_one_scope(self, monkeypatch: pytest.MonkeyPatch):
+        crud = MagicMock()
+        crud.delete_voice_room_records = AsyncMock()
+        crud.set_voice_room_owner = AsyncMock()
+        sessions: list[object] = []
+
+        @asynccontextmanager
+        async def session_scope():
+            sessions.append(session := object())
+            yield session
+
+        crud.session_scope = session_scope
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD", crud)
+
+        ready = make_room(1)
+        ready.edit = AsyncMock()
+        member = MagicMock()
+        member.id = 42
+        member.guild.id = 7
+        member.guild.get_channel.side_effect = {1: ready}.get
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.channel_pool[7] = [1, 2, 3]
+
+        assert asyncio.run(cog.take_pooled_room(member, MagicMock())) is ready
+
+        assert len(sessions) == 1
+        crud.delete_voice_room_records.assert_awaited_once_with([3, 2], session=sessions[0])
+        crud.set_voice_room_owner.assert_awaited_once_with(1, 42, session=sessions[0])
+        assert cog.channel_owner == {1: 42}
+        assert not cog.channel_pool[7]
+
+    def test_failing_rooms_go_back_to_the_pool(self, monkeypatch: pytest.MonkeyPatch):
+        crud = MagicMock()
+        crud.create_voice_room_record = AsyncMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD", crud)
+
+        broken = make_room(1)
+        broken.edit = AsyncMock(side_effect=discord.HTTPException(MagicMock(status=500, reason="Oops"), "Oops"))
+        fallback = make_room(2)
+
+        master = MagicMock(spec=discord.VoiceChannel)
+        master.id = 100
+        master.position = 0
+        master.guild.id = 7
+        master.guild.get_channel.side_effect = {1: broken}.get
+        master.guild.create_voice_channel = AsyncMock(return_value=fallback)
+
+        member = MagicMock()
+        member.id = 42
+        member.guild = master.guild
+        member.move_to = AsyncMock()
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.master_channel_ids = {master.id}
+        cog.channel_pool[7] = [1]
+        cog.schedule_pool_refill = MagicMock()
+
+        before = MagicMock(channel=None)
+        after = MagicMock(channel=master)
+        asyncio.run(cog.on_voice_state_update(member, before, after))
+
+        member.move_to.assert_awaited_once_with(fallback)
+        crud.create_voice_room_record.assert_awaited_once_with(2, 7, 42)
+        crud.session_scope.assert_not_called()
+        assert cog.channel_owner == {2: 42}
+        assert cog.channel_pool[7] == [1]
+
+    def test_refill_fills_the_pool(self, monkeypatch: pytest.MonkeyPatch):
+        crud = MagicMock()
+        crud.create_voice_room_record = AsyncMock()
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD", crud)
+
+        rooms = iter(make_room(channel_id) for channel_id in range(1, 10))
+        master = MagicMock(spec=discord.VoiceChannel)
+        master.position = 0
+        master.guild.id = 7
+        master.guild.create_voice_channel = AsyncMock(side_effect=lambda *_, **__: next(rooms))
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.pool_size = 3
+        cog.channel_pool[7] = [9]
+        cog.refilling_guild_ids.add(7)
+
+        asyncio.run(cog.refill_pool(master))
+
+        assert cog.channel_pool[7] == [9, 1, 2]
+        assert crud.create_voice_room_record.await_count == 2
+        assert not cog.refilling_guild_ids
+
+    def test_refill_deletes_rooms_it_could_not_record(self, monkeypatch: pytest.MonkeyPatch):
+        crud = MagicMock()
+        crud.create_voice_room_record = AsyncMock(side_effect=RuntimeError("database is locked"))
+        monkeypatch.setattr("nameless.commands.VoiceMasterCommands.AsyncCRUD", crud)
+
+        room = make_room(1)
+        master = MagicMock(spec=discord.VoiceChannel)
+        master.position = 0
+        master.guild.id = 7
+        master.guild.create_voice_channel = AsyncMock(return_value=room)
+
+        cog = VoiceMasterCommands(MagicMock())
+        cog.pool_size = 3
+        cog.refilling_guild_ids.add(7)
+
+        asyncio.run(cog.refill_pool(master))
+
+        room.delete.assert_awaited_once()
+        assert cog.channel_pool[7] == []
+        assert not cog.refilling_guild_ids
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from nameless.database import DbGuild, DbUser, WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    @staticmethod
+    def make_queue(**kwargs) -> tuple[WriteBehindQueue, list[list]]:
+        batches: list[list] = []
+
+        async def committer(records):
+            batches.append(records)
+
+        return WriteBehindQueue(committer, **kwargs), batches
+
+    def test_records_are_coalesced(self):
+        async def case():
+            queue, batches = self.make_queue(interval=60)
+            guild = DbGuild(1)
+
+            for _ in range(5):
+                queue.mark_dirty(guild)
+
+            queue.mark_dirty(DbUser(1))
+            assert len(queue) == 2
+
+            await queue.flush()
+            assert len(batches) == 1
+            assert len(batches[0]) == 2
+
+        asyncio.run(case())
+
+    def test_flush_after_interval(self):
+        async def case():
+            queue, batches = self.make_queue(interval=0.01)
+            queue.mark_dirty(DbGuild(1))
+
+            await asyncio.sleep(0.05)
+            assert len(batches) == 1
+            assert len(queue) == 0
+
+        asyncio.run(case())
+
+    def test_flush_when_full(self):
+        async def case():
+            queue, batches = self.make_queue(interval=60, max_pending=3)
+
+            for i in range(3):
+                queue.mark_dirty(DbGuild(i))
+
+            await asyncio.sleep(0)
+            assert len(batches) == 1
+            assert len(batches[0]) == 3
+
+        asyncio.run(case())
+
+    def test_close_writes_everything(self):
+        async def case():
+            queue, batches = self.make_queue(interval=60)
+            queue.mark_dirty(DbGuild(1))
+
+            await queue.close()
+            assert len(batches) == 1
+
+        asyncio.run(case())
+
+    def test_clear_discards_pending(self):
+        async def case():
+            queue, batches = self.make_queue(interval=0.01)
+            queue.mark_dirty(DbGuild(1))
+            queue.clear()
+
+            await asyncio.sleep(0.05)
+            assert not batches
+
+        asyncio.run(case())
+
+    def test_failed_batch_is_put_back(self):
+        async def case():
+            attempts: list[list] = []
+
+            async def committer(records):
+                attempts.append(records)
+
+                if len(attempts) == 1:
+                    queue.mark_dirty(newer)
+                    raise RuntimeError("database is locked")
+
+            queue = WriteBehindQueue(committer, interval=0.01)
+            older, newer, other = DbGuild(1), DbGuild(1), DbGuild(2)
+            queue.mark_dirty(older)
+            queue.mark_dirty(other)
+
+            with pytest.raises(RuntimeError):
+                await queue.flush()
+
+            assert queue.get(DbGuild, 1) is newer
+            assert queue.get(DbGuild, 2) is other
+
+            # Tried again on its own.
+            await asyncio.sleep(0.05)
+            assert len(attempts) == 2
+            assert {id(record) for record in attempts[1]} == {id(newer), id(other)}
+            assert len(queue) == 0
+
+        asyncio.run(case())
+
+    def test_failed_batch_stays_cleared(self):
+        async def case():
+            async def committer(records):
+                queue.clear()
+                raise RuntimeError("database is locked")
+
+            queue = WriteBehindQueue(committer, interval=60)
+            queue.mark_dirty(DbGuild(1))
+
+            with pytest.raises(RuntimeError):
+                await queue.flush()
+
+            assert len(queue) == 0
+
+        asyncio.run(case())